@@ -0,0 +1,109 @@
+"""
+In-memory preparation of recorded audio for speech-to-text uploads.
+
+Recordings from ``st.audio_input`` are full-rate WAV files (typically 44.1 or
+48 kHz). Speech recognition only needs 16 kHz mono, so recordings are
+downmixed and resampled with NumPy before upload, without touching disk.
+"""
+
+import io
+import logging
+import wave
+from typing import Tuple
+
+import numpy as np
+
+audio_logger = logging.getLogger('audio_utils')
+
+SPEECH_SAMPLE_RATE = 16000
+LOWPASS_TAPS = 63  # length of the anti-aliasing filter used when downsampling
+
+_SAMPLE_DTYPES = {1: np.uint8, 2: np.int16, 4: np.int32}
+
+
+def read_wav(data: bytes) -> Tuple[np.ndarray, int]:
+    """
+    Decode PCM WAV bytes.
+
+    Returns:
+        (float32 samples in [-1, 1] shaped (frames, channels), sample rate)
+
+    Raises:
+        wave.Error, EOFError or ValueError for unsupported or malformed input
+    """
+    with wave.open(io.BytesIO(data), 'rb') as wav:
+        channels = wav.getnchannels()
+        width = wav.getsampwidth()
+        rate = wav.getframerate()
+        frames = wav.readframes(wav.getnframes())
+
+    if width == 3:
+        # Widen 24-bit samples to 32-bit by padding the low byte
+        raw = np.frombuffer(frames, dtype=np.uint8).reshape(-1, 3)
+        padded = np.zeros((raw.shape[0], 4), dtype=np.uint8)
+        padded[:, 1:] = raw
+        samples = padded.view('<i4').ravel().astype(np.float32) / 2 ** 31
+    elif width in _SAMPLE_DTYPES:
+        samples = np.frombuffer(frames, dtype=np.dtype(_SAMPLE_DTYPES[width]).newbyteorder('<')).astype(np.float32)
+        if width == 1:
+            samples = (samples - 128) / 128
+        else:
+            samples /= 2 ** (8 * width - 1)
+    else:
+        raise ValueError(f"Unsupported sample width: {width} bytes")
+    return samples.reshape(-1, channels), rate
+
+
+def write_wav(samples: np.ndarray, rate: int) -> bytes:
+    """Encode mono float samples as 16-bit PCM WAV bytes."""
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype('<i2')
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(pcm.tobytes())
+    return buffer.getvalue()
+
+
+def resample(samples: np.ndarray, source_rate: int, target_rate: int) -> np.ndarray:
+    """
+    Resample mono samples by linear interpolation.
+
+    When downsampling, a windowed-sinc low-pass filter is applied first so
+    frequencies above the new Nyquist limit do not alias into speech.
+    """
+    if source_rate == target_rate or samples.size == 0:
+        return samples
+    if target_rate < source_rate:
+        cutoff = 0.5 * target_rate / source_rate
+        taps = np.arange(LOWPASS_TAPS) - (LOWPASS_TAPS - 1) / 2
+        kernel = 2 * cutoff * np.sinc(2 * cutoff * taps) * np.hamming(LOWPASS_TAPS)
+        samples = np.convolve(samples, kernel / kernel.sum(), mode='same')
+    duration = samples.size / source_rate
+    target_times = np.arange(int(round(duration * target_rate))) / target_rate
+    source_times = np.arange(samples.size) / source_rate
+    return np.interp(target_times, source_times, samples).astype(np.float32)
+
+
+def prepare_speech_audio(data: bytes, target_rate: int = SPEECH_SAMPLE_RATE) -> Tuple[bytes, str]:
+    """
+    Downmix and resample a recording to 16-bit mono WAV at target_rate.
+
+    Recordings that are not PCM WAV, or are already at or below the target
+    format, are returned unchanged so the backend can still handle them.
+
+    Returns:
+        (audio bytes, MIME type)
+    """
+    try:
+        samples, rate = read_wav(data)
+    except (wave.Error, EOFError, ValueError) as e:
+        audio_logger.info(f"Uploading audio as recorded: {e}")
+        return data, 'audio/wav'
+    if samples.shape[1] == 1 and rate <= target_rate:
+        return data, 'audio/wav'
+    mono = samples.mean(axis=1)
+    prepared = write_wav(resample(mono, rate, min(rate, target_rate)), min(rate, target_rate))
+    audio_logger.info(f"Prepared audio for upload: {len(data)} -> {len(prepared)} bytes")
+    return prepared, 'audio/wav'
@@ -0,0 +1,263 @@
+"""
+Local snapshot store for active assistant conversations.
+
+Keeps a copy of each user's chat history, thread_id and response_id in an
+embedded SQLite database so that a lost Streamlit session (page refresh,
+websocket reconnect, worker restart) can be rehydrated immediately instead of
+refetching the whole thread from the backend.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+store_logger = logging.getLogger('conversation_store')
+
+DEFAULT_DB_PATH = os.getenv("CONVERSATION_STORE_PATH", "conversation_store.sqlite3")
+DEFAULT_TTL_SECONDS = int(os.getenv("CONVERSATION_STORE_TTL_SECONDS", str(7 * 24 * 60 * 60)))
+DEFAULT_MAX_MESSAGES = 200          # per conversation, oldest messages are trimmed first
+DEFAULT_MAX_MESSAGE_CHARS = 20000   # per message, longer content is truncated
+DEFAULT_MAX_CONVERSATIONS = 5000    # least recently updated conversations are evicted first
+EVICTION_INTERVAL_SECONDS = 300
+
+
+class ConversationStore:
+    """
+    SQLite-backed store holding one active conversation per user key.
+
+    Messages are written incrementally: a snapshot only appends the messages
+    that were added since the previous snapshot. The response ID changes on
+    every assistant turn, so continuity is checked against digests of the
+    first and last stored messages instead; a mismatch (e.g. after "Start New
+    Chat" or opening another thread) rewrites the conversation from scratch.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH,
+                 ttl_seconds: int = DEFAULT_TTL_SECONDS,
+                 max_messages: int = DEFAULT_MAX_MESSAGES,
+                 max_message_chars: int = DEFAULT_MAX_MESSAGE_CHARS,
+                 max_conversations: int = DEFAULT_MAX_CONVERSATIONS):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_messages = max_messages
+        self.max_message_chars = max_message_chars
+        self.max_conversations = max_conversations
+        self._lock = threading.Lock()
+        self._last_eviction = 0.0
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        if db_path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS conversations (
+                user_key TEXT PRIMARY KEY,
+                thread_id TEXT,
+                response_id TEXT,
+                message_count INTEGER NOT NULL DEFAULT 0,
+                head_digest TEXT,
+                tail_digest TEXT,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS messages (
+                user_key TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                role TEXT NOT NULL,
+                content TEXT NOT NULL,
+                PRIMARY KEY (user_key, seq)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_conversations_updated_at ON conversations (updated_at);
+            """
+        )
+
+    def _encode_content(self, content: Any) -> str:
+        """Serialize message content, truncating oversized text."""
+        if isinstance(content, str) and len(content) > self.max_message_chars:
+            content = content[:self.max_message_chars]
+        return json.dumps(content)
+
+    @staticmethod
+    def _digest(message: Dict[str, Any]) -> str:
+        """Return a short fingerprint of a message."""
+        payload = json.dumps([message.get("role"), message.get("content")], sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def snapshot(self, user_key: str, chat_history: List[Dict[str, Any]],
+                 thread_id: Optional[str] = None, response_id: Optional[str] = None) -> None:
+        """
+        Persist the current conversation for a user.
+
+        Args:
+            user_key: Stable identifier of the conversation owner
+            chat_history: List of {"role", "content"} messages
+            thread_id: The active thread (response) ID, if any
+            response_id: The latest response ID, if any
+        """
+        if not user_key:
+            return
+        chat_history = chat_history or []
+        now = time.time()
+
+        with self._lock:
+            try:
+                self._conn.execute("BEGIN")
+                row = self._conn.execute(
+                    "SELECT message_count, head_digest, tail_digest FROM conversations WHERE user_key = ?",
+                    (user_key,)
+                ).fetchone()
+
+                stored_count = 0
+                if row is not None:
+                    stored_count, head_digest, tail_digest = row
+                    if stored_count and (
+                        len(chat_history) < stored_count
+                        or self._digest(chat_history[0]) != head_digest
+                        or self._digest(chat_history[stored_count - 1]) != tail_digest
+                    ):
+                        # The session holds a different conversation than the stored one
+                        stored_count = -1
+
+                if stored_count < 0:
+                    self._conn.execute("DELETE FROM messages WHERE user_key = ?", (user_key,))
+                    stored_count = 0
+
+                # Only messages inside the size cap are worth writing
+                first_kept = max(stored_count, len(chat_history) - self.max_messages)
+                new_rows = [
+                    (user_key, seq, str(msg.get("role", "assistant")), self._encode_content(msg.get("content", "")))
+                    for seq, msg in enumerate(chat_history[first_kept:], start=first_kept)
+                ]
+                if new_rows:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO messages (user_key, seq, role, content) VALUES (?, ?, ?, ?)",
+                        new_rows
+                    )
+                self._conn.execute(
+                    "DELETE FROM messages WHERE user_key = ? AND seq < ?",
+                    (user_key, len(chat_history) - self.max_messages)
+                )
+                head_digest = self._digest(chat_history[0]) if chat_history else None
+                tail_digest = self._digest(chat_history[-1]) if chat_history else None
+                self._conn.execute(
+                    """
+                    INSERT INTO conversations
+                        (user_key, thread_id, response_id, message_count, head_digest, tail_digest, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(user_key) DO UPDATE SET
+                        thread_id = excluded.thread_id,
+                        response_id = excluded.response_id,
+                        message_count = excluded.message_count,
+                        head_digest = excluded.head_digest,
+                        tail_digest = excluded.tail_digest,
+                        updated_at = excluded.updated_at
+                    """,
+                    (user_key, thread_id, response_id, len(chat_history), head_digest, tail_digest, now)
+                )
+                self._conn.execute("COMMIT")
+            except sqlite3.Error as e:
+                self._conn.execute("ROLLBACK")
+                store_logger.error(f"Failed to snapshot conversation for {user_key}: {e}")
+                return
+
+        if now - self._last_eviction > EVICTION_INTERVAL_SECONDS:
+            self.evict()
+
+    def load(self, user_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the stored conversation for a user, or None if missing or expired.
+
+        Returns:
+            dict with 'chat_history', 'thread_id', 'response_id' and 'updated_at'
+        """
+        if not user_key:
+            return None
+        with self._lock:
+            try:
+                row = self._conn.execute(
+                    "SELECT thread_id, response_id, updated_at FROM conversations WHERE user_key = ?",
+                    (user_key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                thread_id, response_id, updated_at = row
+                if time.time() - updated_at > self.ttl_seconds:
+                    return None
+                rows = self._conn.execute(
+                    "SELECT role, content FROM messages WHERE user_key = ? ORDER BY seq",
+                    (user_key,)
+                ).fetchall()
+            except sqlite3.Error as e:
+                store_logger.error(f"Failed to load conversation for {user_key}: {e}")
+                return None
+
+        chat_history = []
+        for role, content in rows:
+            try:
+                chat_history.append({"role": role, "content": json.loads(content)})
+            except json.JSONDecodeError:
+                chat_history.append({"role": role, "content": content})
+
+        return {
+            "chat_history": chat_history,
+            "thread_id": thread_id,
+            "response_id": response_id,
+            "updated_at": updated_at,
+        }
+
+    def clear(self, user_key: str) -> None:
+        """Remove the stored conversation for a user."""
+        if not user_key:
+            return
+        with self._lock:
+            try:
+                self._conn.execute("BEGIN")
+                self._conn.execute("DELETE FROM messages WHERE user_key = ?", (user_key,))
+                self._conn.execute("DELETE FROM conversations WHERE user_key = ?", (user_key,))
+                self._conn.execute("COMMIT")
+            except sqlite3.Error as e:
+                self._conn.execute("ROLLBACK")
+                store_logger.error(f"Failed to clear conversation for {user_key}: {e}")
+
+    def evict(self) -> int:
+        """
+        Drop expired conversations and enforce the conversation count cap.
+
+        Returns:
+            The number of conversations removed
+        """
+        now = time.time()
+        with self._lock:
+            self._last_eviction = now
+            try:
+                self._conn.execute("BEGIN")
+                stale_keys = [
+                    row[0] for row in self._conn.execute(
+                        "SELECT user_key FROM conversations WHERE updated_at < ?",
+                        (now - self.ttl_seconds,)
+                    )
+                ]
+                total = self._conn.execute("SELECT COUNT(*) FROM conversations").fetchone()[0]
+                overflow = total - len(stale_keys) - self.max_conversations
+                if overflow > 0:
+                    stale_keys += [
+                        row[0] for row in self._conn.execute(
+                            "SELECT user_key FROM conversations WHERE updated_at >= ? ORDER BY updated_at LIMIT ?",
+                            (now - self.ttl_seconds, overflow)
+                        )
+                    ]
+                if stale_keys:
+                    params = [(key,) for key in stale_keys]
+                    self._conn.executemany("DELETE FROM messages WHERE user_key = ?", params)
+                    self._conn.executemany("DELETE FROM conversations WHERE user_key = ?", params)
+                self._conn.execute("COMMIT")
+                return len(stale_keys)
+            except sqlite3.Error as e:
+                self._conn.execute("ROLLBACK")
+                store_logger.error(f"Failed to evict conversations: {e}")
+                return 0
@@ -0,0 +1,165 @@
+"""
+Buffered gamification event pipeline.
+
+Tracked actions enqueue their event and return immediately. Queued events
+are posted in batches on a background thread; the resulting gamification
+state is taken from the last event response when the backend includes it,
+or from a single refresh after the batch otherwise. A batch rejected with
+401 is requeued so the caller can refresh the access token on the main
+thread before the next flush.
+"""
+
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+queue_logger = logging.getLogger('gamification_queue')
+
+MAX_ATTEMPTS = 3  # per event, before it is dropped
+MAX_AUTH_RETRIES = 1  # re-posts after the access token was refreshed
+REQUEST_TIMEOUT_SECONDS = 10
+
+
+def extract_gamification_state(data: Any) -> Optional[Dict[str, Any]]:
+    """
+    Return the gamification state carried by an event response, if any.
+
+    The state is either nested under 'streamlit_data' or returned at the
+    top level in the same shape as ``/gamification/api/streamlit-data/``.
+    """
+    if not isinstance(data, dict):
+        return None
+    if isinstance(data.get('streamlit_data'), dict):
+        return data['streamlit_data']
+    if 'points' in data and ('meal_plan_streak' in data or 'level_name' in data):
+        return data
+    return None
+
+
+class GamificationEventQueue:
+    """
+    Session-scoped queue of gamification events with one flush in flight.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: List[Dict[str, Any]] = []
+        self._future = None
+
+    def enqueue(self, event_type: str, details: Optional[Dict[str, Any]] = None) -> None:
+        """Queue an event for the next flush."""
+        with self._lock:
+            self._pending.append({'event_type': event_type, 'details': details or {}, 'attempts': 0, 'auth_retries': 0})
+
+    @property
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def busy(self) -> bool:
+        """Return True while events are queued or a flush has not been collected."""
+        with self._lock:
+            return bool(self._pending) or self._future is not None
+
+    def start_flush(self, executor, session, base_url: str, headers: Dict[str, str]) -> bool:
+        """
+        Post all queued events on the executor unless a flush is already running.
+
+        Returns:
+            True if a flush was started
+        """
+        with self._lock:
+            if self._future is not None or not self._pending:
+                return False
+            batch, self._pending = self._pending, []
+            self._future = executor.submit(self._flush, batch, session, base_url, dict(headers))
+            return True
+
+    def collect(self) -> Dict[str, Any]:
+        """
+        Collect a finished flush.
+
+        Returns:
+            {'state': the refreshed gamification state, or None if no flush
+             has finished or the state could not be refreshed,
+             'auth_expired': True if events need a fresh access token}
+        """
+        with self._lock:
+            future = self._future
+            if future is None or not future.done():
+                return {'state': None, 'auth_expired': False}
+            self._future = None
+        try:
+            return future.result()
+        except Exception as e:
+            queue_logger.error(f"Gamification flush failed: {e}")
+            return {'state': None, 'auth_expired': False}
+
+    def _requeue(self, events: List[Dict[str, Any]], count_attempt: bool = True) -> None:
+        """Put failed events back at the front of the queue."""
+        retry = []
+        for event in events:
+            if not count_attempt:
+                retry.append(event)
+                continue
+            event['attempts'] += 1
+            if event['attempts'] < MAX_ATTEMPTS:
+                retry.append(event)
+            else:
+                queue_logger.error(f"Dropping gamification event {event['event_type']} after {MAX_ATTEMPTS} attempts")
+        with self._lock:
+            self._pending = retry + self._pending
+
+    def _flush(self, batch: List[Dict[str, Any]], session, base_url: str,
+               headers: Dict[str, str]) -> Dict[str, Any]:
+        """Post a batch of events and return the resulting state (background thread)."""
+        state = None
+        failed = []
+        unauthorized = []
+        posted = 0
+        for position, event in enumerate(batch):
+            try:
+                response = session.post(
+                    f"{base_url}/gamification/api/event/",
+                    json={'event_type': event['event_type'], 'details': event['details']},
+                    headers=headers,
+                    timeout=REQUEST_TIMEOUT_SECONDS,
+                )
+            except Exception as e:
+                queue_logger.error(f"Error posting gamification event: {e}")
+                failed.append(event)
+                continue
+            if response.status_code == 401 and event['auth_retries'] < MAX_AUTH_RETRIES:
+                # The token expired; the rest of the batch would be rejected too
+                for waiting in batch[position:]:
+                    waiting['auth_retries'] += 1
+                unauthorized = batch[position:]
+                break
+            if response.status_code != 200:
+                queue_logger.error(f"Failed to trigger gamification event: {response.status_code}")
+                failed.append(event)
+                continue
+            posted += 1
+            try:
+                state = extract_gamification_state(response.json()) or state
+            except ValueError:
+                pass
+
+        if unauthorized:
+            self._requeue(unauthorized, count_attempt=False)
+        if failed:
+            self._requeue(failed)
+
+        if posted and state is None:
+            # The event responses carried no state; refresh it once for the whole batch
+            try:
+                response = session.get(
+                    f"{base_url}/gamification/api/streamlit-data/",
+                    headers=headers,
+                    timeout=REQUEST_TIMEOUT_SECONDS,
+                )
+                if response.status_code == 200:
+                    state = response.json()
+            except Exception as e:
+                queue_logger.error(f"Error refreshing gamification data: {e}")
+        return {'state': state, 'auth_expired': bool(unauthorized)}
@@ -0,0 +1,117 @@
+"""
+Response cache for repeated first-turn guest assistant prompts.
+
+Guest traffic is dominated by the starter prompts and a handful of "what can
+you do" questions. When enabled, the SSE events of a completed first-turn
+guest response are stored under the normalized prompt and replayed through
+the normal streaming renderer on later hits, skipping the backend entirely.
+
+A replayed answer carries no response ID, so "first turn" cannot be told
+from a missing thread alone; the session records that a guest turn has
+happened (see mark_guest_turn) and later turns never touch the cache.
+"""
+
+import os
+import re
+import threading
+import unicodedata
+from typing import Any, Dict, List, MutableMapping, Optional
+
+from cachetools import TTLCache
+
+DEFAULT_ENABLED = os.getenv("GUEST_RESPONSE_CACHE_ENABLED", "false").lower() in ("1", "true", "yes")
+DEFAULT_TTL_SECONDS = int(os.getenv("GUEST_RESPONSE_CACHE_TTL_SECONDS", str(6 * 60 * 60)))
+DEFAULT_MAX_ENTRIES = int(os.getenv("GUEST_RESPONSE_CACHE_MAX_ENTRIES", "500"))
+MAX_PROMPT_CHARS = 300  # longer prompts are practically never repeated verbatim
+GUEST_TURNS_KEY = 'guest_turns'  # session flag set once the guest has sent a message
+
+# Only these events affect what the guest sees; everything else is dropped
+REPLAYABLE_EVENTS = {
+    "response.tool",
+    "response.function_call",
+    "response.function_call.arguments.delta",
+    "text",
+    "response.output_text.delta",
+    "response.completed",
+}
+
+
+def normalize_prompt(prompt: str) -> Optional[str]:
+    """
+    Reduce a prompt to its cache key.
+
+    Case, Unicode width variants, repeated whitespace and trailing
+    punctuation are ignored. Returns None for prompts that should not be
+    cached (empty or too long).
+    """
+    if not prompt:
+        return None
+    text = unicodedata.normalize("NFKC", prompt).casefold()
+    text = re.sub(r"\s+", " ", text).strip()
+    text = text.rstrip(" ?!.")
+    if not text or len(text) > MAX_PROMPT_CHARS:
+        return None
+    return text
+
+
+def is_first_guest_turn(session_state: MutableMapping[str, Any], thread_id: Optional[str]) -> bool:
+    """Return True if a guest message starts a conversation and may use the cache."""
+    return not thread_id and not session_state.get(GUEST_TURNS_KEY)
+
+
+def mark_guest_turn(session_state: MutableMapping[str, Any]) -> None:
+    """Record that the guest has sent a message, whether it was replayed or answered live."""
+    session_state[GUEST_TURNS_KEY] = True
+
+
+def reset_guest_turns(session_state: MutableMapping[str, Any]) -> None:
+    """Forget the guest's turns when a new conversation starts."""
+    session_state.pop(GUEST_TURNS_KEY, None)
+
+
+class GuestResponseCache:
+    """
+    Thread-safe TTL + LRU cache of recorded SSE event sequences.
+    """
+
+    def __init__(self, ttl_seconds: int = DEFAULT_TTL_SECONDS,
+                 max_entries: int = DEFAULT_MAX_ENTRIES,
+                 enabled: bool = DEFAULT_ENABLED):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._cache = TTLCache(maxsize=max_entries, ttl=ttl_seconds)
+
+    def get(self, prompt: str) -> Optional[List[Dict[str, Any]]]:
+        """Return the recorded events for a prompt, or None on a miss."""
+        key = normalize_prompt(prompt) if self.enabled else None
+        if key is None:
+            return None
+        with self._lock:
+            return self._cache.get(key)
+
+    def put(self, prompt: str, events: List[Dict[str, Any]]) -> bool:
+        """
+        Store the events of a completed response.
+
+        Only responses that produced text and finished with
+        ``response.completed`` are stored.
+
+        Returns:
+            True if the response was cached
+        """
+        key = normalize_prompt(prompt) if self.enabled else None
+        if key is None:
+            return False
+        events = [event for event in events if event.get("type") in REPLAYABLE_EVENTS]
+        has_text = any(event.get("type") in ("text", "response.output_text.delta") for event in events)
+        completed = bool(events) and events[-1].get("type") == "response.completed"
+        if not (has_text and completed):
+            return False
+        with self._lock:
+            self._cache[key] = events
+        return True
+
+    def clear(self) -> None:
+        """Drop every cached response."""
+        with self._lock:
+            self._cache.clear()
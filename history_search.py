@@ -0,0 +1,240 @@
+"""
+Full-text search over a user's assistant chat history.
+
+Thread titles and message content are indexed per user in an embedded SQLite
+FTS5 table. The index is synced incrementally from the backend's
+thread_history and thread_detail endpoints: only new threads and the messages
+added to existing threads since the last sync are written.
+"""
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional
+
+search_logger = logging.getLogger('history_search')
+
+DEFAULT_DB_PATH = os.getenv("HISTORY_INDEX_PATH", "history_index.sqlite3")
+
+# Titles weigh more than message bodies when ranking (bm25 column weights)
+TITLE_WEIGHT = 10.0
+CONTENT_WEIGHT = 1.0
+
+
+def build_match_query(query: str) -> Optional[str]:
+    """
+    Turn free text into a safe FTS5 MATCH expression.
+
+    Every word becomes a quoted prefix term so user input can never produce
+    an FTS5 syntax error, and partially typed words still match.
+    """
+    tokens = re.findall(r"\w+", query or "")
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+class HistorySearchIndex:
+    """
+    Per-user FTS5 index of chat thread titles and messages.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        if db_path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS threads (
+                user_key TEXT NOT NULL,
+                thread_id TEXT NOT NULL,
+                title TEXT,
+                created_at TEXT,
+                resume_id TEXT,
+                message_count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (user_key, thread_id)
+            ) WITHOUT ROWID;
+            CREATE VIRTUAL TABLE IF NOT EXISTS history_fts USING fts5(
+                user_key UNINDEXED,
+                thread_id UNINDEXED,
+                title,
+                content,
+                tokenize = 'porter unicode61'
+            );
+            """
+        )
+
+    def known_threads(self, user_key: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Return the indexed threads for a user.
+
+        Returns:
+            dict mapping thread_id to {'resume_id', 'message_count'}
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT thread_id, resume_id, message_count FROM threads WHERE user_key = ?",
+                (user_key,)
+            ).fetchall()
+        return {
+            thread_id: {'resume_id': resume_id, 'message_count': message_count}
+            for thread_id, resume_id, message_count in rows
+        }
+
+    def index_thread(self, user_key: str, thread: Dict[str, Any],
+                     messages: Optional[List[Dict[str, Any]]] = None) -> int:
+        """
+        Add a thread and any of its messages not yet indexed.
+
+        Args:
+            user_key: Owner of the thread
+            thread: A thread_history entry ('id', 'title', 'created_at', 'openai_thread_id')
+            messages: The thread's chat history sorted oldest first, if fetched
+
+        Returns:
+            The number of messages newly indexed
+        """
+        thread_id = str(thread['id'])
+        title = thread.get('title') or ''
+        resume_id = resume_id_for(thread)
+
+        with self._lock:
+            try:
+                self._conn.execute("BEGIN")
+                row = self._conn.execute(
+                    "SELECT title, message_count FROM threads WHERE user_key = ? AND thread_id = ?",
+                    (user_key, thread_id)
+                ).fetchone()
+
+                if row is None or row[0] != title:
+                    # (Re)index the title row
+                    self._conn.execute(
+                        "DELETE FROM history_fts WHERE user_key = ? AND thread_id = ? AND content = ''",
+                        (user_key, thread_id)
+                    )
+                    self._conn.execute(
+                        "INSERT INTO history_fts (user_key, thread_id, title, content) VALUES (?, ?, ?, '')",
+                        (user_key, thread_id, title)
+                    )
+
+                message_count = row[1] if row is not None else 0
+                new_messages = []
+                if messages is not None:
+                    if len(messages) < message_count:
+                        # The backend history shrank; rebuild this thread's message rows
+                        self._conn.execute(
+                            "DELETE FROM history_fts WHERE user_key = ? AND thread_id = ? AND content != ''",
+                            (user_key, thread_id)
+                        )
+                        message_count = 0
+                    new_messages = [
+                        (user_key, thread_id, str(msg.get('content') or ''))
+                        for msg in messages[message_count:]
+                        if msg.get('content')
+                    ]
+                    if new_messages:
+                        self._conn.executemany(
+                            "INSERT INTO history_fts (user_key, thread_id, title, content) VALUES (?, ?, '', ?)",
+                            new_messages
+                        )
+                    message_count = len(messages)
+
+                self._conn.execute(
+                    """
+                    INSERT INTO threads (user_key, thread_id, title, created_at, resume_id, message_count)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(user_key, thread_id) DO UPDATE SET
+                        title = excluded.title,
+                        created_at = excluded.created_at,
+                        resume_id = excluded.resume_id,
+                        message_count = excluded.message_count
+                    """,
+                    (user_key, thread_id, title, thread.get('created_at'), resume_id, message_count)
+                )
+                self._conn.execute("COMMIT")
+                return len(new_messages)
+            except sqlite3.Error as e:
+                self._conn.execute("ROLLBACK")
+                search_logger.error(f"Failed to index thread {thread_id} for {user_key}: {e}")
+                return 0
+
+    def search(self, user_key: str, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Return the user's threads ranked by relevance to the query.
+
+        Returns:
+            list of dicts with 'thread_id', 'title', 'created_at', 'resume_id',
+            'snippet' and 'score' (lower is better), best match first
+        """
+        match = build_match_query(query)
+        if not match:
+            return []
+
+        with self._lock:
+            try:
+                rows = self._conn.execute(
+                    """
+                    SELECT f.thread_id,
+                           bm25(history_fts, 0.0, 0.0, ?, ?) AS score,
+                           snippet(history_fts, -1, '**', '**', '…', 12),
+                           t.title, t.created_at, t.resume_id
+                    FROM history_fts AS f
+                    JOIN threads AS t ON t.user_key = f.user_key AND t.thread_id = f.thread_id
+                    WHERE history_fts MATCH ? AND f.user_key = ?
+                    ORDER BY score
+                    LIMIT ?
+                    """,
+                    (TITLE_WEIGHT, CONTENT_WEIGHT, match, user_key, limit * 10)
+                ).fetchall()
+            except sqlite3.Error as e:
+                search_logger.error(f"History search failed for {user_key}: {e}")
+                return []
+
+        # Keep the best-ranked hit for each thread
+        results = []
+        seen = set()
+        for thread_id, score, snippet, title, created_at, resume_id in rows:
+            if thread_id in seen:
+                continue
+            seen.add(thread_id)
+            results.append({
+                'thread_id': thread_id,
+                'title': title,
+                'created_at': created_at,
+                'resume_id': resume_id,
+                'snippet': snippet,
+                'score': score,
+            })
+            if len(results) >= limit:
+                break
+        return results
+
+    def clear(self, user_key: str) -> None:
+        """Drop everything indexed for a user."""
+        with self._lock:
+            try:
+                self._conn.execute("BEGIN")
+                self._conn.execute("DELETE FROM history_fts WHERE user_key = ?", (user_key,))
+                self._conn.execute("DELETE FROM threads WHERE user_key = ?", (user_key,))
+                self._conn.execute("COMMIT")
+            except sqlite3.Error as e:
+                self._conn.execute("ROLLBACK")
+                search_logger.error(f"Failed to clear history index for {user_key}: {e}")
+
+
+def resume_id_for(thread: Dict[str, Any]) -> Optional[str]:
+    """
+    Return the response ID used to continue a thread.
+
+    openai_thread_id may be a list of response IDs (most recent last) or a
+    single string.
+    """
+    thread_ids = thread.get('openai_thread_id', [])
+    if isinstance(thread_ids, list):
+        return thread_ids[-1] if thread_ids else None
+    return thread_ids or None
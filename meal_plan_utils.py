@@ -0,0 +1,972 @@
+"""
+Helpers for the meal plans page that do not depend on Streamlit.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+import pandas as pd
+from cachetools import LRUCache, TTLCache
+
+meal_plan_logger = logging.getLogger('meal_plan_utils')
+
+MEAL_DETAIL_TTL_SECONDS = 30 * 60
+MEAL_DETAIL_MAX_ENTRIES = 5000
+
+
+def extract_preference_names(meal_detail: Dict[str, Any]) -> FrozenSet[str]:
+    """
+    Return the dietary preference names of a meal detail response.
+
+    The backend returns either a list of {'name': ...} objects or a list of
+    plain strings.
+    """
+    names = set()
+    for pref in meal_detail.get('dietary_preferences') or []:
+        if isinstance(pref, dict):
+            if pref.get('name'):
+                names.add(pref['name'])
+        elif isinstance(pref, str):
+            names.add(pref)
+    return frozenset(names)
+
+
+class MealPreferenceIndex:
+    """
+    TTL cache mapping meal IDs to their dietary preference sets.
+
+    Dietary filtering becomes a set-containment check against this index;
+    only meals missing from it need to be fetched from the backend.
+    """
+
+    def __init__(self, ttl_seconds: int = MEAL_DETAIL_TTL_SECONDS,
+                 max_entries: int = MEAL_DETAIL_MAX_ENTRIES):
+        self._lock = threading.Lock()
+        self._preferences = TTLCache(maxsize=max_entries, ttl=ttl_seconds)
+
+    def missing(self, meal_ids: Iterable[Any]) -> List[Any]:
+        """Return the meal IDs that are not cached, preserving order."""
+        with self._lock:
+            return [meal_id for meal_id in dict.fromkeys(meal_ids) if meal_id not in self._preferences]
+
+    def add(self, meal_id: Any, meal_detail: Dict[str, Any]) -> None:
+        """Index a meal detail response."""
+        preferences = extract_preference_names(meal_detail)
+        with self._lock:
+            self._preferences[meal_id] = preferences
+
+    def get(self, meal_id: Any) -> Optional[FrozenSet[str]]:
+        """Return a meal's preference set, or None if it is not cached."""
+        with self._lock:
+            return self._preferences.get(meal_id)
+
+    def matching(self, meal_ids: Iterable[Any], required: Iterable[str]) -> List[Any]:
+        """
+        Return the cached meals whose preferences include every required one.
+
+        Meals that are not cached never match.
+        """
+        required = set(required)
+        with self._lock:
+            return [
+                meal_id for meal_id in dict.fromkeys(meal_ids)
+                if meal_id in self._preferences and required <= self._preferences[meal_id]
+            ]
+
+    def invalidate(self, meal_ids: Optional[Iterable[Any]] = None) -> None:
+        """Forget some meals, or every meal when no IDs are given."""
+        with self._lock:
+            if meal_ids is None:
+                self._preferences.clear()
+                return
+            for meal_id in meal_ids:
+                self._preferences.pop(meal_id, None)
+
+
+MEAL_PLAN_WEEK_TTL_SECONDS = 5 * 60
+MEAL_PLAN_MAX_WEEKS = 8
+
+
+def first_meal_plan(meal_plan_data: Any) -> Optional[Dict[str, Any]]:
+    """
+    Return the first meal plan of a ``/meals/api/meal_plans/`` response.
+
+    Handles the {'meal_plans': [...]}, plain list and paginated
+    {'results': [...]} formats. Returns None when the week has no plan.
+    """
+    if isinstance(meal_plan_data, dict):
+        meal_plans = meal_plan_data.get('meal_plans', meal_plan_data.get('results'))
+    else:
+        meal_plans = meal_plan_data
+    if isinstance(meal_plans, list) and meal_plans and isinstance(meal_plans[0], dict):
+        return meal_plans[0]
+    return None
+
+
+DAY_ORDER = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+MEAL_TYPE_ORDER = ['Breakfast', 'Lunch', 'Dinner']
+DAY_OFFSET = {day: offset for offset, day in enumerate(DAY_ORDER)}
+DAY_DTYPE = pd.CategoricalDtype(DAY_ORDER, ordered=True)
+MEAL_TYPE_DTYPE = pd.CategoricalDtype(MEAL_TYPE_ORDER, ordered=True)
+
+MEAL_PLAN_COLUMNS = [
+    'Select', 'Meal Plan ID', 'Meal Plan Meal ID', 'meal_id', 'Meal Date', 'Meal Name',
+    'Day', 'Meal Type', 'Description', 'is_chef_meal', 'chef_name', 'price', 'date_key',
+]
+
+
+def _is_chef_meal(m: Dict[str, Any]) -> bool:
+    """Chef meals are flagged at the top level, on the meal, or by a chef name."""
+    meal = m.get('meal') if isinstance(m.get('meal'), dict) else {}
+    return bool(m.get('is_chef_meal') or meal.get('is_chef_meal') or m.get('chef_name') is not None)
+
+
+def _chef_meal_price(meal: Dict[str, Any]) -> Any:
+    """Prefer the current event price, then the meal's own price."""
+    events = meal.get('chef_meal_events')
+    if events:
+        return events[0].get('current_price', meal.get('current_price', meal.get('price')))
+    return meal.get('current_price', meal.get('price'))
+
+
+def build_meal_plan_table(meal_plan: Dict[str, Any], week_start: date) -> pd.DataFrame:
+    """
+    Convert a meal plan into a typed, sorted table.
+
+    Columns are built as arrays in one pass: 'Day' and 'Meal Type' are
+    ordered categoricals, 'Meal Date' holds dates and 'date_key' their
+    ISO strings. 'chef_name' and 'price' back the source badges and
+    tooltips. Rows are sorted by day, then meal type.
+    """
+    meals = (meal_plan or {}).get('meals') or []
+    meal_plan_id = (meal_plan or {}).get('id')
+    columns: Dict[str, List[Any]] = {name: [] for name in MEAL_PLAN_COLUMNS}
+
+    for m in meals:
+        meal = m['meal']
+        meal_date = week_start + timedelta(days=DAY_OFFSET.get(m['day'], 0))
+        is_chef = _is_chef_meal(m)
+        columns['Select'].append(False)
+        columns['Meal Plan ID'].append(meal_plan_id)
+        columns['Meal Plan Meal ID'].append(m['meal_plan_meal_id'])
+        columns['meal_id'].append(meal['id'])
+        columns['Meal Date'].append(meal_date)
+        columns['Meal Name'].append(meal['name'])
+        columns['Day'].append(m['day'])
+        columns['Meal Type'].append(m['meal_type'])
+        columns['Description'].append(meal.get('description'))
+        columns['is_chef_meal'].append(is_chef)
+        columns['chef_name'].append(m.get('chef_name') if is_chef else None)
+        columns['price'].append(_chef_meal_price(meal) if is_chef else None)
+        columns['date_key'].append(meal_date.isoformat())
+
+    table = pd.DataFrame({
+        'Select': pd.Series(columns['Select'], dtype=bool),
+        'Meal Plan ID': pd.Series(columns['Meal Plan ID'], dtype='int64' if meal_plan_id is not None else object),
+        'Meal Plan Meal ID': pd.Series(columns['Meal Plan Meal ID'], dtype='int64'),
+        'meal_id': pd.Series(columns['meal_id'], dtype='int64'),
+        'Meal Date': pd.Series(columns['Meal Date'], dtype=object),
+        'Meal Name': pd.Series(columns['Meal Name'], dtype=object),
+        'Day': pd.Categorical(columns['Day'], dtype=DAY_DTYPE),
+        'Meal Type': pd.Categorical(columns['Meal Type'], dtype=MEAL_TYPE_DTYPE),
+        'Description': pd.Series(columns['Description'], dtype=object),
+        'is_chef_meal': pd.Series(columns['is_chef_meal'], dtype=bool),
+        'chef_name': pd.Series(columns['chef_name'], dtype=object),
+        'price': pd.Series(columns['price'], dtype=object),
+        'date_key': pd.Series(columns['date_key'], dtype=object),
+    })
+    return table.sort_values(['Day', 'Meal Type'], kind='stable').reset_index(drop=True)
+
+
+def source_badges(table: pd.DataFrame) -> pd.Series:
+    """Return the 'Source' badge for each row of a meal plan table."""
+    return pd.Series(
+        table['is_chef_meal'].map({True: "👨‍🍳 CHEF", False: "🤖 ASSISTANT"}),
+        index=table.index,
+    )
+
+
+def source_help_texts(table: pd.DataFrame) -> pd.Series:
+    """Return the source tooltip for each row of a meal plan table."""
+    default = "Meal source: Chef-created or AI-generated"
+    has_chef = table['is_chef_meal'] & table['chef_name'].notna()
+    prices = table['price'].where(table['price'].notna(), 'Price not available').astype(str)
+    chef_text = "Created by Chef " + table['chef_name'].astype(str) + " - Price: $" + prices
+    return chef_text.where(has_chef, default)
+
+
+class MealPlanWeekCache:
+    """
+    Session-scoped cache of meal plans keyed by week start date.
+
+    Each week holds the meal plan list response and, once fetched, the plan
+    details. Mutations either update the cached week in place, when the
+    outcome is known locally, or invalidate just that week. Adjacent weeks
+    are written from background prefetch threads, so access is locked and
+    the number of cached weeks is bounded.
+    """
+
+    def __init__(self, ttl_seconds: int = MEAL_PLAN_WEEK_TTL_SECONDS,
+                 max_weeks: int = MEAL_PLAN_MAX_WEEKS):
+        self.ttl_seconds = ttl_seconds
+        self.max_weeks = max_weeks
+        self._lock = threading.RLock()
+        self._weeks: Dict[str, Dict[str, Any]] = {}
+        self._versions: Dict[str, int] = {}
+
+    @staticmethod
+    def _key(week_start: Any) -> str:
+        return week_start.isoformat() if hasattr(week_start, 'isoformat') else str(week_start)
+
+    def version(self, week_start: Any) -> int:
+        """Return a counter that changes whenever the week is invalidated."""
+        with self._lock:
+            return self._versions.get(self._key(week_start), 0)
+
+    def get(self, week_start: Any) -> Optional[Dict[str, Any]]:
+        """
+        Return the cached week, or None if missing or expired.
+
+        Returns:
+            dict with 'meal_plan_data', 'details' (None until fetched) and 'cached_at'
+        """
+        key = self._key(week_start)
+        with self._lock:
+            entry = self._weeks.get(key)
+            if entry is None:
+                return None
+            if time.time() - entry['cached_at'] > self.ttl_seconds:
+                del self._weeks[key]
+                return None
+            return entry
+
+    def put(self, week_start: Any, meal_plan_data: Any, if_version: Optional[int] = None) -> bool:
+        """
+        Cache a week's meal plan list response.
+
+        Weeks without a plan are not cached so a newly generated plan shows
+        up on the next rerun.
+
+        Args:
+            week_start: The week's start date
+            meal_plan_data: The ``/meals/api/meal_plans/`` response body
+            if_version: Only store if the week has not been invalidated since
+                this version was read (used by background prefetches)
+
+        Returns:
+            True if the week was cached
+        """
+        key = self._key(week_start)
+        with self._lock:
+            if if_version is not None and self._versions.get(key, 0) != if_version:
+                return False
+            if first_meal_plan(meal_plan_data) is None:
+                self._weeks.pop(key, None)
+                return False
+            self._weeks[key] = {
+                'meal_plan_data': meal_plan_data,
+                'details': None,
+                'table': None,
+                'cached_at': time.time(),
+            }
+            # Evict the oldest weeks beyond the cap
+            while len(self._weeks) > self.max_weeks:
+                oldest = min(self._weeks, key=lambda k: self._weeks[k]['cached_at'])
+                del self._weeks[oldest]
+            return True
+
+    def table(self, week_start: date) -> Optional[pd.DataFrame]:
+        """
+        Return the week's meal plan table, built once per cached plan version.
+
+        Callers must copy the table before modifying it.
+        """
+        with self._lock:
+            entry = self.get(week_start)
+            if entry is None:
+                return None
+            if entry.get('table') is None:
+                entry['table'] = build_meal_plan_table(first_meal_plan(entry['meal_plan_data']), week_start)
+            return entry['table']
+
+    def put_details(self, week_start: Any, details: Dict[str, Any]) -> None:
+        """Attach the plan details to a cached week."""
+        with self._lock:
+            entry = self.get(week_start)
+            if entry is not None:
+                entry['details'] = details
+
+    def invalidate(self, week_start: Any = None) -> None:
+        """Drop one week, or every week when no week is given."""
+        with self._lock:
+            keys = list(self._weeks) if week_start is None else [self._key(week_start)]
+            for key in keys:
+                self._weeks.pop(key, None)
+                self._versions[key] = self._versions.get(key, 0) + 1
+
+    def apply_approval(self, week_start: Any, meal_prep_preference: Optional[str] = None,
+                       order_id: Any = None, requires_payment: bool = False) -> bool:
+        """
+        Mark a cached week as approved.
+
+        Returns:
+            False if the week is not fully cached; it is invalidated instead
+        """
+        with self._lock:
+            entry = self.get(week_start)
+            meal_plan = first_meal_plan(entry['meal_plan_data']) if entry else None
+            if meal_plan is None or entry['details'] is None:
+                self.invalidate(week_start)
+                return False
+            details = entry['details']
+            details['is_approved'] = True
+            details['payment_required'] = bool(order_id and requires_payment)
+            details['pending_order_id'] = order_id if requires_payment else None
+            if meal_prep_preference:
+                meal_plan['meal_prep_preference'] = meal_prep_preference
+                details['meal_prep_preference'] = meal_prep_preference
+            return True
+
+    def remove_meals(self, week_start: Any, meal_plan_meal_ids: Iterable[Any]) -> bool:
+        """
+        Drop removed meals from a cached week.
+
+        Returns:
+            False if the week is not cached
+        """
+        with self._lock:
+            entry = self.get(week_start)
+            meal_plan = first_meal_plan(entry['meal_plan_data']) if entry else None
+            if meal_plan is None:
+                return False
+            removed = set(meal_plan_meal_ids)
+            meal_plan['meals'] = [
+                meal for meal in meal_plan.get('meals', [])
+                if meal.get('meal_plan_meal_id') not in removed
+            ]
+            entry['table'] = None
+            return True
+
+
+def prefetch_meal_plan_week(session, base_url: str, headers: Dict[str, str],
+                            week_start: Any, week_cache: MealPlanWeekCache) -> bool:
+    """
+    Fetch a week's meal plan and details into the cache.
+
+    Runs on a background thread: it only performs HTTP calls on the given
+    requests session and never touches Streamlit state. Any failure,
+    including an expired token, simply leaves the week uncached for the
+    page to fetch normally.
+
+    Returns:
+        True if the week was cached
+    """
+    if week_cache.get(week_start) is not None:
+        return True
+    version = week_cache.version(week_start)
+    try:
+        response = session.get(
+            f"{base_url}/meals/api/meal_plans/",
+            params={'week_start_date': str(week_start)},
+            headers=headers,
+            timeout=30,
+        )
+        if response.status_code != 200:
+            return False
+        meal_plan_data = response.json()
+        meal_plan = first_meal_plan(meal_plan_data)
+        if not week_cache.put(week_start, meal_plan_data, if_version=version):
+            return False
+
+        details_resp = session.get(
+            f"{base_url}/meals/api/meal_plans/{meal_plan['id']}/",
+            headers=headers,
+            timeout=30,
+        )
+        if details_resp.status_code == 200:
+            week_cache.put_details(week_start, details_resp.json())
+        return True
+    except Exception as e:
+        meal_plan_logger.warning(f"Prefetch of week {week_start} failed: {e}")
+        return False
+
+
+INSTRUCTION_CACHE_MAX_ENTRIES = 256
+
+
+def instruction_label(instruction_item: Dict[str, Any], idx: int) -> str:
+    """Return the selectbox label of an instruction item."""
+    instruction_type = instruction_item.get('instruction_type', 'Unknown')
+    item_date = instruction_item.get('date', 'No Date')
+    if instruction_type == 'bulk_prep':
+        return "Bulk Prep Instructions"
+    if instruction_type == 'follow_up':
+        return f"Follow-Up Instructions for {item_date}"
+    if instruction_type == 'daily':
+        return f"{instruction_item.get('meal_name', 'Unknown Meal')} - {item_date}"
+    return f"Instructions {idx}"
+
+
+def parse_instruction(instruction_item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Parse an instruction item into a render-ready dict.
+
+    Returns:
+        dict with 'instruction_type', 'title', 'total_estimated_time' (or
+        None) and 'steps' (dicts with 'step_number', 'description',
+        'duration' and 'ingredients'), or None if the instructions are not
+        available yet
+
+    Raises:
+        ValueError: if the instructions are malformed or of an unknown type
+    """
+    instructions_json_str = instruction_item.get('instructions')
+    if not instructions_json_str:
+        return None
+    instruction_type = instruction_item.get('instruction_type', 'Unknown')
+    instructions_data = json.loads(instructions_json_str)
+    item_date = instruction_item.get('date')
+    total_estimated_time = None
+
+    if instruction_type == 'bulk_prep':
+        if isinstance(instructions_data, dict):
+            steps = instructions_data.get('bulk_prep_steps', [])
+        elif isinstance(instructions_data, list):
+            steps = instructions_data
+        else:
+            raise ValueError("Unexpected format of bulk prep instructions.")
+        title = "Bulk Meal Prep Instructions"
+    elif instruction_type == 'follow_up':
+        if isinstance(instructions_data, dict):
+            steps = instructions_data.get('tasks', [])
+            day = instructions_data.get('day', item_date or 'Unknown Day')
+            total_estimated_time = instructions_data.get('total_estimated_time', 'N/A')
+        elif isinstance(instructions_data, list):
+            steps = instructions_data
+            day = item_date or 'Unknown Day'
+            total_estimated_time = 'N/A'
+        else:
+            raise ValueError("Unexpected format of follow-up instructions.")
+        title = f"Follow-Up Instructions for {day}"
+    elif instruction_type == 'daily':
+        if not isinstance(instructions_data, dict):
+            raise ValueError("Unexpected format of daily instructions.")
+        steps = instructions_data.get('steps', [])
+        meal_name = instruction_item.get('meal_name', 'Unknown Meal')
+        title = f"Instructions for {meal_name} on {item_date or 'Unknown Date'}"
+    else:
+        raise ValueError("Unknown instruction type.")
+
+    return {
+        'instruction_type': instruction_type,
+        'title': title,
+        'total_estimated_time': total_estimated_time,
+        'steps': [
+            {
+                'step_number': step.get('step_number', 'N/A'),
+                'description': step.get('description', 'No description provided.'),
+                'duration': step.get('duration', 'N/A'),
+                'ingredients': step.get('ingredients') or [],
+            }
+            for step in steps
+        ],
+    }
+
+
+def instructions_complete(instructions: List[Dict[str, Any]], meal_plan_meal_ids: Iterable[Any]) -> bool:
+    """
+    Return True once instructions exist for every requested meal.
+
+    Daily instructions are matched by meal plan meal; bulk prep covers every
+    meal at once. Items still waiting for their text never count as done.
+    """
+    if not instructions or any(not item.get('instructions') for item in instructions):
+        return False
+    if any(item.get('instruction_type') == 'bulk_prep' for item in instructions):
+        return True
+    ready = {str(item.get('meal_plan_meal_id')) for item in instructions if item.get('meal_plan_meal_id') is not None}
+    return all(str(meal_id) in ready for meal_id in meal_plan_meal_ids)
+
+
+class InstructionParseCache:
+    """
+    LRU cache of parsed instructions.
+
+    Entries are keyed by meal plan meal (or instruction type and date for
+    bulk and follow-up instructions) plus a version: the backend's
+    ``updated_at`` when present, otherwise a digest of the raw JSON. A
+    regenerated instruction therefore gets a new entry, while switching
+    between already parsed instructions never parses again.
+    """
+
+    def __init__(self, max_entries: int = INSTRUCTION_CACHE_MAX_ENTRIES):
+        self._lock = threading.Lock()
+        self._parsed = LRUCache(maxsize=max_entries)
+
+    @staticmethod
+    def key(instruction_item: Dict[str, Any]) -> tuple:
+        """Return the (owner, version) cache key of an instruction item."""
+        owner = (
+            instruction_item.get('meal_plan_meal_id')
+            or (instruction_item.get('instruction_type'), instruction_item.get('date'), instruction_item.get('meal_name'))
+        )
+        version = instruction_item.get('updated_at') or hashlib.sha1(
+            str(instruction_item.get('instructions') or '').encode('utf-8')
+        ).hexdigest()
+        return owner, version
+
+    def get(self, instruction_item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Return the parsed instructions, parsing only on the first request.
+
+        Raises:
+            ValueError: if the instructions cannot be parsed
+        """
+        key = self.key(instruction_item)
+        with self._lock:
+            if key in self._parsed:
+                return self._parsed[key]
+        parsed = parse_instruction(instruction_item)
+        if parsed is not None:
+            with self._lock:
+                self._parsed[key] = parsed
+        return parsed
+
+
+class InstacartLinkCache:
+    """
+    Session cache of Instacart shopping-list links per meal plan.
+
+    Holds the last known link status of each plan and any background
+    generation job. Plans whose meals changed are flagged so the next
+    generation asks the backend to rebuild the list.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._links: Dict[Any, Dict[str, Any]] = {}
+        self._jobs: Dict[Any, Any] = {}
+        self._stale: Set[Any] = set()
+
+    def get(self, meal_plan_id: Any) -> Optional[Dict[str, Any]]:
+        """Return {'instacart_url', 'has_url'} for a plan, or None if unknown."""
+        with self._lock:
+            return self._links.get(meal_plan_id)
+
+    def put(self, meal_plan_id: Any, instacart_url: Optional[str], has_url: bool) -> None:
+        """Record a plan's link status."""
+        with self._lock:
+            self._links[meal_plan_id] = {'instacart_url': instacart_url, 'has_url': bool(has_url and instacart_url)}
+
+    def invalidate(self, meal_plan_id: Any, meals_changed: bool = False) -> None:
+        """Forget a plan's link status, optionally flagging its list as outdated."""
+        with self._lock:
+            self._links.pop(meal_plan_id, None)
+            if meals_changed:
+                self._stale.add(meal_plan_id)
+
+    def needs_refresh(self, meal_plan_id: Any) -> bool:
+        """Return True if the plan's meals changed since its list was built."""
+        with self._lock:
+            return meal_plan_id in self._stale
+
+    def start_job(self, meal_plan_id: Any, future: Any) -> None:
+        """Track a background generation job for a plan."""
+        with self._lock:
+            self._jobs[meal_plan_id] = future
+
+    def job(self, meal_plan_id: Any) -> Any:
+        """Return the plan's generation job, if any."""
+        with self._lock:
+            return self._jobs.get(meal_plan_id)
+
+    def finish_job(self, meal_plan_id: Any) -> Optional[Dict[str, Any]]:
+        """
+        Collect a finished generation job.
+
+        Returns:
+            The job result, or None if no job has finished. A successful
+            result updates the cached link and clears the outdated flag.
+        """
+        with self._lock:
+            future = self._jobs.get(meal_plan_id)
+            if future is None or not future.done():
+                return None
+            del self._jobs[meal_plan_id]
+        try:
+            result = future.result()
+        except Exception as e:
+            result = {'status': 'error', 'message': str(e)}
+        if result.get('status') == 'success' and result.get('instacart_url'):
+            self.put(meal_plan_id, result['instacart_url'], True)
+            with self._lock:
+                self._stale.discard(meal_plan_id)
+        return result
+
+
+def request_instacart_link(session, base_url: str, headers: Dict[str, str],
+                           payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Ask the backend to build an Instacart shopping list.
+
+    Runs on a background thread and never touches Streamlit state.
+
+    Returns:
+        dict with 'status' ('success' or 'error'), 'instacart_url' and 'message'
+    """
+    try:
+        response = session.post(
+            f"{base_url}/meals/api/generate-instacart-link/",
+            json=payload,
+            headers=headers,
+            timeout=120,
+        )
+    except Exception as e:
+        meal_plan_logger.error(f"Error generating Instacart link: {e}")
+        return {'status': 'error', 'instacart_url': None, 'message': 'Failed to generate Instacart link'}
+
+    if response.status_code == 401:
+        return {'status': 'error', 'instacart_url': None, 'message': 'Your session expired. Please try again.'}
+    if response.status_code != 200:
+        return {'status': 'error', 'instacart_url': None, 'message': f"API error: {response.status_code}"}
+    data = response.json()
+    if data.get('status') == 'success' and data.get('instacart_url'):
+        return {'status': 'success', 'instacart_url': data['instacart_url'], 'message': data.get('message')}
+    return {
+        'status': 'error',
+        'instacart_url': None,
+        'message': data.get('message', 'Failed to generate Instacart link'),
+    }
+
+
+REVIEW_CACHE_TTL_SECONDS = 5 * 60
+REVIEW_CACHE_MAX_ENTRIES = 500
+
+
+def review_list(data: Any) -> List[Dict[str, Any]]:
+    """Return the reviews of a plain list or a paginated {'results': [...]} response."""
+    if isinstance(data, dict):
+        data = data.get('results', [])
+    return data if isinstance(data, list) else []
+
+
+class ReviewCache:
+    """
+    TTL cache of review lists keyed by (kind, object ID).
+
+    ``kind`` is the reviews API segment: 'meal' or 'meal_plan'. Only the
+    first page of a long list is kept; the current user's own review,
+    which may sit on a later page, is remembered separately once looked up.
+    Posting a review invalidates the reviewed object's entry.
+    """
+
+    def __init__(self, ttl_seconds: int = REVIEW_CACHE_TTL_SECONDS,
+                 max_entries: int = REVIEW_CACHE_MAX_ENTRIES):
+        self._lock = threading.Lock()
+        self._reviews = TTLCache(maxsize=max_entries, ttl=ttl_seconds)
+
+    def get(self, kind: str, object_id: Any) -> Optional[List[Dict[str, Any]]]:
+        """Return the cached reviews of an object, or None if not cached."""
+        with self._lock:
+            entry = self._reviews.get((kind, object_id))
+            return entry['reviews'] if entry is not None else None
+
+    def missing(self, kind: str, object_ids: Iterable[Any]) -> List[Any]:
+        """Return the object IDs whose reviews are not cached, preserving order."""
+        with self._lock:
+            return [oid for oid in dict.fromkeys(object_ids) if (kind, oid) not in self._reviews]
+
+    def put(self, kind: str, object_id: Any, reviews: List[Dict[str, Any]], has_more: bool = False) -> None:
+        """Cache the reviews of an object; has_more marks a list cut off at the first page."""
+        with self._lock:
+            self._reviews[(kind, object_id)] = {'reviews': reviews, 'has_more': has_more, 'own': {}}
+
+    def user_review(self, kind: str, object_id: Any, user_id: Any) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """
+        Look up a user's own review of an object.
+
+        Returns:
+            (known, review): known is False when the review may be on a page
+            that has not been fetched; review is None if the user has none
+        """
+        with self._lock:
+            entry = self._reviews.get((kind, object_id))
+            if entry is None:
+                return False, None
+            for review in entry['reviews']:
+                if review.get('user') == user_id:
+                    return True, review
+            if user_id in entry['own']:
+                return True, entry['own'][user_id]
+            return not entry['has_more'], None
+
+    def set_user_review(self, kind: str, object_id: Any, user_id: Any, review: Optional[Dict[str, Any]]) -> None:
+        """Remember a user's own review (or that there is none) found on a later page."""
+        with self._lock:
+            entry = self._reviews.get((kind, object_id))
+            if entry is not None:
+                entry['own'][user_id] = review
+
+    def invalidate(self, kind: str, object_id: Any) -> None:
+        """Forget the reviews of an object."""
+        with self._lock:
+            self._reviews.pop((kind, object_id), None)
+
+
+CHEF_MEALS_TTL_SECONDS = 60
+CHEF_MEALS_STALE_SECONDS = 120
+CHEF_MEALS_WEEK_PAGE_SIZE = 50
+CHEF_MEALS_MAX_WORKERS = 4
+NO_RESTRICTION_NAMES = {'', 'everything', 'none'}
+
+
+def normalize_postal_code(postal_code: Any) -> str:
+    """Return a postal code in the form used for shared cache keys."""
+    return ''.join(str(postal_code or '').split()).upper()
+
+
+def chef_meals_area_key(country: Any, postal_code: Any) -> Tuple:
+    """
+    Return the shared cache key prefix of the chef meals in a postal code.
+
+    Postal codes repeat across countries, so the country is part of the key.
+    """
+    return ('chef_meals', str(country or '').strip().upper(), normalize_postal_code(postal_code))
+
+
+def chef_meals_cache_key(country: Any, postal_code: Any, week_start: Any) -> Tuple:
+    """Return the shared cache key of a week of chef meals in a postal code."""
+    return chef_meals_area_key(country, postal_code) + (str(week_start),)
+
+
+def load_chef_meals(session, base_url: str, headers: Dict[str, str],
+                    params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Fetch one page of a chef meal listing.
+
+    The listing is requested without the compatibility filter and the
+    requester's ``is_compatible`` flags are removed, so the result is the
+    same for everyone in the postal code.
+
+    Raises:
+        RuntimeError: if the backend does not answer with 200
+    """
+    response = session.get(
+        f"{base_url}/meals/api/chef-meals-by-postal-code/",
+        params={key: value for key, value in params.items() if key != 'include_compatible_only'},
+        headers=headers,
+        timeout=30,
+    )
+    if response.status_code != 200:
+        raise RuntimeError(f"Failed to fetch chef meals: {response.status_code}")
+    data = response.json()
+    listing = data.get('data') or {}
+    listing['meals'] = [
+        {key: value for key, value in meal.items() if key != 'is_compatible'}
+        for meal in listing.get('meals') or []
+    ]
+    data['data'] = listing
+    return data
+
+
+def _chef_id(meal: Dict[str, Any]) -> Any:
+    """Return the chef ID of a listed meal ('chef_id' or a nested 'chef' object)."""
+    chef = meal.get('chef')
+    return meal.get('chef_id', chef.get('id') if isinstance(chef, dict) else chef)
+
+
+def _as_price(value: Any) -> Optional[float]:
+    """Return a price as float, or None if it is missing or not numeric."""
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class ChefMealEventIndex:
+    """
+    meal_id -> event date -> event summary, built once per listing.
+
+    Each summary has 'event_id', 'day_name', 'event_time', 'orders_count',
+    'max_orders', 'remaining', 'capacity_pct' (None without a cap) and
+    'price' (the event price, falling back to the meal's base price).
+    """
+
+    def __init__(self, meals: Iterable[Dict[str, Any]]):
+        self._events: Dict[Any, Dict[str, Dict[str, Any]]] = {}
+        self._base_prices: Dict[Any, float] = {}
+        for meal in meals:
+            meal_events = meal.get('chef_meal_events') or []
+            event_prices = {event.get('id'): _as_price(event.get('current_price')) for event in meal_events}
+            base_price = _as_price(meal_events[0].get('current_price')) if meal_events else None
+            if base_price is None:
+                base_price = _as_price(meal.get('price')) or 0.0
+            self._base_prices[meal.get('id')] = base_price
+
+            by_date = {}
+            for event_date, info in (meal.get('available_dates') or {}).items():
+                orders_count = info.get('orders_count') or 0
+                max_orders = info.get('max_orders') or 0
+                price = _as_price(info.get('price'))
+                if price is None:
+                    price = event_prices.get(info.get('event_id'))
+                by_date[event_date] = {
+                    'event_id': info.get('event_id'),
+                    'day_name': info.get('day_name', ''),
+                    'event_time': info.get('event_time', ''),
+                    'orders_count': orders_count,
+                    'max_orders': max_orders,
+                    'remaining': max(max_orders - orders_count, 0) if max_orders else None,
+                    'capacity_pct': int(orders_count / max_orders * 100) if max_orders else None,
+                    'price': price if price is not None else base_price,
+                    'has_event_price': price is not None,
+                }
+            self._events[meal.get('id')] = by_date
+
+    def dates(self, meal_id: Any) -> Dict[str, Dict[str, Any]]:
+        """Return the events of a meal by date (empty if unknown)."""
+        return self._events.get(meal_id, {})
+
+    def get(self, meal_id: Any, event_date: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Return a meal's event on a date, or None."""
+        return self._events.get(meal_id, {}).get(event_date)
+
+    def base_price(self, meal_id: Any) -> float:
+        """Return the price shown on a meal's card."""
+        return self._base_prices.get(meal_id, 0.0)
+
+    def day_names(self, meal_id: Any) -> str:
+        """Return the comma-separated day names a meal is available on."""
+        return ", ".join(event['day_name'] for event in self.dates(meal_id).values())
+
+
+class ChefMealWeek:
+    """
+    A week of chef meals indexed by event date and meal type.
+
+    Built once per shared cache entry and never modified afterwards, so it
+    can be read by every session without locking.
+    """
+
+    def __init__(self, meals: List[Dict[str, Any]]):
+        self.meals = meals
+        self.events = ChefMealEventIndex(meals)
+        self._by_slot: Dict[Tuple[str, Any], List[int]] = {}
+        for position, meal in enumerate(meals):
+            for event_date in meal.get('available_dates') or {}:
+                self._by_slot.setdefault((event_date, meal.get('meal_type')), []).append(position)
+
+    def __len__(self) -> int:
+        return len(self.meals)
+
+    def filter(self, event_date: Optional[str] = None, meal_type: Optional[str] = None,
+               chef_id: Any = None) -> List[Dict[str, Any]]:
+        """Return the meals available on event_date with the given meal type and chef, in listing order."""
+        if event_date is not None:
+            positions = sorted(
+                position
+                for (slot_date, slot_type), slot_positions in self._by_slot.items()
+                if slot_date == event_date and (meal_type is None or slot_type == meal_type)
+                for position in slot_positions
+            )
+            meals = [self.meals[position] for position in positions]
+        elif meal_type is not None:
+            meals = [meal for meal in self.meals if meal.get('meal_type') == meal_type]
+        else:
+            meals = list(self.meals)
+        if chef_id is not None:
+            meals = [meal for meal in meals if str(_chef_id(meal)) == str(chef_id)]
+        return meals
+
+
+def load_chef_meals_week(session, base_url: str, headers: Dict[str, str], week_start: Any,
+                         page_size: int = CHEF_MEALS_WEEK_PAGE_SIZE,
+                         max_workers: int = CHEF_MEALS_MAX_WORKERS) -> ChefMealWeek:
+    """
+    Fetch every chef meal of a week in the user's area.
+
+    The first page tells how many pages there are; the rest are fetched
+    concurrently. Runs off the main thread and raises if any page fails, so
+    a partial week is never cached.
+    """
+    def fetch_page(page: int) -> Dict[str, Any]:
+        params = {'week_start_date': str(week_start), 'page': page, 'page_size': page_size}
+        return load_chef_meals(session, base_url, headers, params)
+
+    pages = [fetch_page(1)]
+    total_pages = int(pages[0]['data'].get('total_pages') or 1)
+    if total_pages > 1:
+        with ThreadPoolExecutor(max_workers=min(max_workers, total_pages - 1)) as pool:
+            pages.extend(pool.map(fetch_page, range(2, total_pages + 1)))
+
+    meals = {}
+    for page in pages:
+        for meal in page['data']['meals']:
+            meals.setdefault(meal.get('id'), meal)
+    return ChefMealWeek(list(meals.values()))
+
+
+def page_chef_meals(meals: List[Dict[str, Any]], page: int, page_size: int) -> Dict[str, Any]:
+    """Return one page of a locally filtered listing in the backend's response shape."""
+    total_pages = max(1, -(-len(meals) // page_size))
+    page = min(max(1, page), total_pages)
+    start = (page - 1) * page_size
+    return {
+        'status': 'success',
+        'data': {
+            'meals': meals[start:start + page_size],
+            'total_count': len(meals),
+            'total_pages': total_pages,
+            'current_page': page,
+        },
+    }
+
+
+def _restriction_names(values: Any) -> Set[str]:
+    """Return casefolded names of preferences or allergies, ignoring 'Everything'/'None'."""
+    names = set()
+    for value in values or []:
+        if isinstance(value, dict):
+            value = value.get('name')
+        if isinstance(value, str):
+            names.add(value.strip().casefold())
+    return names - NO_RESTRICTION_NAMES
+
+
+def meal_is_compatible(meal: Dict[str, Any], preferences: Iterable[Any],
+                       allergies: Iterable[Any] = ()) -> bool:
+    """
+    Return True if a chef meal satisfies a user's dietary profile.
+
+    Every user preference must be among the meal's dietary preferences, and
+    none of the user's allergies may be among the meal's allergens.
+    """
+    offered = {name.casefold() for name in extract_preference_names(meal)}
+    if not _restriction_names(preferences) <= offered:
+        return False
+    return not (_restriction_names(allergies) & _restriction_names(meal.get('allergens')))
+
+
+def localize_chef_meals(meals: List[Dict[str, Any]], preferences: Iterable[Any],
+                        allergies: Iterable[Any] = (), compatible_only: bool = False) -> List[Dict[str, Any]]:
+    """
+    Apply a user's compatibility to shared chef meals.
+
+    Returns copies with ``is_compatible`` set (incompatible meals dropped
+    when compatible_only); the shared meals are never modified.
+    """
+    preferences = list(preferences or [])
+    allergies = list(allergies or [])
+    localized = []
+    for meal in meals:
+        is_compatible = meal_is_compatible(meal, preferences, allergies)
+        if compatible_only and not is_compatible:
+            continue
+        localized.append({**meal, 'is_compatible': is_compatible})
+    return localized
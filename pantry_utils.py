@@ -0,0 +1,628 @@
+"""
+Helpers for the pantry page that do not depend on Streamlit.
+"""
+
+import bisect
+import math
+import threading
+import time
+from datetime import date, datetime
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+PANTRY_ITEMS_PATH = '/meals/api/pantry-items/'
+PANTRY_CACHE_TTL_SECONDS = 5 * 60
+PANTRY_PAGE_SIZE = 10
+EXPIRING_SOON_DAYS = 7
+IMPORT_CHUNK_ROWS = 200  # rows parsed, validated and submitted per batch
+IMPORT_MAX_WORKERS = 16  # concurrent POSTs per batch; the API has no bulk endpoint
+
+# Editable columns of the pantry table
+PANTRY_COLUMNS = [
+    'Item Name', 'Quantity', 'Weight Per Unit', 'Weight Unit',
+    'Expiration Date', 'Item Type', 'Notes', 'Tags',
+]
+
+PANTRY_SCHEMA = pa.schema([
+    ('ID', pa.int64()),
+    ('Item Name', pa.string()),
+    ('Quantity', pa.int64()),
+    ('Weight Per Unit', pa.float64()),
+    ('Weight Unit', pa.string()),
+    ('Expiration Date', pa.date32()),
+    ('Item Type', pa.string()),
+    ('Notes', pa.string()),
+    ('Tags', pa.string()),
+])
+
+# Columns matched by the pantry search box
+SEARCH_COLUMNS = ['Item Name', 'Notes', 'Tags']
+
+
+def parse_expiration_date(value: Any) -> Optional[date]:
+    """Parse an API expiration date ('YYYY-MM-DD'), returning None if missing or invalid."""
+    if isinstance(value, date):
+        return value
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except (ValueError, TypeError):
+        return None
+
+
+def pantry_record(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a pantry-items API object to a table row."""
+    tags = item.get('tags') or []
+    weight = item.get('weight_per_unit')
+    return {
+        'ID': int(item['id']),
+        'Item Name': item.get('item_name'),
+        'Quantity': item.get('quantity'),
+        'Weight Per Unit': float(weight) if weight not in (None, '') else None,
+        'Weight Unit': item.get('weight_unit') or '',
+        'Expiration Date': parse_expiration_date(item.get('expiration_date')),
+        'Item Type': item.get('item_type'),
+        'Notes': item.get('notes'),
+        'Tags': ', '.join(tags) if isinstance(tags, list) else str(tags),
+    }
+
+
+def pantry_page_items(data: Any) -> List[Dict[str, Any]]:
+    """Return the items of a pantry-items response, paginated or not."""
+    if isinstance(data, list):
+        return data
+    if isinstance(data, dict):
+        return data.get('results') or []
+    return []
+
+
+def pantry_page_paths(first_page: Any) -> List[str]:
+    """
+    Return the paths of the pantry pages after the first one.
+
+    The page size is taken from the first page, so every remaining page can
+    be requested at once instead of following the 'next' links.
+    """
+    if not isinstance(first_page, dict) or not first_page.get('next'):
+        return []
+    per_page = len(pantry_page_items(first_page)) or 1
+    total_pages = -(-int(first_page.get('count') or 0) // per_page)
+    return [f"{PANTRY_ITEMS_PATH}?page={page}" for page in range(2, total_pages + 1)]
+
+
+def pantry_table(items: Iterable[Dict[str, Any]]) -> pa.Table:
+    """Build the Arrow pantry table from API items, keeping the first copy of each ID."""
+    records = {}
+    for item in items:
+        record = pantry_record(item)
+        records.setdefault(record['ID'], record)
+    return pa.Table.from_pylist(list(records.values()), schema=PANTRY_SCHEMA)
+
+
+def query_pantry(table: pa.Table, search: str = '', item_type: Optional[str] = None,
+                 sort_by: str = 'Item Name', descending: bool = False) -> pa.Table:
+    """
+    Search, filter and sort the pantry table locally.
+
+    Args:
+        table: The cached pantry table
+        search: Case-insensitive text matched against name, notes and tags
+        item_type: Keep only this item type; None keeps every type
+        sort_by: Column to sort by; text sorts ignore case and missing values go last
+        descending: Reverse the sort order
+
+    Returns:
+        A new table with the matching rows in order
+    """
+    search = (search or '').strip()
+    if search:
+        mask = None
+        for column in SEARCH_COLUMNS:
+            matches = pc.match_substring(pc.fill_null(table[column], ''), search, ignore_case=True)
+            mask = matches if mask is None else pc.or_(mask, matches)
+        table = table.filter(mask)
+    if item_type:
+        table = table.filter(pc.equal(pc.fill_null(table['Item Type'], ''), item_type))
+    key = table[sort_by]
+    if pa.types.is_string(key.type):
+        key = pc.utf8_lower(key)
+    order = pc.array_sort_indices(key, order='descending' if descending else 'ascending',
+                                  null_placement='at_end')
+    return table.take(order)
+
+
+def pantry_rows(table: pa.Table, item_ids: List[int]) -> List[Dict[str, Any]]:
+    """Return the rows of the given IDs in the order of item_ids."""
+    rows = table.filter(pc.is_in(table['ID'], value_set=pa.array(item_ids, type=pa.int64()))).to_pylist()
+    by_id = {row['ID']: row for row in rows}
+    return [by_id[item_id] for item_id in item_ids if item_id in by_id]
+
+
+def page_pantry(table: pa.Table, page: int, page_size: int = PANTRY_PAGE_SIZE) -> Dict[str, Any]:
+    """
+    Return one page of a queried pantry table.
+
+    Returns:
+        dict with 'records' (row dicts), 'page' (clamped to the valid range),
+        'total_pages' and 'count'
+    """
+    total_pages = max(1, -(-table.num_rows // page_size))
+    page = min(max(1, page), total_pages)
+    rows = table.slice((page - 1) * page_size, page_size)
+    return {'records': rows.to_pylist(), 'page': page, 'total_pages': total_pages, 'count': table.num_rows}
+
+
+class ExpirationIndex:
+    """
+    Pantry item IDs ordered by expiration date.
+
+    Kept as a sorted list of (date, id) pairs next to an id -> date map, so
+    range queries are a binary search and single items can be moved without
+    rebuilding. Items without an expiration date are not indexed.
+    """
+
+    def __init__(self, entries: Iterable[Tuple[Any, Optional[date]]] = ()):
+        self._dates: Dict[int, date] = {}
+        self._sorted: List[Tuple[date, int]] = []
+        for item_id, expiration in entries:
+            if expiration is not None:
+                self._dates[int(item_id)] = expiration
+        self._sorted = sorted((expiration, item_id) for item_id, expiration in self._dates.items())
+
+    @classmethod
+    def from_table(cls, table: pa.Table) -> 'ExpirationIndex':
+        return cls(zip(table['ID'].to_pylist(), table['Expiration Date'].to_pylist()))
+
+    def __len__(self) -> int:
+        return len(self._sorted)
+
+    def get(self, item_id: Any) -> Optional[date]:
+        """Return an item's expiration date, or None if it has none."""
+        return self._dates.get(int(item_id))
+
+    def set(self, item_id: Any, expiration: Optional[date]) -> None:
+        """Add an item or move it to its new expiration date."""
+        item_id = int(item_id)
+        self.discard(item_id)
+        if expiration is not None:
+            self._dates[item_id] = expiration
+            bisect.insort(self._sorted, (expiration, item_id))
+
+    def discard(self, item_id: Any) -> None:
+        """Remove an item if it is indexed."""
+        item_id = int(item_id)
+        expiration = self._dates.pop(item_id, None)
+        if expiration is not None:
+            position = bisect.bisect_left(self._sorted, (expiration, item_id))
+            del self._sorted[position]
+
+    def expiring_by(self, cutoff: date) -> List[int]:
+        """Return the IDs of items expiring on or before cutoff, soonest first."""
+        end = bisect.bisect_right(self._sorted, (cutoff, float('inf')))
+        return [item_id for _, item_id in self._sorted[:end]]
+
+    def count_by(self, cutoff: date) -> int:
+        """Return how many items expire on or before cutoff."""
+        return bisect.bisect_right(self._sorted, (cutoff, float('inf')))
+
+
+def expiration_badge(expiration: Optional[date], today: date, soon_days: int = EXPIRING_SOON_DAYS) -> str:
+    """Return a short label for items that are expired or expire within soon_days, else ''."""
+    if expiration is None:
+        return ''
+    days_left = (expiration - today).days
+    if days_left < 0:
+        return '⛔ Expired'
+    if days_left == 0:
+        return '⚠️ Today'
+    if days_left <= soon_days:
+        return f"⚠️ {days_left} day{'s' if days_left != 1 else ''}"
+    return ''
+
+
+class PantryCache:
+    """
+    Session-scoped cache of the user's whole pantry as an Arrow table.
+
+    The pantry is loaded once and then patched with the outcome of each
+    edit, so searching, sorting and paging never refetch it. The table is
+    only reloaded after the TTL, on an explicit refresh, or when an edit
+    cannot be applied locally. An ExpirationIndex is kept in step with the
+    table.
+    """
+
+    def __init__(self, ttl_seconds: int = PANTRY_CACHE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._table: Optional[pa.Table] = None
+        self._expirations: Optional[ExpirationIndex] = None
+        self._loaded_at = 0.0
+
+    def get(self) -> Optional[pa.Table]:
+        """Return the cached table, or None if missing or expired."""
+        with self._lock:
+            if self._table is None or time.time() - self._loaded_at > self.ttl_seconds:
+                return None
+            return self._table
+
+    def expirations(self) -> Optional[ExpirationIndex]:
+        """Return the expiration index of the cached table, or None if missing or expired."""
+        table = self.get()
+        with self._lock:
+            return self._expirations if table is not None else None
+
+    def put(self, items: Iterable[Dict[str, Any]]) -> pa.Table:
+        """Replace the cached pantry with freshly loaded API items."""
+        table = pantry_table(items)
+        expirations = ExpirationIndex.from_table(table)
+        with self._lock:
+            self._table = table
+            self._expirations = expirations
+            self._loaded_at = time.time()
+        return table
+
+    def invalidate(self) -> None:
+        """Drop the cached pantry so the next read reloads it."""
+        with self._lock:
+            self._table = None
+            self._expirations = None
+
+    def upsert(self, items: Iterable[Dict[str, Any]]) -> bool:
+        """
+        Add or replace items, given as pantry-items API objects.
+
+        Returns:
+            False if nothing is cached or an item has no ID
+        """
+        try:
+            rows = pantry_table(items)
+        except (KeyError, TypeError, ValueError, pa.ArrowException):
+            return False
+        with self._lock:
+            if self._table is None:
+                return False
+            kept = self._table.filter(pc.invert(pc.is_in(self._table['ID'], value_set=rows['ID'])))
+            self._table = pa.concat_tables([kept, rows])
+            for item_id, expiration in zip(rows['ID'].to_pylist(), rows['Expiration Date'].to_pylist()):
+                self._expirations.set(item_id, expiration)
+        return True
+
+    def remove(self, item_ids: Iterable[int]) -> None:
+        """Remove items by ID."""
+        ids = pa.array([int(item_id) for item_id in item_ids], type=pa.int64())
+        with self._lock:
+            if self._table is not None and len(ids):
+                self._table = self._table.filter(pc.invert(pc.is_in(self._table['ID'], value_set=ids)))
+                for item_id in ids.to_pylist():
+                    self._expirations.discard(item_id)
+
+    def apply_changes(self, changes: Dict[str, List], responses: Dict[tuple, Any]) -> bool:
+        """
+        Patch the cache with the changes the backend accepted.
+
+        Updates fall back to the sent payload when the response has no body.
+
+        Returns:
+            False if an accepted change could not be applied, in which case
+            the cache should be invalidated
+        """
+        def accepted(key, status):
+            response = responses.get(key)
+            return response is not None and response.status_code in (status, 200)
+
+        def body(key):
+            try:
+                data = responses[key].json()
+            except ValueError:
+                return None
+            return data if isinstance(data, dict) and data.get('id') is not None else None
+
+        items = []
+        for position, add in enumerate(changes.get('adds', [])):
+            if accepted(('add', position), 201):
+                item = body(('add', position))
+                if item is None:
+                    return False
+                items.append(item)
+        for update in changes['updates']:
+            if accepted(('update', update['id']), 200):
+                items.append(body(('update', update['id'])) or {**update['payload'], 'id': update['id']})
+        self.remove(d['id'] for d in changes['deletes'] if accepted(('delete', d['id']), 204))
+        return self.upsert(items) if items else self.get() is not None
+
+
+def pantry_payload(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the pantry-items API payload of a table row."""
+    tags_str = row.get('Tags') or ''
+    tags_list = [tag.strip() for tag in str(tags_str).split(',') if tag.strip()]
+    expiration = row.get('Expiration Date')
+    item_type = row.get('Item Type')
+    notes = row.get('Notes')
+
+    payload = {
+        'item_name': row['Item Name'],
+        'quantity': int(row['Quantity']),
+        'expiration_date': expiration.isoformat() if pd.notnull(expiration) else None,
+        'item_type': item_type if pd.notnull(item_type) else '',
+        'notes': notes if pd.notnull(notes) else '',
+        'tags': tags_list,
+    }
+    weight = row.get('Weight Per Unit')
+    if weight is not None and pd.notnull(weight):
+        payload['weight_per_unit'] = float(weight)
+    if row.get('Weight Unit'):
+        payload['weight_unit'] = row['Weight Unit']
+    return payload
+
+
+def _coerce_cell(column: str, value: Any) -> Any:
+    """Convert a data_editor widget-state value to the table's Python type."""
+    if column == 'Expiration Date' and isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value[:10]).date()
+        except ValueError:
+            return None
+    return value
+
+
+def _same(a: Any, b: Any) -> bool:
+    """Compare two cells, treating every kind of missing value as equal."""
+    a_missing = a is None or (not isinstance(a, (list, dict)) and pd.isna(a))
+    b_missing = b is None or (not isinstance(b, (list, dict)) and pd.isna(b))
+    if a_missing or b_missing:
+        return a_missing and b_missing
+    return a == b
+
+
+def pantry_changes_from_delta(records: List[Dict[str, Any]], delta: Dict[str, Any]) -> Dict[str, List]:
+    """
+    Build a change set from the data_editor's widget state.
+
+    Only the rows the user touched are looked at, so the cost depends on
+    the number of edits rather than the size of the pantry.
+
+    Args:
+        records: The rows shown in the editor, in display order, each with its 'ID'
+        delta: st.session_state[<editor key>], holding 'edited_rows'
+            ({position: {column: value}}), 'added_rows' and 'deleted_rows'
+
+    Returns:
+        {'updates': [{'id', 'fields', 'payload'}], 'deletes': [{'id', 'name'}],
+         'adds': [{'name', 'payload'}], 'invalid': [str]}
+    """
+    changes = {'updates': [], 'deletes': [], 'adds': [], 'invalid': []}
+    deleted_positions = set(delta.get('deleted_rows') or [])
+
+    for position, edits in (delta.get('edited_rows') or {}).items():
+        position = int(position)
+        if position in deleted_positions or not 0 <= position < len(records):
+            continue
+        record = records[position]
+        if edits.get('Delete'):
+            deleted_positions.add(position)
+            continue
+        row = dict(record)
+        fields = []
+        for column, value in edits.items():
+            if column not in PANTRY_COLUMNS:
+                continue
+            value = _coerce_cell(column, value)
+            if not _same(value, record.get(column)):
+                row[column] = value
+                fields.append(column)
+        if fields:
+            try:
+                changes['updates'].append({'id': int(record['ID']), 'fields': fields, 'payload': pantry_payload(row)})
+            except (KeyError, TypeError, ValueError):
+                changes['invalid'].append(f"'{record.get('Item Name')}' has an invalid value")
+
+    for position in sorted(deleted_positions):
+        if 0 <= position < len(records):
+            changes['deletes'].append({'id': int(records[position]['ID']), 'name': records[position].get('Item Name')})
+
+    for added in delta.get('added_rows') or []:
+        row = {column: _coerce_cell(column, value) for column, value in added.items()}
+        if not row.get('Item Name') or row.get('Quantity') is None or pd.isna(row.get('Quantity')):
+            changes['invalid'].append("New rows need an item name and a quantity")
+            continue
+        changes['adds'].append({'name': row['Item Name'], 'payload': pantry_payload(row)})
+    return changes
+
+
+def pantry_change_requests(changes: Dict[str, List]) -> Dict[tuple, tuple]:
+    """
+    Turn a change set into per-item requests for dj_request_many.
+
+    The pantry API has no bulk endpoint, so every change is its own request;
+    keys are ('update' | 'delete', item_id) or ('add', position).
+    """
+    calls = {}
+    for position, add in enumerate(changes.get('adds', [])):
+        calls[('add', position)] = ('post', PANTRY_ITEMS_PATH, add['payload'], None)
+    for update in changes['updates']:
+        calls[('update', update['id'])] = ('put', f"{PANTRY_ITEMS_PATH}{update['id']}/", update['payload'], None)
+    for delete in changes['deletes']:
+        calls[('delete', delete['id'])] = ('delete', f"{PANTRY_ITEMS_PATH}{delete['id']}/", None, None)
+    return calls
+
+
+def pantry_change_errors(changes: Dict[str, List], responses: Dict[tuple, Any]) -> List[str]:
+    """Return a message for every change the backend did not accept."""
+    expected = {'add': 201, 'update': 200, 'delete': 204}
+    names = {('add', position): a['name'] for position, a in enumerate(changes.get('adds', []))}
+    names.update({('update', u['id']): u['payload']['item_name'] for u in changes['updates']})
+    names.update({('delete', d['id']): d['name'] for d in changes['deletes']})
+    errors = []
+    for key, name in names.items():
+        response = responses.get(key)
+        if response is None:
+            errors.append(f"Could not {key[0]} '{name}': network error")
+        elif response.status_code not in (expected[key[0]], 200):
+            errors.append(f"Could not {key[0]} '{name}': {_error_detail(response)}")
+    return errors
+
+
+def _error_detail(response: Any) -> str:
+    """Return a short description of a failed response."""
+    try:
+        return str(response.json())
+    except ValueError:
+        return f"status {response.status_code}"
+
+
+# Spreadsheet headers accepted for each pantry column, after normalize_header
+IMPORT_COLUMN_ALIASES = {
+    'Item Name': ['item name', 'name', 'item'],
+    'Quantity': ['quantity', 'qty', 'count'],
+    'Weight Per Unit': ['weight per unit', 'weight'],
+    'Weight Unit': ['weight unit', 'unit'],
+    'Expiration Date': ['expiration date', 'expiration', 'expires', 'expiry', 'expiry date'],
+    'Item Type': ['item type', 'type'],
+    'Notes': ['notes', 'note'],
+    'Tags': ['tags', 'tag'],
+}
+ITEM_TYPES = ['Canned', 'Dry']
+WEIGHT_UNITS = ['oz', 'lb', 'g', 'kg']
+
+
+def normalize_header(header: Any) -> str:
+    """Lower-case a spreadsheet header and treat '_' and '-' as spaces."""
+    return ' '.join(str(header).replace('_', ' ').replace('-', ' ').lower().split())
+
+
+def import_column_map(headers: Iterable[Any]) -> Dict[Any, str]:
+    """
+    Map spreadsheet headers to pantry columns; unknown headers are ignored.
+
+    Raises:
+        ValueError if there is no item name or quantity column
+    """
+    lookup = {alias: column for column, aliases in IMPORT_COLUMN_ALIASES.items() for alias in aliases}
+    mapping = {}
+    for header in headers:
+        column = lookup.get(normalize_header(header))
+        if column and column not in mapping.values():
+            mapping[header] = column
+    missing = [column for column in ('Item Name', 'Quantity') if column not in mapping.values()]
+    if missing:
+        raise ValueError(f"The file needs {' and '.join(repr(column) for column in missing)} columns")
+    return mapping
+
+
+def read_pantry_import(upload: BinaryIO, filename: str,
+                       chunk_rows: int = IMPORT_CHUNK_ROWS) -> Iterator[Tuple[pd.DataFrame, float]]:
+    """
+    Parse an uploaded CSV or Excel (.xlsx) file in chunks of chunk_rows rows.
+
+    CSV files are streamed; Excel files are read in one go with openpyxl
+    (pandas cannot stream them) and then chunked. Every cell is read as text and validated
+    by pantry_import_rows.
+
+    Yields:
+        (chunk with pantry column names, fraction of the file processed)
+
+    Raises:
+        ValueError for unreadable files or missing required columns
+    """
+    if filename.lower().endswith('.xlsx'):
+        frame = pd.read_excel(upload, dtype=str)
+        chunks = (frame.iloc[start:start + chunk_rows] for start in range(0, len(frame), chunk_rows))
+        total = max(len(frame), 1)
+        progress = lambda chunk: min(1.0, (chunk.index[-1] + 1) / total)
+    else:
+        size = getattr(upload, 'size', None) or 0
+        chunks = pd.read_csv(upload, dtype=str, chunksize=chunk_rows, skipinitialspace=True)
+        progress = lambda chunk: min(1.0, upload.tell() / size) if size else 0.0
+
+    mapping = None
+    for chunk in chunks:
+        if mapping is None:
+            mapping = import_column_map(chunk.columns)
+        yield chunk[list(mapping)].rename(columns=mapping), progress(chunk)
+
+
+def _import_text(value: Any) -> str:
+    return '' if value is None or pd.isna(value) else str(value).strip()
+
+
+def pantry_import_rows(chunk: pd.DataFrame, first_row: int) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """
+    Validate imported rows and build their API payloads.
+
+    Args:
+        chunk: Rows with pantry column names, as yielded by read_pantry_import
+        first_row: Spreadsheet row number of the chunk's first row, for messages
+
+    Returns:
+        (adds as [{'name', 'payload', 'row'}], per-row error messages)
+    """
+    adds, errors = [], []
+    # Parse the chunk's dates in one vectorized call
+    if 'Expiration Date' in chunk:
+        expirations = pd.to_datetime(chunk['Expiration Date'], errors='coerce', format='mixed').tolist()
+    else:
+        expirations = [pd.NaT] * len(chunk)
+    for offset, record in enumerate(chunk.to_dict('records')):
+        row_number = first_row + offset
+        values = {column: _import_text(record.get(column)) for column in PANTRY_COLUMNS}
+        if not any(values.values()):
+            continue
+        problems = []
+        if not values['Item Name']:
+            problems.append("missing item name")
+        try:
+            quantity = float(values['Quantity'])
+            if not math.isfinite(quantity) or quantity < 0 or quantity != int(quantity):
+                raise ValueError
+        except ValueError:
+            problems.append(f"invalid quantity {values['Quantity']!r}")
+            quantity = None
+        expiration = None
+        if values['Expiration Date']:
+            expiration = expirations[offset]
+            if pd.isna(expiration):
+                problems.append(f"invalid expiration date {values['Expiration Date']!r}")
+            expiration = None if pd.isna(expiration) else expiration.date()
+        item_type = next((t for t in ITEM_TYPES if t.lower() == values['Item Type'].lower()), None)
+        if values['Item Type'] and item_type is None:
+            problems.append(f"item type must be one of {', '.join(ITEM_TYPES)}")
+        unit = values['Weight Unit'].lower()
+        if unit and unit not in WEIGHT_UNITS:
+            problems.append(f"weight unit must be one of {', '.join(WEIGHT_UNITS)}")
+        weight = None
+        if values['Weight Per Unit']:
+            try:
+                weight = float(values['Weight Per Unit'])
+                if not math.isfinite(weight):
+                    raise ValueError
+            except ValueError:
+                problems.append(f"invalid weight {values['Weight Per Unit']!r}")
+        if problems:
+            errors.append(f"Row {row_number}: {'; '.join(problems)}")
+            continue
+        row = {
+            'Item Name': values['Item Name'],
+            'Quantity': int(quantity),
+            'Weight Per Unit': weight,
+            'Weight Unit': unit or None,
+            'Expiration Date': expiration,
+            'Item Type': item_type or ITEM_TYPES[0],
+            'Notes': values['Notes'],
+            'Tags': values['Tags'],
+        }
+        adds.append({'name': row['Item Name'], 'payload': pantry_payload(row), 'row': row_number})
+    return adds, errors
+
+
+def pantry_import_errors(adds: List[Dict[str, Any]], responses: Dict[tuple, Any]) -> List[str]:
+    """Return a message for every imported row the backend did not accept."""
+    errors = []
+    for position, add in enumerate(adds):
+        response = responses.get(('add', position))
+        if response is None:
+            errors.append(f"Row {add['row']} ('{add['name']}'): network error")
+        elif response.status_code not in (201, 200):
+            errors.append(f"Row {add['row']} ('{add['name']}'): {_error_detail(response)}")
+    return errors
@@ -0,0 +1,201 @@
+"""
+Process-wide registry of static reference data (languages, countries,
+dietary preferences).
+
+Every source has a built-in fallback, so reads never wait on the backend:
+they return the last loaded value, or the fallback until the first load
+lands. Loads run on a background executor, are started for every source at
+startup and again whenever a value is older than its TTL (or a minute after
+a failed load).
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import pycountry
+
+reference_logger = logging.getLogger('reference_data')
+
+REFERENCE_TTL_SECONDS = 6 * 60 * 60
+RETRY_SECONDS = 60  # wait after a failed load before trying again
+REQUEST_TIMEOUT_SECONDS = 10
+
+LANGUAGES_PATH = '/auth/api/languages/'
+COUNTRIES_PATH = '/auth/api/countries/'
+DIETARY_PREFERENCES_PATH = '/meals/api/dietary-preferences/'
+
+DEFAULT_LANGUAGES = [
+    {"code": "en", "name": "English", "name_local": "English", "bidi": False},
+    {"code": "jp", "name": "Japanese", "name_local": "日本語", "bidi": False},
+    {"code": "es", "name": "Spanish", "name_local": "Español", "bidi": False},
+    {"code": "fr", "name": "French", "name_local": "Français", "bidi": False},
+]
+
+DEFAULT_DIETARY_PREFERENCES = [
+    'Everything', 'Vegetarian', 'Pescatarian', 'Gluten-Free', 'Keto',
+    'Paleo', 'Halal', 'Kosher', 'Low-Calorie', 'Low-Sodium', 'High-Protein',
+    'Dairy-Free', 'Nut-Free', 'Raw Food', 'Whole 30', 'Low-FODMAP',
+    'Diabetic-Friendly', 'Vegan',
+]
+
+
+def default_countries() -> List[Dict[str, str]]:
+    """Return every ISO country as {'name', 'code'}, the shape of the countries endpoint."""
+    return [{'name': country.name, 'code': country.alpha_2} for country in pycountry.countries]
+
+
+def normalize_dietary_preferences(data: Any) -> List[Dict[str, Any]]:
+    """
+    Return dietary preferences as [{'id', 'name'}].
+
+    Accepts a plain list or a dict wrapping it under 'details' or 'results';
+    plain strings become {'id': name, 'name': name}.
+    """
+    prefs_list = []
+    if isinstance(data, list):
+        prefs_list = data
+    elif isinstance(data, dict):
+        if isinstance(data.get('details'), list):
+            prefs_list = data['details']
+        elif isinstance(data.get('results'), list):
+            prefs_list = data['results']
+
+    formatted_prefs = []
+    for pref in prefs_list:
+        if isinstance(pref, dict) and 'name' in pref:
+            formatted_prefs.append({'id': pref.get('id', pref['name']), 'name': pref['name']})
+        elif isinstance(pref, str):
+            formatted_prefs.append({'id': pref, 'name': pref})
+    return formatted_prefs
+
+
+class ReferenceDataRegistry:
+    """
+    Thread-safe store of reference data sources with background refresh.
+
+    Loaders are zero-argument callables that return the value or raise; an
+    empty result counts as a failure so a bad response never replaces the
+    fallback. They run on the executor and must not touch Streamlit state.
+    """
+
+    def __init__(self, ttl_seconds: float = REFERENCE_TTL_SECONDS, clock: Callable[[], float] = time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._sources: Dict[str, Dict[str, Any]] = {}
+
+    def register(self, name: str, loader: Callable[[], Any], fallback: Any) -> None:
+        """Add a source; it is served from fallback until its first load succeeds."""
+        with self._lock:
+            self._sources[name] = {
+                'loader': loader, 'fallback': fallback, 'value': None,
+                'expires_at': None, 'loading': False,
+            }
+
+    def get(self, name: str, executor=None) -> Any:
+        """
+        Return a source's current value without waiting on the backend.
+
+        When the value is missing or older than the TTL and an executor is
+        given, one background refresh is started.
+        """
+        with self._lock:
+            source = self._sources[name]
+            value = source['value'] if source['value'] is not None else source['fallback']
+            expired = source['expires_at'] is None or self._clock() >= source['expires_at']
+        if expired and executor is not None:
+            self.refresh(name, executor)
+        return value
+
+    def fallback(self, name: str) -> Any:
+        """Return a source's built-in fallback, regardless of what has been loaded."""
+        with self._lock:
+            return self._sources[name]['fallback']
+
+    def loaded(self, name: str) -> bool:
+        """Return True once a source has been loaded from the backend."""
+        with self._lock:
+            return self._sources[name]['value'] is not None
+
+    def refresh(self, name: str, executor) -> bool:
+        """
+        Start a background load of a source unless one is already running.
+
+        Returns:
+            True if a load was started
+        """
+        with self._lock:
+            source = self._sources[name]
+            if source['loading']:
+                return False
+            source['loading'] = True
+        try:
+            executor.submit(self._load, name)
+        except RuntimeError as e:
+            reference_logger.error(f"Could not schedule reference data load for {name}: {e}")
+            with self._lock:
+                source['loading'] = False
+            return False
+        return True
+
+    def warm(self, executor) -> None:
+        """Start loading every source."""
+        with self._lock:
+            names = list(self._sources)
+        for name in names:
+            self.refresh(name, executor)
+
+    def _load(self, name: str) -> None:
+        """Run a source's loader and store the result (background thread)."""
+        with self._lock:
+            source = self._sources[name]
+            loader = source['loader']
+        try:
+            value = loader()
+            if not value:
+                raise ValueError("empty response")
+        except Exception as e:
+            reference_logger.warning(f"Reference data load failed for {name}, keeping current value: {e}")
+            with self._lock:
+                source['expires_at'] = self._clock() + RETRY_SECONDS
+                source['loading'] = False
+            return
+        with self._lock:
+            source['value'] = value
+            source['expires_at'] = self._clock() + self.ttl_seconds
+            source['loading'] = False
+
+
+def _get_json(session, url: str) -> Any:
+    response = session.get(url, timeout=REQUEST_TIMEOUT_SECONDS)
+    response.raise_for_status()
+    return response.json()
+
+
+def build_reference_registry(session, base_url: Optional[str],
+                             ttl_seconds: float = REFERENCE_TTL_SECONDS) -> ReferenceDataRegistry:
+    """
+    Create the registry with the app's reference sources.
+
+    The session must be safe to share between threads and carry no user
+    credentials; every source is public.
+    """
+    registry = ReferenceDataRegistry(ttl_seconds=ttl_seconds)
+    registry.register(
+        'languages',
+        lambda: _get_json(session, f"{base_url}{LANGUAGES_PATH}"),
+        DEFAULT_LANGUAGES,
+    )
+    registry.register(
+        'countries',
+        lambda: _get_json(session, f"{base_url}{COUNTRIES_PATH}"),
+        default_countries(),
+    )
+    registry.register(
+        'dietary_preferences',
+        lambda: normalize_dietary_preferences(_get_json(session, f"{base_url}{DIETARY_PREFERENCES_PATH}")),
+        [{'id': pref, 'name': pref} for pref in DEFAULT_DIETARY_PREFERENCES],
+    )
+    return registry
@@ -12,8 +12,10 @@ if current_dir not in sys.path:
 
 # Now import from utils with the modified path
 try:
-    from utils import display_chef_toggle_in_sidebar
+    from utils import display_chef_toggle_in_sidebar, get_reference_data
 except ImportError as e:
+    get_reference_data = None
+
     # Fallback definition if import still fails
     def display_chef_toggle_in_sidebar():
         """Fallback implementation if the utils module can't be imported"""
@@ -85,6 +87,11 @@ def main():
         }
     )
 
+    # Start loading shared reference data (languages, countries, dietary
+    # preferences) in the background once per server process
+    if get_reference_data is not None:
+        get_reference_data()
+
     # Display the sautAI logo in the sidebar for better branding
     # st.sidebar.image("images/sautai_logo.PNG", use_container_width=True)
     # Use a wider WEBP logo for better presence at the top-left in both states
@@ -0,0 +1,174 @@
+"""
+Process-wide cache for global, non-personal backend data.
+
+Entries are shared by every session in the Streamlit process. Each key is
+refreshed by at most one caller at a time (single-flight): concurrent callers
+wait for the in-flight load instead of issuing their own. Once an entry is
+older than its TTL it is still served for a grace period while one background
+refresh replaces it (stale-while-revalidate), so N concurrent users cause one
+backend call per TTL window. Invalidating a key also discards any load of it
+that was already running, so a value fetched before a write is never stored.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional
+
+cache_logger = logging.getLogger('shared_cache')
+
+DEFAULT_TTL_SECONDS = 60
+DEFAULT_STALE_SECONDS = 300
+DEFAULT_MAX_ENTRIES = 256
+LOAD_WAIT_SECONDS = 15  # how long a follower waits for the leader's load
+
+
+class SharedCache:
+    """
+    Thread-safe TTL cache with single-flight loads and stale-while-revalidate.
+
+    Loaders are plain callables that return the value or raise; they run
+    without the cache lock held and must not touch Streamlit state.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: Dict[Hashable, Dict[str, Any]] = {}
+        self._inflight: Dict[Hashable, Future] = {}
+        self._running: Dict[Hashable, int] = {}  # loads still running per key, detached ones included
+        self._generations: Dict[Hashable, int] = {}  # bumped when a key with running loads is invalidated
+        self._epoch = 0  # bumped when everything is invalidated
+
+    def get(self, key: Hashable, loader: Callable[[], Any],
+            ttl_seconds: float = DEFAULT_TTL_SECONDS,
+            stale_seconds: float = DEFAULT_STALE_SECONDS,
+            executor=None) -> Any:
+        """
+        Return the cached value for key, loading it if needed.
+
+        Args:
+            key: Cache key; include every parameter the value depends on
+            loader: Zero-argument callable producing the value
+            ttl_seconds: Age after which the value is refreshed
+            stale_seconds: How long past the TTL a stale value may still be served
+            executor: Runs stale refreshes in the background; without one the
+                refresh happens inline
+
+        Returns:
+            The value, or None if it could not be loaded and nothing usable is cached
+        """
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            age = now - entry['loaded_at'] if entry else None
+            if entry and age < ttl_seconds:
+                return entry['value']
+            serve_stale = entry is not None and age < ttl_seconds + stale_seconds
+            stale = entry['value'] if serve_stale else None
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+                self._running[key] = self._running.get(key, 0) + 1
+                generation = self._generation(key)
+
+        if serve_stale:
+            if leader:
+                if executor is not None:
+                    executor.submit(self._load, key, loader, future, generation)
+                else:
+                    self._load(key, loader, future, generation)
+                    return self._result(future, stale)
+            return stale
+
+        if leader:
+            self._load(key, loader, future, generation)
+        return self._result(future, None)
+
+    def _generation(self, key: Hashable) -> tuple:
+        """Return the key's current generation (call with the lock held)."""
+        return (self._epoch, self._generations.get(key, 0))
+
+    def _load(self, key: Hashable, loader: Callable[[], Any], future: Future, generation: tuple) -> None:
+        """
+        Run the loader, store its value and release the waiting callers.
+
+        The value is only stored if the key has not been invalidated since
+        the load started; waiting callers receive it either way.
+        """
+        try:
+            value = loader()
+        except Exception as e:
+            cache_logger.error(f"Shared cache load failed for {key!r}: {e}")
+            with self._lock:
+                self._finish(key, future)
+            future.set_exception(e)
+            return
+        with self._lock:
+            if self._generation(key) == generation:
+                self._entries[key] = {'value': value, 'loaded_at': self._clock()}
+                while len(self._entries) > self.max_entries:
+                    oldest = min(self._entries, key=lambda k: self._entries[k]['loaded_at'])
+                    del self._entries[oldest]
+            else:
+                cache_logger.info(f"Discarding shared cache load for invalidated key {key!r}")
+            self._finish(key, future)
+        future.set_result(value)
+
+    def _finish(self, key: Hashable, future: Future) -> None:
+        """
+        Release a finished load (call with the lock held).
+
+        Generations only matter while a load of the key is running, so the
+        key's generation is forgotten once none is.
+        """
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        self._running[key] -= 1
+        if not self._running[key]:
+            del self._running[key]
+            self._generations.pop(key, None)
+
+    @staticmethod
+    def _result(future: Future, fallback: Any) -> Any:
+        """Wait for a load, falling back when it fails or takes too long."""
+        try:
+            return future.result(timeout=LOAD_WAIT_SECONDS)
+        except Exception:
+            return fallback
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """Drop one key, or everything when key is None, including loads in flight."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self._inflight.clear()
+                self._generations.clear()
+                self._epoch += 1
+            else:
+                self._drop(key)
+
+    def invalidate_matching(self, predicate: Callable[[Hashable], bool]) -> int:
+        """
+        Drop every key for which predicate(key) is true, including loads in flight.
+
+        Returns:
+            The number of entries removed
+        """
+        with self._lock:
+            keys = [key for key in self._entries if predicate(key)]
+            loading = [key for key in self._inflight if key not in self._entries and predicate(key)]
+            for key in keys + loading:
+                self._drop(key)
+        return len(keys)
+
+    def _drop(self, key: Hashable) -> None:
+        """Remove a key and discard its running loads (call with the lock held)."""
+        self._entries.pop(key, None)
+        self._inflight.pop(key, None)
+        if key in self._running:
+            self._generations[key] = self._generations.get(key, 0) + 1
@@ -5,9 +5,9 @@ This module integrates with the main pantry management page.
 import streamlit as st
 import os
 import logging
-import tempfile
 from datetime import date
 from utils import api_call_with_refresh
+from audio_utils import prepare_speech_audio
 
 def add_pantry_item_from_voice():
     """
@@ -42,26 +42,18 @@ def add_pantry_item_from_voice():
         if st.button("Add to Pantry", key="process_voice_btn", type="primary"):
             with st.spinner("Processing your audio..."):
                 try:
-                    # Save the audio data to a temporary file
-                    with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as temp_audio:
-                        temp_audio.write(audio_data.getvalue())
-                        temp_audio_path = temp_audio.name
-                    
-                    # Send the audio file to the backend API
-                    with open(temp_audio_path, 'rb') as audio_file:
-                        headers = {'Authorization': f'Bearer {st.session_state.user_info["access"]}'}
-                        files = {'audio_file': audio_file}
-                        
-                        response = api_call_with_refresh(
-                            url=f'{os.getenv("DJANGO_URL")}/meals/api/pantry-items/from-audio/',
-                            method='post',
-                            headers=headers,
-                            files=files
-                        )
-                    
-                    # Clean up the temporary file
-                    os.unlink(temp_audio_path)
-                    
+                    # Downmix and resample in memory; speech-to-text only needs 16 kHz mono
+                    audio_bytes, mime_type = prepare_speech_audio(audio_data.getvalue())
+                    headers = {'Authorization': f'Bearer {st.session_state.user_info["access"]}'}
+                    files = {'audio_file': ('recording.wav', audio_bytes, mime_type)}
+
+                    response = api_call_with_refresh(
+                        url=f'{os.getenv("DJANGO_URL")}/meals/api/pantry-items/from-audio/',
+                        method='post',
+                        headers=headers,
+                        files=files
+                    )
+
                     # Process the response
                     if response and response.status_code == 201:
                         result = response.json()
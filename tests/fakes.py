@@ -0,0 +1,64 @@
+"""
+Fake HTTP responses and sessions shared by the unit tests.
+"""
+
+import threading
+
+
+class FakeResponse:
+    """A requests.Response stand-in; json() raises ValueError when there is no body."""
+
+    def __init__(self, status_code=200, payload=None):
+        self.status_code = status_code
+        self._payload = payload
+        self.text = '' if payload is None else str(payload)
+
+    def json(self):
+        if self._payload is None:
+            raise ValueError("no body")
+        return self._payload
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+
+class FakeSession:
+    """
+    A requests.Session stand-in that records requests and answers from a map.
+
+    responses maps a key (the URL by default, see response_key) to a
+    response, which is returned every time, or to a list of responses,
+    which are returned once each. Unknown keys and exhausted lists get
+    default. Requests wait on release, which starts set.
+    """
+
+    def __init__(self, responses=None, default=None):
+        self.responses = dict(responses or {})
+        self.default = default
+        self.calls = []  # (method, url, kwargs)
+        self.release = threading.Event()
+        self.release.set()
+        self._lock = threading.Lock()
+
+    def response_key(self, method, url, kwargs):
+        return url
+
+    def request(self, method, url, **kwargs):
+        self.release.wait(5)
+        with self._lock:
+            self.calls.append((method.lower(), url, kwargs))
+            queued = self.responses.get(self.response_key(method.lower(), url, kwargs))
+            if isinstance(queued, list):
+                queued = queued.pop(0) if queued else None
+        return queued if queued is not None else self.default
+
+    def get(self, url, **kwargs):
+        return self.request('get', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('post', url, **kwargs)
+
+    def urls(self, method=None):
+        """Return the requested URLs, optionally only those of one method."""
+        return [url for called, url, _ in self.calls if method is None or called == method]
@@ -0,0 +1,52 @@
+import pytest
+import sys
+import os
+import io
+import wave
+
+import numpy as np
+
+# Add the parent directory to sys.path to import the helpers
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_utils import SPEECH_SAMPLE_RATE, prepare_speech_audio, read_wav, resample
+
+
+def make_wav(rate, channels, seconds=1.0, frequency=440.0):
+    times = np.arange(int(rate * seconds)) / rate
+    tone = 0.5 * np.sin(2 * np.pi * frequency * times)
+    pcm = (np.repeat(tone[:, None], channels, axis=1) * 32767).astype('<i2')
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(pcm.tobytes())
+    return buffer.getvalue()
+
+
+class TestPrepareSpeechAudio:
+    """Test in-memory downmixing and resampling of recordings"""
+
+    def test_stereo_48k_becomes_mono_16k(self):
+        data = make_wav(48000, 2)
+        prepared, mime_type = prepare_speech_audio(data)
+        samples, rate = read_wav(prepared)
+        assert mime_type == 'audio/wav'
+        assert rate == SPEECH_SAMPLE_RATE and samples.shape == (16000, 1)
+        assert len(prepared) * 5 < len(data)
+        # The tone survives the low-pass filter
+        assert np.abs(samples[100:-100]).max() == pytest.approx(0.5, abs=0.02)
+
+    def test_speech_rate_mono_is_unchanged(self):
+        data = make_wav(16000, 1)
+        assert prepare_speech_audio(data) == (data, 'audio/wav')
+
+    def test_non_wav_is_unchanged(self):
+        assert prepare_speech_audio(b'not audio') == (b'not audio', 'audio/wav')
+
+    def test_resample_removes_aliasing_tones(self):
+        rate = 48000
+        times = np.arange(rate) / rate
+        high = np.sin(2 * np.pi * 12000 * times).astype(np.float32)
+        assert np.abs(resample(high, rate, SPEECH_SAMPLE_RATE)[100:-100]).max() < 0.1
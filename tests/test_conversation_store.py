@@ -0,0 +1,118 @@
+import pytest
+import sys
+import os
+import time
+
+# Add the parent directory to sys.path to import the store module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from conversation_store import ConversationStore
+
+
+class TestConversationStore:
+    """Test snapshotting and rehydrating assistant conversations"""
+
+    def setup_method(self):
+        """Setup for each test method"""
+        self.store = ConversationStore(db_path=":memory:", max_messages=5)
+        self.history = [
+            {"role": "user", "content": "What's for dinner?"},
+            {"role": "assistant", "content": "How about a lentil curry?"},
+        ]
+
+    def _message_rows(self, user_key):
+        return self.store._conn.execute(
+            "SELECT seq, content FROM messages WHERE user_key = ? ORDER BY seq", (user_key,)
+        ).fetchall()
+
+    def test_snapshot_and_load_round_trip(self):
+        """Test a stored conversation is returned with its IDs"""
+        self.store.snapshot("user:1", self.history, thread_id="resp_1", response_id="resp_1")
+        snapshot = self.store.load("user:1")
+
+        assert snapshot["chat_history"] == self.history
+        assert snapshot["thread_id"] == "resp_1"
+        assert snapshot["response_id"] == "resp_1"
+
+    def test_missing_user_returns_none(self):
+        """Test loading an unknown user returns None"""
+        assert self.store.load("user:missing") is None
+
+    def test_structured_content_is_preserved(self):
+        """Test dict content (e.g. payment buttons) survives serialization"""
+        history = [{"role": "assistant", "content": {"html_button": "<a href='#'>Pay</a>"}}]
+        self.store.snapshot("user:1", history)
+        assert self.store.load("user:1")["chat_history"] == history
+
+    def test_snapshot_is_incremental(self):
+        """Test only new messages are written when the conversation continues"""
+        self.store.snapshot("user:1", self.history, thread_id="resp_1")
+        self.store._conn.execute(
+            "UPDATE messages SET content = '\"sentinel\"' WHERE user_key = 'user:1' AND seq = 0"
+        )
+        # The first message digest still matches the session, so seq 0 must not be rewritten
+        extended = self.history + [{"role": "user", "content": "Make it spicy"}]
+        self.store.snapshot("user:1", extended, thread_id="resp_2")
+
+        rows = self._message_rows("user:1")
+        assert [seq for seq, _ in rows] == [0, 1, 2]
+        assert rows[0][1] == '"sentinel"'
+        assert self.store.load("user:1")["thread_id"] == "resp_2"
+
+    def test_new_conversation_rewrites_snapshot(self):
+        """Test a different conversation replaces the stored messages"""
+        self.store.snapshot("user:1", self.history)
+        new_history = [{"role": "user", "content": "Start over"}]
+        self.store.snapshot("user:1", new_history)
+
+        assert self.store.load("user:1")["chat_history"] == new_history
+
+    def test_message_cap_keeps_latest_messages(self):
+        """Test conversations are trimmed to the newest max_messages"""
+        history = [{"role": "user", "content": f"message {i}"} for i in range(8)]
+        self.store.snapshot("user:1", history)
+
+        restored = self.store.load("user:1")["chat_history"]
+        assert restored == history[-5:]
+
+    def test_long_messages_are_truncated(self):
+        """Test oversized message content is capped"""
+        store = ConversationStore(db_path=":memory:", max_message_chars=10)
+        store.snapshot("user:1", [{"role": "assistant", "content": "x" * 50}])
+        assert store.load("user:1")["chat_history"][0]["content"] == "x" * 10
+
+    def test_expired_snapshots_are_ignored_and_evicted(self):
+        """Test TTL expiry hides and evicts old conversations"""
+        store = ConversationStore(db_path=":memory:", ttl_seconds=60)
+        store.snapshot("user:1", self.history)
+        store._conn.execute("UPDATE conversations SET updated_at = ?", (time.time() - 120,))
+
+        assert store.load("user:1") is None
+        assert store.evict() == 1
+        assert self._rows_for(store, "user:1") == 0
+
+    def test_conversation_cap_evicts_least_recent(self):
+        """Test the store keeps at most max_conversations users"""
+        store = ConversationStore(db_path=":memory:", max_conversations=2)
+        for user_id in range(3):
+            store.snapshot(f"user:{user_id}", self.history)
+            store._conn.execute(
+                "UPDATE conversations SET updated_at = ? WHERE user_key = ?",
+                (time.time() - 100 + user_id, f"user:{user_id}")
+            )
+
+        assert store.evict() == 1
+        assert store.load("user:0") is None
+        assert store.load("user:2") is not None
+
+    def test_clear_removes_conversation(self):
+        """Test clearing a user's snapshot"""
+        self.store.snapshot("user:1", self.history)
+        self.store.clear("user:1")
+        assert self.store.load("user:1") is None
+
+    @staticmethod
+    def _rows_for(store, user_key):
+        return store._conn.execute(
+            "SELECT COUNT(*) FROM messages WHERE user_key = ?", (user_key,)
+        ).fetchone()[0]
@@ -0,0 +1,122 @@
+import pytest
+import sys
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the parent directory to sys.path to import the queue module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests.fakes import FakeResponse, FakeSession
+from gamification_queue import GamificationEventQueue, MAX_ATTEMPTS, MAX_AUTH_RETRIES, extract_gamification_state
+
+
+class GamificationSession(FakeSession):
+    """Accepts every event unless told otherwise and serves a fixed state."""
+
+    def __init__(self, post_responses=None, state=None):
+        super().__init__({
+            'http://api/gamification/api/event/': list(post_responses or []),
+            'http://api/gamification/api/streamlit-data/': FakeResponse(payload=state or {'points': 10, 'meal_plan_streak': 1}),
+        }, default=FakeResponse(payload={}))
+
+    @property
+    def posted(self):
+        return [kwargs['json']['event_type'] for method, _, kwargs in self.calls if method == 'post']
+
+    @property
+    def gets(self):
+        return len(self.urls('get'))
+
+
+class TestExtractGamificationState:
+    """Test reading gamification state from event responses"""
+
+    def test_nested_and_top_level_state(self):
+        assert extract_gamification_state({'streamlit_data': {'points': 5}}) == {'points': 5}
+        assert extract_gamification_state({'points': 5, 'meal_plan_streak': 2})['points'] == 5
+
+    def test_acknowledgement_carries_no_state(self):
+        assert extract_gamification_state({'status': 'ok'}) is None
+        assert extract_gamification_state(None) is None
+
+
+class TestGamificationEventQueue:
+    """Test batching and flushing gamification events"""
+
+    def setup_method(self):
+        """Setup for each test method"""
+        self.queue = GamificationEventQueue()
+        self.executor = ThreadPoolExecutor(max_workers=1)
+
+    def teardown_method(self):
+        self.executor.shutdown(wait=True)
+
+    def _flush(self, session):
+        assert self.queue.start_flush(self.executor, session, 'http://api', {})
+        self.queue._future.result(timeout=5)
+        outcome = self.queue.collect()
+        return outcome['state']
+
+    def test_batch_is_refreshed_once(self):
+        """Test a batch of events triggers a single state refresh"""
+        session = GamificationSession()
+        self.queue.enqueue('review', {'rating': 5})
+        self.queue.enqueue('meal_planned')
+        assert self._flush(session) == {'points': 10, 'meal_plan_streak': 1}
+        assert session.posted == ['review', 'meal_planned']
+        assert session.gets == 1
+        assert not self.queue.busy()
+
+    def test_state_from_event_response_skips_refresh(self):
+        """Test state returned with the event is used directly"""
+        session = GamificationSession([FakeResponse(payload={'streamlit_data': {'points': 42}})])
+        self.queue.enqueue('cooking')
+        assert self._flush(session) == {'points': 42}
+        assert session.gets == 0
+
+    def test_only_one_flush_in_flight(self):
+        """Test events queued during a flush wait for the next one"""
+        session = GamificationSession()
+        self.queue.enqueue('review')
+        assert self.queue.start_flush(self.executor, session, 'http://api', {})
+        self.queue.enqueue('cooking')
+        assert not self.queue.start_flush(self.executor, session, 'http://api', {})
+        self.queue._future.result(timeout=5)
+        self.queue.collect()
+        assert self.queue.pending_count == 1
+
+    def test_failed_events_are_retried_then_dropped(self):
+        """Test failed events are requeued up to MAX_ATTEMPTS times"""
+        self.queue.enqueue('review')
+        for attempt in range(MAX_ATTEMPTS):
+            session = GamificationSession([FakeResponse(status_code=500)])
+            assert self._flush(session) is None
+            assert session.gets == 0
+        assert not self.queue.busy()
+
+    def test_expired_token_requeues_batch(self):
+        """Test a 401 stops the batch and requeues it without using up attempts"""
+        self.queue.enqueue('review')
+        self.queue.enqueue('cooking')
+        session = GamificationSession([FakeResponse(status_code=401)])
+        assert self.queue.start_flush(self.executor, session, 'http://api', {})
+        self.queue._future.result(timeout=5)
+        assert self.queue.collect() == {'state': None, 'auth_expired': True}
+        assert session.posted == ['review']
+        assert self.queue.pending_count == 2
+
+        session = GamificationSession()
+        assert self._flush(session) == {'points': 10, 'meal_plan_streak': 1}
+        assert session.posted == ['review', 'cooking']
+        assert not self.queue.busy()
+
+    def test_repeated_401_counts_as_failure(self):
+        """Test a 401 after the token refresh is retried like any other failure"""
+        self.queue.enqueue('review')
+        for attempt in range(MAX_AUTH_RETRIES + MAX_ATTEMPTS):
+            session = GamificationSession([FakeResponse(status_code=401)])
+            assert self._flush(session) is None
+        assert not self.queue.busy()
+
+    def test_collect_before_finish_returns_no_state(self):
+        assert self.queue.collect() == {'state': None, 'auth_expired': False}
@@ -0,0 +1,82 @@
+import pytest
+import sys
+import os
+
+# Add the parent directory to sys.path to import the cache module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from guest_response_cache import (
+    GuestResponseCache, is_first_guest_turn, mark_guest_turn, normalize_prompt, reset_guest_turns
+)
+
+
+class TestNormalizePrompt:
+    """Test prompt normalization for cache keys"""
+
+    def test_case_whitespace_and_punctuation_are_ignored(self):
+        assert normalize_prompt("  What can   you DO? ") == normalize_prompt("what can you do")
+
+    def test_empty_and_long_prompts_are_not_cached(self):
+        assert normalize_prompt("") is None
+        assert normalize_prompt("?!") is None
+        assert normalize_prompt("a" * 301) is None
+
+
+class TestGuestResponseCache:
+    """Test recording and replaying guest responses"""
+
+    def setup_method(self):
+        """Setup for each test method"""
+        self.cache = GuestResponseCache(ttl_seconds=60, max_entries=2, enabled=True)
+        self.events = [
+            {'type': 'response.created', 'id': 'resp_1'},
+            {'type': 'response.function_call', 'name': 'guest_search_chefs'},
+            {'type': 'text', 'content': 'I can help you '},
+            {'type': 'text', 'content': 'plan meals.'},
+            {'type': 'response.completed', 'id': 'resp_1'},
+        ]
+
+    def test_hit_replays_events_without_response_id(self):
+        """Test a cached response is found by a differently typed prompt"""
+        assert self.cache.put("What can you do?", self.events)
+        replay = self.cache.get("what can you do")
+        assert [e['type'] for e in replay] == [
+            'response.function_call', 'text', 'text', 'response.completed'
+        ]
+
+    def test_incomplete_responses_are_not_cached(self):
+        """Test interrupted or empty responses are never stored"""
+        assert not self.cache.put("hi", self.events[:-1])
+        assert not self.cache.put("hi", [{'type': 'response.completed'}])
+        assert self.cache.get("hi") is None
+
+    def test_size_limit_evicts_entries(self):
+        """Test the cache never grows past max_entries"""
+        for prompt in ("one", "two", "three"):
+            self.cache.put(prompt, self.events)
+        assert sum(self.cache.get(p) is not None for p in ("one", "two", "three")) == 2
+
+    def test_disabled_cache_is_a_no_op(self):
+        """Test the cache stays inactive unless opted in"""
+        cache = GuestResponseCache(enabled=False)
+        assert not cache.put("What can you do?", self.events)
+        assert cache.get("What can you do?") is None
+
+
+class TestGuestTurns:
+    """Test which guest messages may use the response cache"""
+
+    def test_follow_up_after_replay_is_not_a_first_turn(self):
+        """Test a replayed answer, which leaves no thread ID, still ends the first turn"""
+        session_state = {}
+        assert is_first_guest_turn(session_state, None)
+        mark_guest_turn(session_state)
+        # "tell me more" arrives without a thread ID after a replayed answer
+        assert not is_first_guest_turn(session_state, None)
+
+    def test_thread_and_new_conversation(self):
+        session_state = {}
+        assert not is_first_guest_turn(session_state, 'resp_1')
+        mark_guest_turn(session_state)
+        reset_guest_turns(session_state)
+        assert is_first_guest_turn(session_state, None)
@@ -0,0 +1,96 @@
+import pytest
+import sys
+import os
+
+# Add the parent directory to sys.path to import the index module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from history_search import HistorySearchIndex, build_match_query, resume_id_for
+
+
+class TestHistorySearchIndex:
+    """Test the per-user full-text index over chat history"""
+
+    def setup_method(self):
+        """Setup for each test method"""
+        self.index = HistorySearchIndex(db_path=":memory:")
+        self.curry_thread = {
+            'id': 1, 'title': 'Weeknight dinners', 'created_at': '2025-01-02T10:00:00.000000Z',
+            'openai_thread_id': ['resp_a', 'resp_b'],
+        }
+        self.budget_thread = {
+            'id': 2, 'title': 'Grocery budget', 'created_at': '2025-01-03T10:00:00.000000Z',
+            'openai_thread_id': 'resp_c',
+        }
+        self.index.index_thread("user:1", self.curry_thread, [
+            {'role': 'user', 'content': 'Ideas for a quick lentil curry?'},
+            {'role': 'assistant', 'content': 'Try a coconut lentil curry with spinach.'},
+        ])
+        self.index.index_thread("user:1", self.budget_thread, [
+            {'role': 'user', 'content': 'How can I keep groceries under $80 a week?'},
+        ])
+
+    def test_search_finds_message_content(self):
+        """Test matches inside message bodies"""
+        results = self.index.search("user:1", "lentil")
+        assert [r['thread_id'] for r in results] == ['1']
+        assert results[0]['resume_id'] == 'resp_b'
+        assert '**lentil**' in results[0]['snippet'].lower()
+
+    def test_search_finds_titles_and_prefixes(self):
+        """Test title matches and partially typed words"""
+        results = self.index.search("user:1", "budg")
+        assert [r['thread_id'] for r in results] == ['2']
+
+    def test_results_are_one_per_thread(self):
+        """Test a thread matching several messages appears once"""
+        results = self.index.search("user:1", "curry")
+        assert len(results) == 1
+
+    def test_title_match_outranks_body_match(self):
+        """Test title hits rank above message body hits"""
+        self.index.index_thread("user:1", {'id': 3, 'title': 'Curry night', 'openai_thread_id': []}, [])
+        results = self.index.search("user:1", "curry")
+        assert results[0]['thread_id'] == '3'
+
+    def test_search_is_scoped_per_user(self):
+        """Test users never see each other's threads"""
+        assert self.index.search("user:2", "lentil") == []
+
+    def test_search_ignores_fts_syntax(self):
+        """Test user input cannot break the MATCH expression"""
+        assert self.index.search("user:1", 'curry" (*') != []
+        assert self.index.search("user:1", '!!!') == []
+
+    def test_incremental_indexing_appends_new_messages(self):
+        """Test only messages beyond the indexed count are added"""
+        messages = [
+            {'role': 'user', 'content': 'Ideas for a quick lentil curry?'},
+            {'role': 'assistant', 'content': 'Try a coconut lentil curry with spinach.'},
+            {'role': 'user', 'content': 'Can I swap spinach for kale?'},
+        ]
+        thread = dict(self.curry_thread, openai_thread_id=['resp_a', 'resp_b', 'resp_d'])
+        added = self.index.index_thread("user:1", thread, messages)
+
+        assert added == 1
+        assert self.index.known_threads("user:1")['1'] == {'resume_id': 'resp_d', 'message_count': 3}
+        assert [r['thread_id'] for r in self.index.search("user:1", "kale")] == ['1']
+
+    def test_clear_removes_user_index(self):
+        """Test clearing a user's index"""
+        self.index.clear("user:1")
+        assert self.index.known_threads("user:1") == {}
+        assert self.index.search("user:1", "lentil") == []
+
+
+class TestHistorySearchHelpers:
+    """Test query building and resume ID helpers"""
+
+    def test_build_match_query(self):
+        assert build_match_query('lentil curry') == '"lentil"* "curry"*'
+        assert build_match_query('  ') is None
+
+    def test_resume_id_for(self):
+        assert resume_id_for({'openai_thread_id': ['a', 'b']}) == 'b'
+        assert resume_id_for({'openai_thread_id': 'a'}) == 'a'
+        assert resume_id_for({'openai_thread_id': []}) is None
@@ -0,0 +1,455 @@
+import pytest
+import sys
+import os
+import json
+from datetime import date
+
+# Add the parent directory to sys.path to import the helpers
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests.fakes import FakeResponse, FakeSession
+from meal_plan_utils import (
+    ChefMealEventIndex, ChefMealWeek, chef_meals_area_key, chef_meals_cache_key, load_chef_meals, load_chef_meals_week, localize_chef_meals,
+    meal_is_compatible, page_chef_meals,
+    ReviewCache, review_list,
+    InstacartLinkCache, request_instacart_link,
+    InstructionParseCache, instruction_label, instructions_complete, parse_instruction,
+    MealPlanWeekCache, MealPreferenceIndex, extract_preference_names, first_meal_plan,
+    build_meal_plan_table, prefetch_meal_plan_week, source_badges, source_help_texts
+)
+
+
+class TestMealPreferenceIndex:
+    """Test the meal → dietary preference index"""
+
+    def setup_method(self):
+        """Setup for each test method"""
+        self.index = MealPreferenceIndex(ttl_seconds=60)
+        self.index.add(1, {'dietary_preferences': [{'name': 'Vegan'}, {'name': 'Gluten-Free'}]})
+        self.index.add(2, {'dietary_preferences': ['Vegan']})
+        self.index.add(3, {'dietary_preferences': []})
+
+    def test_extract_preference_names_handles_both_formats(self):
+        assert extract_preference_names({'dietary_preferences': [{'name': 'Keto'}, {'id': 4}]}) == {'Keto'}
+        assert extract_preference_names({'dietary_preferences': ['Keto']}) == {'Keto'}
+        assert extract_preference_names({}) == frozenset()
+
+    def test_missing_returns_uncached_ids_once(self):
+        assert self.index.missing([1, 4, 4, 2, 5]) == [4, 5]
+
+    def test_matching_requires_every_preference(self):
+        assert self.index.matching([1, 2, 3], ['Vegan']) == [1, 2]
+        assert self.index.matching([1, 2, 3], ['Vegan', 'Gluten-Free']) == [1]
+
+    def test_uncached_meals_never_match(self):
+        assert self.index.matching([4], []) == []
+
+    def test_invalidate(self):
+        self.index.invalidate([1])
+        assert self.index.get(1) is None
+        assert self.index.get(2) == {'Vegan'}
+        self.index.invalidate()
+        assert self.index.missing([1, 2, 3]) == [1, 2, 3]
+
+
+class TestMealPlanWeekCache:
+    """Test the session-scoped per-week meal plan cache"""
+
+    def setup_method(self):
+        """Setup for each test method"""
+        self.week = date(2025, 6, 2)
+        self.cache = MealPlanWeekCache(ttl_seconds=60)
+        self.cache.put(self.week, {'meal_plans': [{
+            'id': 7,
+            'meal_prep_preference': 'daily',
+            'meals': [{'meal_plan_meal_id': 1}, {'meal_plan_meal_id': 2}],
+        }]})
+        self.cache.put_details(self.week, {'is_approved': False})
+
+    def test_first_meal_plan_handles_all_formats(self):
+        plan = {'id': 1}
+        assert first_meal_plan({'meal_plans': [plan]}) is plan
+        assert first_meal_plan({'results': [plan]}) is plan
+        assert first_meal_plan([plan]) is plan
+        assert first_meal_plan({'meal_plans': []}) is None
+
+    def test_weeks_are_cached_independently(self):
+        assert self.cache.get(self.week)['details'] == {'is_approved': False}
+        assert self.cache.get(date(2025, 6, 9)) is None
+        self.cache.invalidate(self.week)
+        assert self.cache.get(self.week) is None
+
+    def test_empty_weeks_are_not_cached(self):
+        assert not self.cache.put(self.week, {'meal_plans': []})
+        assert self.cache.get(self.week) is None
+
+    def test_entries_expire(self):
+        self.cache.ttl_seconds = -1
+        assert self.cache.get(self.week) is None
+
+    def test_apply_approval_updates_in_place(self):
+        assert self.cache.apply_approval(self.week, 'one_day_prep', order_id=3, requires_payment=True)
+        entry = self.cache.get(self.week)
+        assert entry['details']['is_approved'] is True
+        assert entry['details']['pending_order_id'] == 3
+        assert first_meal_plan(entry['meal_plan_data'])['meal_prep_preference'] == 'one_day_prep'
+
+    def test_apply_approval_without_details_invalidates(self):
+        week = date(2025, 6, 9)
+        self.cache.put(week, [{'id': 8, 'meals': []}])
+        assert not self.cache.apply_approval(week)
+        assert self.cache.get(week) is None
+
+    def test_remove_meals_updates_in_place(self):
+        assert self.cache.remove_meals(self.week, [1])
+        meals = first_meal_plan(self.cache.get(self.week)['meal_plan_data'])['meals']
+        assert meals == [{'meal_plan_meal_id': 2}]
+
+    def test_cache_is_bounded(self):
+        cache = MealPlanWeekCache(ttl_seconds=60, max_weeks=2)
+        for offset in range(3):
+            cache.put(date(2025, 6, 2 + 7 * offset), [{'id': offset, 'meals': []}])
+        assert cache.get(date(2025, 6, 2)) is None
+        assert cache.get(date(2025, 6, 16)) is not None
+
+    def test_put_skips_writes_after_invalidation(self):
+        version = self.cache.version(self.week)
+        self.cache.invalidate(self.week)
+        assert not self.cache.put(self.week, [{'id': 7, 'meals': []}], if_version=version)
+        assert self.cache.get(self.week) is None
+
+
+class TestPrefetchMealPlanWeek:
+    """Test background prefetching of a week"""
+
+    def setup_method(self):
+        """Setup for each test method"""
+        self.week = date(2025, 6, 9)
+        self.cache = MealPlanWeekCache(ttl_seconds=60)
+
+    def test_prefetch_caches_plan_and_details(self):
+        session = FakeSession({
+            "http://api/meals/api/meal_plans/": FakeResponse(200, {'meal_plans': [{'id': 9, 'meals': []}]}),
+            "http://api/meals/api/meal_plans/9/": FakeResponse(200, {'is_approved': True}),
+        })
+        assert prefetch_meal_plan_week(session, "http://api", {}, self.week, self.cache)
+        assert self.cache.get(self.week)['details'] == {'is_approved': True}
+
+        # A cached week is not fetched again
+        assert prefetch_meal_plan_week(session, "http://api", {}, self.week, self.cache)
+        assert len(session.calls) == 2
+
+    def test_prefetch_leaves_week_uncached_on_error(self):
+        session = FakeSession({"http://api/meals/api/meal_plans/": FakeResponse(401)})
+        assert not prefetch_meal_plan_week(session, "http://api", {}, self.week, self.cache)
+        assert self.cache.get(self.week) is None
+
+
+class TestBuildMealPlanTable:
+    """Test the columnar meal plan table builder"""
+
+    def setup_method(self):
+        """Setup for each test method"""
+        self.week = date(2025, 6, 2)
+        self.meal_plan = {'id': 5, 'meals': [
+            {'day': 'Tuesday', 'meal_plan_meal_id': 2, 'meal_type': 'Dinner',
+             'meal': {'id': 11, 'name': 'Stew', 'description': 'Beef stew'}},
+            {'day': 'Monday', 'meal_plan_meal_id': 1, 'meal_type': 'Lunch', 'chef_name': 'Ana',
+             'meal': {'id': 10, 'name': 'Soup', 'description': 'Miso',
+                      'chef_meal_events': [{'current_price': 12}], 'price': 15}},
+            {'day': 'Monday', 'meal_plan_meal_id': 3, 'meal_type': 'Breakfast',
+             'meal': {'id': 12, 'name': 'Eggs', 'description': 'Scrambled'}},
+        ]}
+
+    def test_rows_are_typed_and_sorted(self):
+        table = build_meal_plan_table(self.meal_plan, self.week)
+        assert table['Meal Plan Meal ID'].tolist() == [3, 1, 2]
+        assert table['Day'].cat.ordered and table['Meal Type'].cat.ordered
+        assert table['Meal Date'].tolist() == [date(2025, 6, 2), date(2025, 6, 2), date(2025, 6, 3)]
+        assert table['date_key'].tolist() == ['2025-06-02', '2025-06-02', '2025-06-03']
+
+    def test_source_badges_and_tooltips(self):
+        table = build_meal_plan_table(self.meal_plan, self.week)
+        assert source_badges(table).tolist() == ["🤖 ASSISTANT", "👨‍🍳 CHEF", "🤖 ASSISTANT"]
+        assert source_help_texts(table)[1] == "Created by Chef Ana - Price: $12"
+
+    def test_empty_plan(self):
+        assert build_meal_plan_table({'id': 5, 'meals': []}, self.week).empty
+
+    def test_table_is_built_once_per_plan_version(self):
+        cache = MealPlanWeekCache(ttl_seconds=60)
+        cache.put(self.week, [self.meal_plan])
+        table = cache.table(self.week)
+        assert cache.table(self.week) is table
+
+        cache.remove_meals(self.week, [1])
+        assert cache.table(self.week)['Meal Plan Meal ID'].tolist() == [3, 2]
+
+
+class TestInstructionParsing:
+    """Test parsing and caching of cooking instructions"""
+
+    def setup_method(self):
+        """Setup for each test method"""
+        self.daily = {
+            'meal_plan_meal_id': 4, 'instruction_type': 'daily', 'date': '2025-06-02', 'meal_name': 'Soup',
+            'instructions': json.dumps({'steps': [{'step_number': 1, 'description': 'Boil', 'duration': '5m'}]}),
+        }
+        self.bulk = {
+            'instruction_type': 'bulk_prep',
+            'instructions': json.dumps([{'step_number': 1, 'description': 'Chop', 'ingredients': ['leek']}]),
+        }
+
+    def test_instructions_complete_only_when_every_meal_is_ready(self):
+        assert not instructions_complete([], [4, 5])
+        # The same partial set returned twice in a row is still incomplete
+        assert not instructions_complete([self.daily], [4, 5])
+        assert not instructions_complete([self.daily, {'meal_plan_meal_id': 5, 'instructions': None}], [4, 5])
+        assert instructions_complete([self.daily, dict(self.daily, meal_plan_meal_id=5)], ['4', '5'])
+        assert instructions_complete([self.bulk], [4, 5])
+
+    def test_parse_daily_and_bulk_instructions(self):
+        daily = parse_instruction(self.daily)
+        assert daily['title'] == "Instructions for Soup on 2025-06-02"
+        assert daily['steps'][0]['duration'] == '5m'
+        bulk = parse_instruction(self.bulk)
+        assert bulk['steps'][0]['ingredients'] == ['leek']
+        assert bulk['steps'][0]['duration'] == 'N/A'
+
+    def test_parse_missing_and_malformed_instructions(self):
+        assert parse_instruction({'instruction_type': 'daily'}) is None
+        with pytest.raises(ValueError):
+            parse_instruction({'instruction_type': 'daily', 'instructions': '{not json'})
+        with pytest.raises(ValueError):
+            parse_instruction({'instruction_type': 'other', 'instructions': '{}'})
+
+    def test_instruction_label(self):
+        assert instruction_label(self.daily, 0) == "Soup - 2025-06-02"
+        assert instruction_label(self.bulk, 1) == "Bulk Prep Instructions"
+
+    def test_cache_parses_once_per_version(self):
+        cache = InstructionParseCache()
+        first = cache.get(self.daily)
+        assert cache.get(dict(self.daily)) is first
+
+        regenerated = dict(self.daily, instructions=json.dumps({'steps': []}))
+        assert cache.get(regenerated) is not first
+        assert cache.get(regenerated)['steps'] == []
+
+
+class FakeFuture:
+    def __init__(self, result=None, done=True):
+        self._result = result
+        self._done = done
+
+    def done(self):
+        return self._done
+
+    def result(self):
+        return self._result
+
+
+class TestInstacartLinkCache:
+    """Test Instacart link caching and background job collection"""
+
+    def setup_method(self):
+        """Setup for each test method"""
+        self.links = InstacartLinkCache()
+
+    def test_put_and_invalidate(self):
+        self.links.put(7, "https://instacart/list", True)
+        assert self.links.get(7) == {'instacart_url': "https://instacart/list", 'has_url': True}
+        self.links.invalidate(7, meals_changed=True)
+        assert self.links.get(7) is None
+        assert self.links.needs_refresh(7)
+
+    def test_running_job_is_not_collected(self):
+        self.links.start_job(7, FakeFuture(done=False))
+        assert self.links.finish_job(7) is None
+        assert self.links.job(7) is not None
+
+    def test_successful_job_updates_link(self):
+        self.links.invalidate(7, meals_changed=True)
+        self.links.start_job(7, FakeFuture({'status': 'success', 'instacart_url': "https://instacart/new"}))
+        assert self.links.finish_job(7)['status'] == 'success'
+        assert self.links.job(7) is None
+        assert self.links.get(7)['instacart_url'] == "https://instacart/new"
+        assert not self.links.needs_refresh(7)
+
+    def test_request_instacart_link_reports_errors(self):
+        class Session:
+            def post(self, url, **kwargs):
+                return FakeResponse(200, {'status': 'error', 'message': 'No items'})
+        result = request_instacart_link(Session(), "http://api", {}, {'meal_plan_id': 7})
+        assert result == {'status': 'error', 'instacart_url': None, 'message': 'No items'}
+
+
+class TestReviewCache:
+    """Test the review list cache"""
+
+    def test_review_list_handles_paginated_responses(self):
+        assert review_list([{'rating': 5}]) == [{'rating': 5}]
+        assert review_list({'results': [{'rating': 4}], 'next': None}) == [{'rating': 4}]
+        assert review_list(None) == []
+
+    def test_put_missing_and_invalidate(self):
+        cache = ReviewCache(ttl_seconds=60)
+        cache.put('meal', 1, [{'rating': 5}])
+        assert cache.missing('meal', [1, 2, 2]) == [2]
+        assert cache.missing('meal_plan', [1]) == [1]
+        cache.invalidate('meal', 1)
+        assert cache.get('meal', 1) is None
+
+    def test_user_review_lookup(self):
+        cache = ReviewCache(ttl_seconds=60)
+        assert cache.user_review('meal', 1, 7) == (False, None)
+        cache.put('meal', 1, [{'user': 3, 'rating': 4}, {'user': 7, 'rating': 5}])
+        assert cache.user_review('meal', 1, 7) == (True, {'user': 7, 'rating': 5})
+        assert cache.user_review('meal', 1, 8) == (True, None)
+        cache.put('meal', 2, [{'user': 3, 'rating': 4}], has_more=True)
+        assert cache.user_review('meal', 2, 7) == (False, None)
+        cache.set_user_review('meal', 2, 7, {'user': 7, 'rating': 2})
+        assert cache.user_review('meal', 2, 7) == (True, {'user': 7, 'rating': 2})
+
+
+class TestChefMealListings:
+    """Test shared chef meal listings with local compatibility"""
+
+    def setup_method(self):
+        """Setup for each test method"""
+        self.listing = {'status': 'success', 'data': {'meals': [
+            {'id': 1, 'dietary_preferences': ['Vegan', 'Gluten-Free'], 'allergens': ['Soy']},
+            {'id': 2, 'dietary_preferences': [{'name': 'Vegetarian'}]},
+        ], 'total_pages': 1}}
+
+    def test_cache_key_normalizes_postal_code(self):
+        assert chef_meals_cache_key('GB', 'sw1a 1aa', '2025-06-02') == chef_meals_cache_key('gb', 'SW1A1AA', '2025-06-02')
+
+    def test_cache_key_separates_countries_sharing_a_postal_code(self):
+        """Test the same postal code in two countries gets separate listings"""
+        assert chef_meals_cache_key('US', '10115', '2025-06-02') != chef_meals_cache_key('DE', '10115', '2025-06-02')
+        key = chef_meals_cache_key('DE', '10115', '2025-06-02')
+        assert key[:3] == chef_meals_area_key('DE', '10115')
+        assert key[:3] != chef_meals_area_key('US', '10115')
+
+    def test_load_strips_per_user_fields(self):
+        url = 'http://api/meals/api/chef-meals-by-postal-code/'
+        body = {'data': {'meals': [{'id': 1, 'is_compatible': True}]}}
+        data = load_chef_meals(FakeSession({url: FakeResponse(200, body)}), 'http://api', {}, {'page': 1})
+        assert data['data']['meals'] == [{'id': 1}]
+
+    def test_load_raises_on_error(self):
+        url = 'http://api/meals/api/chef-meals-by-postal-code/'
+        with pytest.raises(RuntimeError):
+            load_chef_meals(FakeSession({url: FakeResponse(401)}), 'http://api', {}, {})
+
+    def test_compatibility_checks_preferences_and_allergies(self):
+        vegan_meal = self.listing['data']['meals'][0]
+        assert meal_is_compatible(vegan_meal, ['vegan', 'Everything'])
+        assert not meal_is_compatible(vegan_meal, ['Keto'])
+        assert not meal_is_compatible(vegan_meal, [], [{'name': 'soy'}])
+        assert meal_is_compatible(vegan_meal, [], ['None'])
+
+    def test_localize_filters_without_touching_shared_data(self):
+        shared = self.listing['data']['meals']
+        meals = localize_chef_meals(shared, [{'name': 'Vegan'}], compatible_only=True)
+        assert [m['id'] for m in meals] == [1]
+        assert meals[0]['is_compatible'] is True
+        assert 'is_compatible' not in shared[0]
+        assert len(shared) == 2
+
+
+class PagedSession:
+    """Serves chef meal listing pages by the requested page number"""
+
+    def __init__(self, pages, fail_page=None):
+        self.pages = pages
+        self.fail_page = fail_page
+        self.requested = []
+
+    def get(self, url, params=None, **kwargs):
+        page = params['page']
+        self.requested.append(page)
+        if page == self.fail_page:
+            return FakeResponse(500)
+        return FakeResponse(200, {'data': {'meals': self.pages[page - 1], 'total_pages': len(self.pages)}})
+
+
+class TestChefMealWeek:
+    """Test loading a whole week of chef meals and filtering it locally"""
+
+    def setup_method(self):
+        """Setup for each test method"""
+        self.meals = [
+            {'id': 1, 'meal_type': 'Dinner', 'chef_id': 7,
+             'available_dates': {'2025-06-02': {'event_id': 11}, '2025-06-03': {'event_id': 12}}},
+            {'id': 2, 'meal_type': 'Lunch', 'chef': {'id': 8}, 'available_dates': {'2025-06-02': {'event_id': 21}}},
+            {'id': 3, 'meal_type': 'Dinner', 'chef_id': 8, 'available_dates': {'2025-06-03': {'event_id': 31}}},
+        ]
+        self.week = ChefMealWeek(self.meals)
+
+    def test_filter_by_date_and_meal_type(self):
+        assert [m['id'] for m in self.week.filter(event_date='2025-06-02')] == [1, 2]
+        assert [m['id'] for m in self.week.filter(event_date='2025-06-03', meal_type='Dinner')] == [1, 3]
+        assert [m['id'] for m in self.week.filter(meal_type='Lunch')] == [2]
+        assert self.week.filter(event_date='2025-06-04') == []
+
+    def test_filter_by_chef(self):
+        assert [m['id'] for m in self.week.filter(chef_id=8)] == [2, 3]
+        assert [m['id'] for m in self.week.filter(meal_type='Dinner', chef_id='7')] == [1]
+
+    def test_load_week_fetches_every_page(self):
+        session = PagedSession([self.meals[:2], [self.meals[2], self.meals[0]], []])
+        week = load_chef_meals_week(session, 'http://api', {}, '2025-06-02', page_size=2)
+        assert sorted(session.requested) == [1, 2, 3]
+        assert [m['id'] for m in week.meals] == [1, 2, 3]
+
+    def test_load_week_fails_on_any_page(self):
+        session = PagedSession([self.meals[:1], self.meals[1:2]], fail_page=2)
+        with pytest.raises(RuntimeError):
+            load_chef_meals_week(session, 'http://api', {}, '2025-06-02', page_size=1)
+
+    def test_page_chef_meals_clamps_page(self):
+        data = page_chef_meals(self.meals, page=5, page_size=2)
+        assert data['data']['current_page'] == 2
+        assert data['data']['total_pages'] == 2
+        assert [m['id'] for m in data['data']['meals']] == [3]
+        assert page_chef_meals([], 1, 10)['data']['total_pages'] == 1
+
+
+class TestChefMealEventIndex:
+    """Test the meal → date → event index used by chef meal cards"""
+
+    def setup_method(self):
+        """Setup for each test method"""
+        self.index = ChefMealEventIndex([
+            {'id': 1, 'price': '9.00',
+             'chef_meal_events': [{'id': 11, 'current_price': '12.50'}, {'id': 12, 'current_price': '11.00'}],
+             'available_dates': {
+                 '2025-06-02': {'event_id': 11, 'day_name': 'Monday', 'orders_count': 3, 'max_orders': 4},
+                 '2025-06-03': {'event_id': 12, 'day_name': 'Tuesday', 'price': '10.00'},
+             }},
+            {'id': 2, 'price': 8, 'available_dates': {'2025-06-04': {'event_id': 21, 'day_name': 'Wednesday'}}},
+        ])
+
+    def test_event_lookup_with_capacity(self):
+        event = self.index.get(1, '2025-06-02')
+        assert event['event_id'] == 11
+        assert event['remaining'] == 1
+        assert event['capacity_pct'] == 75
+        assert self.index.get(1, '2025-06-04') is None
+        assert self.index.get(3, '2025-06-02') is None
+
+    def test_event_price_falls_back_to_meal_events_then_base(self):
+        assert self.index.get(1, '2025-06-03')['price'] == 10.0
+        assert self.index.get(1, '2025-06-02')['price'] == 12.5
+        assert self.index.get(1, '2025-06-02')['has_event_price']
+        event = self.index.get(2, '2025-06-04')
+        assert event['price'] == 8.0 and not event['has_event_price']
+        assert event['capacity_pct'] is None
+
+    def test_base_price_and_day_names(self):
+        assert self.index.base_price(1) == 12.5
+        assert self.index.base_price(2) == 8.0
+        assert self.index.day_names(1) == 'Monday, Tuesday'
+        assert list(self.index.dates(2)) == ['2025-06-04']
@@ -0,0 +1,272 @@
+import pytest
+import sys
+import os
+import io
+from datetime import date
+
+import pandas as pd
+
+# Add the parent directory to sys.path to import the helpers
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests.fakes import FakeResponse
+from pantry_utils import (
+    PantryCache, expiration_badge, page_pantry, pantry_change_errors, pantry_change_requests, pantry_changes_from_delta,
+    pantry_import_errors, pantry_import_rows, pantry_page_paths, pantry_payload, pantry_table, query_pantry,
+    read_pantry_import
+)
+
+
+def pantry_frame():
+    return pd.DataFrame([
+        {'ID': 1, 'Item Name': 'Beans', 'Quantity': 3, 'Weight Per Unit': None, 'Weight Unit': '',
+         'Expiration Date': date(2025, 12, 1), 'Item Type': 'Canned', 'Notes': '', 'Tags': 'Vegan', 'Delete': False},
+        {'ID': 2, 'Item Name': 'Rice', 'Quantity': 1, 'Weight Per Unit': 2.0, 'Weight Unit': 'lb',
+         'Expiration Date': None, 'Item Type': 'Dry', 'Notes': 'Basmati', 'Tags': '', 'Delete': False},
+        {'ID': 3, 'Item Name': 'Corn', 'Quantity': 2, 'Weight Per Unit': None, 'Weight Unit': '',
+         'Expiration Date': date(2026, 1, 1), 'Item Type': 'Canned', 'Notes': '', 'Tags': '', 'Delete': False},
+    ])
+
+
+class TestPantryChangesFromDelta:
+    """Test building a change set from the data editor's widget state"""
+
+    def setup_method(self):
+        """Setup for each test method"""
+        self.records = pantry_frame().drop(columns=['Delete']).to_dict('records')
+
+    def test_empty_delta_has_no_changes(self):
+        changes = pantry_changes_from_delta(self.records, {})
+        assert changes == {'updates': [], 'deletes': [], 'adds': [], 'invalid': []}
+
+    def test_edits_deletes_and_adds(self):
+        delta = {
+            'edited_rows': {'1': {'Quantity': 4, 'Notes': 'Basmati', 'Expiration Date': '2025-07-01T00:00:00'},
+                            2: {'Delete': True, 'Quantity': 9}},
+            'added_rows': [{'Item Name': 'Lentils', 'Quantity': 2, 'Expiration Date': '2026-03-01'}],
+            'deleted_rows': [0],
+        }
+        changes = pantry_changes_from_delta(self.records, delta)
+        assert [(u['id'], u['fields']) for u in changes['updates']] == [(2, ['Quantity', 'Expiration Date'])]
+        assert changes['updates'][0]['payload']['expiration_date'] == '2025-07-01'
+        assert [d['id'] for d in changes['deletes']] == [1, 3]
+        assert changes['adds'][0]['payload']['item_name'] == 'Lentils'
+        assert changes['adds'][0]['payload']['expiration_date'] == '2026-03-01'
+
+    def test_unchanged_values_and_invalid_rows(self):
+        delta = {
+            'edited_rows': {0: {'Weight Per Unit': None, 'Quantity': 3}},
+            'added_rows': [{'Quantity': 1}],
+        }
+        changes = pantry_changes_from_delta(self.records, delta)
+        assert changes['updates'] == []
+        assert len(changes['invalid']) == 1
+        assert changes['adds'] == []
+
+
+class TestPantryRequests:
+    """Test building requests and reporting failures for a change set"""
+
+    def setup_method(self):
+        """Setup for each test method"""
+        self.changes = {
+            'updates': [{'id': 2, 'fields': ['Quantity'], 'payload': {'item_name': 'Rice', 'quantity': 4}}],
+            'deletes': [{'id': 3, 'name': 'Corn'}],
+            'adds': [{'name': 'Lentils', 'payload': {'item_name': 'Lentils', 'quantity': 1}}],
+        }
+
+    def test_payload_formats_fields(self):
+        payload = pantry_payload(pantry_frame().iloc[0].to_dict())
+        assert payload['expiration_date'] == '2025-12-01'
+        assert payload['tags'] == ['Vegan']
+        assert 'weight_per_unit' not in payload and 'weight_unit' not in payload
+
+    def test_requests_are_per_item(self):
+        calls = pantry_change_requests(self.changes)
+        assert calls[('update', 2)] == ('put', '/meals/api/pantry-items/2/', {'item_name': 'Rice', 'quantity': 4}, None)
+        assert calls[('delete', 3)][:2] == ('delete', '/meals/api/pantry-items/3/')
+        assert calls[('add', 0)][:2] == ('post', '/meals/api/pantry-items/')
+
+    def test_errors_are_reported_per_item(self):
+        responses = {
+            ('update', 2): FakeResponse(400, {'quantity': ['Invalid']}),
+            ('delete', 3): FakeResponse(204),
+            ('add', 0): FakeResponse(201, {}),
+        }
+        assert pantry_change_errors(self.changes, responses) == ["Could not update 'Rice': {'quantity': ['Invalid']}"]
+        assert len(pantry_change_errors(self.changes, {})) == 3
+
+
+def api_items():
+    return [
+        {'id': 1, 'item_name': 'Beans', 'quantity': 3, 'expiration_date': '2025-12-01',
+         'item_type': 'Canned', 'notes': '', 'tags': ['Vegan']},
+        {'id': 2, 'item_name': 'rice', 'quantity': 1, 'weight_per_unit': '2.0', 'weight_unit': 'lb',
+         'expiration_date': None, 'item_type': 'Dry', 'notes': 'Basmati', 'tags': []},
+        {'id': 3, 'item_name': 'Corn', 'quantity': 2, 'expiration_date': 'not a date',
+         'item_type': 'Canned', 'notes': None, 'tags': []},
+    ]
+
+
+class TestPantryTable:
+    """Test the local pantry table: loading, querying and paging"""
+
+    def setup_method(self):
+        """Setup for each test method"""
+        self.table = pantry_table(api_items() + [api_items()[0]])
+
+    def test_page_paths_cover_remaining_pages(self):
+        first_page = {'count': 25, 'next': 'x', 'results': api_items()[:1] * 10}
+        assert pantry_page_paths(first_page) == ['/meals/api/pantry-items/?page=2', '/meals/api/pantry-items/?page=3']
+        assert pantry_page_paths({'count': 3, 'next': None, 'results': api_items()}) == []
+
+    def test_items_become_typed_rows(self):
+        assert self.table.num_rows == 3
+        rows = {row['ID']: row for row in self.table.to_pylist()}
+        assert rows[1]['Expiration Date'] == date(2025, 12, 1) and rows[1]['Tags'] == 'Vegan'
+        assert rows[2]['Weight Per Unit'] == 2.0
+        assert rows[3]['Expiration Date'] is None
+
+    def test_search_filter_and_sort(self):
+        assert query_pantry(self.table, search='BASMATI')['ID'].to_pylist() == [2]
+        assert query_pantry(self.table, search='vegan')['ID'].to_pylist() == [1]
+        assert query_pantry(self.table, item_type='Canned')['ID'].to_pylist() == [1, 3]
+        assert query_pantry(self.table)['ID'].to_pylist() == [1, 3, 2]
+        assert query_pantry(self.table, sort_by='Expiration Date', descending=True)['ID'].to_pylist() == [1, 2, 3]
+
+    def test_paging_clamps_page(self):
+        page = page_pantry(query_pantry(self.table), page=5, page_size=2)
+        assert (page['page'], page['total_pages'], page['count']) == (2, 2, 3)
+        assert [row['ID'] for row in page['records']] == [2]
+
+
+class TestPantryCache:
+    """Test patching the cached pantry with the outcome of edits"""
+
+    def setup_method(self):
+        """Setup for each test method"""
+        self.cache = PantryCache()
+        self.cache.put(api_items())
+
+    def test_apply_changes_patches_table(self):
+        changes = {
+            'updates': [{'id': 1, 'fields': ['Quantity'], 'payload': {'item_name': 'Beans', 'quantity': 5, 'tags': []}}],
+            'deletes': [{'id': 2, 'name': 'rice'}, {'id': 3, 'name': 'Corn'}],
+            'adds': [{'name': 'Lentils', 'payload': {'item_name': 'Lentils', 'quantity': 1}}],
+        }
+        responses = {
+            ('update', 1): FakeResponse(200),
+            ('delete', 2): FakeResponse(204),
+            ('delete', 3): FakeResponse(404, {'detail': 'Not found'}),
+            ('add', 0): FakeResponse(201, {'id': 9, 'item_name': 'Lentils', 'quantity': 1, 'tags': []}),
+        }
+        assert self.cache.apply_changes(changes, responses)
+        rows = {row['ID']: row for row in self.cache.get().to_pylist()}
+        assert sorted(rows) == [1, 3, 9]
+        assert rows[1]['Quantity'] == 5
+
+    def test_add_without_id_cannot_be_applied(self):
+        changes = {'updates': [], 'deletes': [], 'adds': [{'name': 'Lentils', 'payload': {}}]}
+        assert not self.cache.apply_changes(changes, {('add', 0): FakeResponse(201)})
+
+    def test_expired_cache_is_missing(self):
+        cache = PantryCache(ttl_seconds=-1)
+        cache.put(api_items())
+        assert cache.get() is None
+        self.cache.invalidate()
+        assert self.cache.get() is None and not self.cache.upsert(api_items())
+
+
+class TestExpirationIndex:
+    """Test the expiration index and its upkeep by the pantry cache"""
+
+    def setup_method(self):
+        """Setup for each test method"""
+        self.cache = PantryCache()
+        self.cache.put(api_items() + [
+            {'id': 4, 'item_name': 'Oats', 'quantity': 1, 'expiration_date': '2025-11-20', 'item_type': 'Dry', 'tags': []},
+        ])
+
+    def test_index_orders_items_by_date(self):
+        index = self.cache.expirations()
+        assert len(index) == 2
+        assert index.expiring_by(date(2025, 12, 1)) == [4, 1]
+        assert index.expiring_by(date(2025, 11, 30)) == [4]
+        assert index.count_by(date(2025, 11, 1)) == 0
+
+    def test_index_follows_cache_edits(self):
+        self.cache.upsert([{'id': 1, 'item_name': 'Beans', 'quantity': 3, 'expiration_date': '2025-11-01', 'tags': []},
+                           {'id': 3, 'item_name': 'Corn', 'quantity': 2, 'expiration_date': '2025-11-10', 'tags': []}])
+        self.cache.remove([4])
+        index = self.cache.expirations()
+        assert index.expiring_by(date(2026, 1, 1)) == [1, 3]
+        assert index.get(4) is None
+        self.cache.invalidate()
+        assert self.cache.expirations() is None
+
+    def test_badges(self):
+        today = date(2025, 11, 20)
+        assert expiration_badge(date(2025, 11, 19), today) == '⛔ Expired'
+        assert expiration_badge(today, today) == '⚠️ Today'
+        assert expiration_badge(date(2025, 11, 21), today) == '⚠️ 1 day'
+        assert expiration_badge(date(2025, 12, 31), today) == ''
+        assert expiration_badge(None, today) == ''
+
+
+class TestPantryImport:
+    """Test streaming, validating and reporting bulk pantry imports"""
+
+    def setup_method(self):
+        """Setup for each test method"""
+        self.csv = (
+            "name,QTY,expiration_date,Type,unit,weight,Tags,ignored\n"
+            "Beans,3,2025-12-01,canned,OZ,15,Vegan,x\n"
+            ",2,,,,,,\n"
+            "Rice,two,soon,Frozen,cups,,,\n"
+            ",,,,,,,\n"
+            "Oats,1,,,,,,\n"
+        ).encode()
+
+    def test_csv_is_read_in_chunks(self):
+        upload = io.BytesIO(self.csv)
+        upload.size = len(self.csv)
+        chunks = list(read_pantry_import(upload, 'pantry.csv', chunk_rows=2))
+        assert [len(chunk) for chunk, _ in chunks] == [2, 2, 1]
+        assert list(chunks[0][0].columns) == [
+            'Item Name', 'Quantity', 'Expiration Date', 'Item Type', 'Weight Unit', 'Weight Per Unit', 'Tags'
+        ]
+        assert chunks[-1][1] == 1.0
+
+    def test_missing_required_columns(self):
+        with pytest.raises(ValueError, match="'Quantity'"):
+            list(read_pantry_import(io.BytesIO(b"name,notes\nBeans,x\n"), 'pantry.csv'))
+
+    def test_rows_are_validated(self):
+        chunk = pd.concat([chunk for chunk, _ in read_pantry_import(io.BytesIO(self.csv), 'pantry.csv')])
+        adds, errors = pantry_import_rows(chunk, first_row=2)
+        assert [(add['row'], add['name']) for add in adds] == [(2, 'Beans'), (6, 'Oats')]
+        beans = adds[0]['payload']
+        assert beans['quantity'] == 3 and beans['expiration_date'] == '2025-12-01'
+        assert beans['item_type'] == 'Canned' and beans['weight_unit'] == 'oz' and beans['weight_per_unit'] == 15.0
+        assert beans['tags'] == ['Vegan']
+        assert errors[0] == "Row 3: missing item name"
+        assert errors[1].startswith("Row 4: invalid quantity 'two'; invalid expiration date 'soon'; item type")
+        assert len(errors) == 2
+
+    def test_non_finite_numbers_are_rejected(self):
+        """Test infinite values are reported instead of aborting the import"""
+        csv = b"name,QTY,weight\nBeans,inf,\nRice,1e999,\nOats,1,-inf\nPeas,1,1e999\n"
+        chunk = pd.concat([chunk for chunk, _ in read_pantry_import(io.BytesIO(csv), 'pantry.csv')])
+        adds, errors = pantry_import_rows(chunk, first_row=2)
+        assert adds == []
+        assert errors == [
+            "Row 2: invalid quantity 'inf'",
+            "Row 3: invalid quantity '1e999'",
+            "Row 4: invalid weight '-inf'",
+            "Row 5: invalid weight '1e999'",
+        ]
+
+    def test_rejected_rows_are_reported(self):
+        adds = [{'name': 'Beans', 'payload': {}, 'row': 2}, {'name': 'Oats', 'payload': {}, 'row': 6}]
+        responses = {('add', 0): FakeResponse(201, {'id': 1}), ('add', 1): FakeResponse(400, {'quantity': ['Invalid']})}
+        assert pantry_import_errors(adds, responses) == ["Row 6 ('Oats'): {'quantity': ['Invalid']}"]
@@ -0,0 +1,89 @@
+import pytest
+import sys
+import os
+
+# Add the parent directory to sys.path to import the registry
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests.fakes import FakeResponse, FakeSession
+from reference_data import (
+    DEFAULT_LANGUAGES, RETRY_SECONDS, ReferenceDataRegistry, build_reference_registry, normalize_dietary_preferences
+)
+
+
+class ManualExecutor:
+    """Collects submitted loads so tests decide when they run."""
+
+    def __init__(self):
+        self.pending = []
+
+    def submit(self, fn, *args):
+        self.pending.append((fn, args))
+
+    def run_all(self):
+        pending, self.pending = self.pending, []
+        for fn, args in pending:
+            fn(*args)
+
+
+class TestReferenceDataRegistry:
+    """Test serving reference data from memory with background refresh"""
+
+    def setup_method(self):
+        """Setup for each test method"""
+        self.now = 0.0
+        self.values = [['a'], ['b']]
+        self.registry = ReferenceDataRegistry(ttl_seconds=100, clock=lambda: self.now)
+        self.registry.register('letters', lambda: self.values.pop(0), ['fallback'])
+        self.executor = ManualExecutor()
+
+    def test_fallback_until_first_load(self):
+        self.registry.warm(self.executor)
+        assert self.registry.get('letters', self.executor) == ['fallback']
+        assert len(self.executor.pending) == 1  # the warm-up load is not duplicated
+        self.executor.run_all()
+        assert self.registry.get('letters', self.executor) == ['a']
+        assert self.registry.loaded('letters') and not self.executor.pending
+        assert self.registry.fallback('letters') == ['fallback']
+
+    def test_expired_value_is_served_while_refreshing(self):
+        self.registry.warm(self.executor)
+        self.executor.run_all()
+        self.now = 150
+        assert self.registry.get('letters', self.executor) == ['a']
+        self.executor.run_all()
+        assert self.registry.get('letters', self.executor) == ['b']
+
+    def test_failed_load_keeps_value_and_retries_later(self):
+        self.values = [[], ['c']]
+        self.registry.warm(self.executor)
+        self.executor.run_all()
+        assert self.registry.get('letters', self.executor) == ['fallback'] and not self.executor.pending
+        self.now = RETRY_SECONDS
+        self.registry.get('letters', self.executor)
+        self.executor.run_all()
+        assert self.registry.get('letters') == ['c']
+
+
+class TestBuildReferenceRegistry:
+    """Test the app's reference sources"""
+
+    def test_sources_load_from_backend_or_fall_back(self):
+        session = FakeSession({
+            'http://api/auth/api/languages/': FakeResponse(200, [{'code': 'de', 'name': 'German', 'name_local': 'Deutsch', 'bidi': False}]),
+            'http://api/meals/api/dietary-preferences/': FakeResponse(200, {'details': ['Vegan', {'id': 3, 'name': 'Keto'}]}),
+        }, default=FakeResponse(500))
+        registry = build_reference_registry(session, 'http://api')
+        assert registry.get('languages') == DEFAULT_LANGUAGES
+        executor = ManualExecutor()
+        registry.warm(executor)
+        executor.run_all()
+        assert registry.get('languages')[0]['code'] == 'de'
+        assert registry.get('dietary_preferences') == [{'id': 'Vegan', 'name': 'Vegan'}, {'id': 3, 'name': 'Keto'}]
+        # The countries endpoint failed; the ISO list is served instead
+        countries = registry.get('countries')
+        assert {'name': 'Germany', 'code': 'DE'} in countries and not registry.loaded('countries')
+
+    def test_normalize_dietary_preferences(self):
+        assert normalize_dietary_preferences({'results': [{'name': 'Halal'}]}) == [{'id': 'Halal', 'name': 'Halal'}]
+        assert normalize_dietary_preferences({'status': 'error'}) == []
@@ -0,0 +1,147 @@
+import pytest
+import sys
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the parent directory to sys.path to import the cache module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shared_cache import SharedCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestSharedCache:
+    """Test TTL, single-flight and stale-while-revalidate behaviour"""
+
+    def setup_method(self):
+        """Setup for each test method"""
+        self.clock = FakeClock()
+        self.cache = SharedCache(max_entries=2, clock=self.clock)
+        self.calls = 0
+
+    def loader(self):
+        self.calls += 1
+        return f"value-{self.calls}"
+
+    def test_fresh_entries_are_reused(self):
+        assert self.cache.get('k', self.loader, ttl_seconds=60) == 'value-1'
+        self.clock.now += 30
+        assert self.cache.get('k', self.loader, ttl_seconds=60) == 'value-1'
+        assert self.calls == 1
+
+    def test_concurrent_misses_load_once(self):
+        """Test N concurrent callers cause a single backend call"""
+        release = threading.Event()
+
+        def slow_loader():
+            release.wait(5)
+            return self.loader()
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            futures = [pool.submit(self.cache.get, 'k', slow_loader) for _ in range(8)]
+            time.sleep(0.1)
+            release.set()
+            results = [f.result(timeout=5) for f in futures]
+        assert results == ['value-1'] * 8
+        assert self.calls == 1
+
+    def test_stale_value_is_served_while_refreshing(self):
+        """Test an expired entry is returned immediately and refreshed in the background"""
+        self.cache.get('k', self.loader, ttl_seconds=60, stale_seconds=300)
+        self.clock.now += 90
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            assert self.cache.get('k', self.loader, ttl_seconds=60, executor=executor) == 'value-1'
+        assert self.cache.get('k', self.loader, ttl_seconds=60) == 'value-2'
+        assert self.calls == 2
+
+    def test_failed_refresh_keeps_stale_value(self):
+        self.cache.get('k', self.loader, ttl_seconds=60)
+        self.clock.now += 90
+
+        def failing_loader():
+            raise RuntimeError("backend down")
+
+        assert self.cache.get('k', failing_loader, ttl_seconds=60) == 'value-1'
+        self.clock.now += 1000
+        assert self.cache.get('k', failing_loader, ttl_seconds=60) is None
+
+    def test_size_limit_and_invalidate(self):
+        for key in ('a', 'b', 'c'):
+            self.cache.get(key, self.loader)
+            self.clock.now += 1
+        self.cache.get('a', self.loader)
+        assert self.calls == 4  # 'a' was evicted as the oldest entry
+        self.cache.invalidate('a')
+        self.cache.get('a', self.loader)
+        assert self.calls == 5
+
+    def test_invalidate_matching(self):
+        self.cache.get(('chef_meals', 'A1', 1), self.loader)
+        self.cache.get(('chef_meals', 'B2', 1), self.loader)
+        assert self.cache.invalidate_matching(lambda key: key[1] == 'A1') == 1
+        self.cache.get(('chef_meals', 'B2', 1), self.loader)
+        assert self.calls == 2
+
+    def test_load_started_before_invalidate_is_not_stored(self):
+        """Test a load that was running when its key was invalidated is discarded"""
+        started, release = threading.Event(), threading.Event()
+
+        def slow_loader():
+            started.set()
+            release.wait(5)
+            return self.loader()
+
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            future = pool.submit(self.cache.get, 'k', slow_loader)
+            started.wait(5)
+            self.cache.invalidate('k')
+            release.set()
+            assert future.result(timeout=5) == 'value-1'
+        assert self.cache.get('k', self.loader) == 'value-2'
+
+    def test_invalidate_matching_discards_running_loads(self):
+        started, release = threading.Event(), threading.Event()
+
+        def slow_loader():
+            started.set()
+            release.wait(5)
+            return self.loader()
+
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            future = pool.submit(self.cache.get, ('chef_meals', 'A1', 1), slow_loader)
+            started.wait(5)
+            assert self.cache.invalidate_matching(lambda key: key[1] == 'A1') == 0
+            release.set()
+            future.result(timeout=5)
+        self.cache.get(('chef_meals', 'A1', 1), self.loader)
+        assert self.calls == 2
+
+    def test_generations_are_forgotten_once_loads_finish(self):
+        """Test invalidating many keys does not leave per-key state behind"""
+        for week in range(50):
+            self.cache.get(('chef_meals', 'A1', week), self.loader)
+            self.cache.invalidate_matching(lambda key: key[1] == 'A1')
+        started, release = threading.Event(), threading.Event()
+
+        def slow_loader():
+            started.set()
+            release.wait(5)
+            return self.loader()
+
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            future = pool.submit(self.cache.get, 'k', slow_loader)
+            started.wait(5)
+            self.cache.invalidate('k')
+            assert self.cache._generations == {'k': 1}
+            release.set()
+            future.result(timeout=5)
+        assert self.cache._generations == {} and self.cache._running == {}
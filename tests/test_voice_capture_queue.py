@@ -0,0 +1,77 @@
+import pytest
+import sys
+import os
+from concurrent.futures import ThreadPoolExecutor, wait
+
+# Add the parent directory to sys.path to import the queue module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests.fakes import FakeResponse, FakeSession
+from voice_capture_queue import VoiceCaptureQueue
+
+
+class VoiceSession(FakeSession):
+    """Answers uploads by recording, transcribing them as a pantry item by default."""
+
+    def response_key(self, method, url, kwargs):
+        return kwargs['files']['audio_file'][1]
+
+    def post(self, url, **kwargs):
+        audio = kwargs['files']['audio_file'][1]
+        response = super().post(url, **kwargs)
+        return response or FakeResponse(201, {'pantry_item': {'id': 1, 'item_name': audio.decode()}})
+
+    @property
+    def uploads(self):
+        return [(kwargs['files']['audio_file'][1], kwargs['headers']['Authorization']) for _, _, kwargs in self.calls]
+
+
+class TestVoiceCaptureQueue:
+    """Test queuing and uploading voice recordings"""
+
+    def setup_method(self):
+        """Setup for each test method"""
+        self.queue = VoiceCaptureQueue(max_in_flight=2)
+        self.executor = ThreadPoolExecutor(max_workers=4)
+
+    def teardown_method(self):
+        self.executor.shutdown(wait=True)
+
+    def _settle(self):
+        wait(list(self.queue._futures.values()), timeout=5)
+        return self.queue.collect()
+
+    def test_uploads_are_bounded_and_results_collected(self):
+        session = VoiceSession({b'bad': FakeResponse(400, {'error': 'Parse failed', 'details': 'no item'})})
+        session.release.clear()
+        for audio in (b'beans', b'bad', b'rice'):
+            self.queue.enqueue(audio)
+        assert self.queue.start_uploads(self.executor, session, 'http://api', {'Authorization': 'Bearer a'}) == 2
+        assert [job['status'] for job in self.queue.jobs()] == ['uploading', 'uploading', 'queued']
+        session.release.set()
+        finished = self._settle()['finished']
+        assert {job['status'] for job in finished} == {'done', 'failed'}
+        assert self.queue.start_uploads(self.executor, session, 'http://api', {'Authorization': 'Bearer a'}) == 1
+        self._settle()
+        jobs = self.queue.jobs()
+        assert [job['status'] for job in jobs] == ['done', 'failed', 'done']
+        assert jobs[1]['error'] == 'Parse failed: no item'
+        assert not self.queue.busy()
+        self.queue.clear_finished()
+        assert self.queue.jobs() == []
+
+    def test_unauthorized_upload_is_retried_with_new_token(self):
+        session = VoiceSession({b'beans': [FakeResponse(401, {})]})
+        self.queue.enqueue(b'beans')
+        self.queue.start_uploads(self.executor, session, 'http://api', {'Authorization': 'Bearer old'})
+        assert self._settle()['auth_expired']
+        assert self.queue.busy()
+        self.queue.start_uploads(self.executor, session, 'http://api', {'Authorization': 'Bearer new'})
+        assert self._settle()['finished'][0]['status'] == 'done'
+        assert [headers for _, headers in session.uploads] == ['Bearer old', 'Bearer new']
+
+    def test_fail_queued(self):
+        self.queue.enqueue(b'beans')
+        self.queue.fail_queued("Session expired. Please log in again.")
+        assert not self.queue.busy()
+        assert self.queue.jobs()[0]['error'] == "Session expired. Please log in again."
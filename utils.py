@@ -2,10 +2,13 @@ import json
 import uuid
 from random import sample
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
 import os
+import threading
 import time
 from typing_extensions import override
-from typing import Tuple, Iterator, Optional, Any
+from typing import Tuple, Iterator, Optional, Any, Dict, Hashable, List
 from openai import OpenAIError
 from openai import AssistantEventHandler, OpenAI, BadRequestError
 from openai.types.beta.threads.runs import ToolCall, ToolCallDelta
@@ -22,6 +25,10 @@ import traceback
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+from conversation_store import ConversationStore
+from guest_response_cache import GuestResponseCache, is_first_guest_turn, mark_guest_turn, reset_guest_turns
+from shared_cache import SharedCache
+from reference_data import ReferenceDataRegistry, build_reference_registry
 
 # Set up logging
 logging.basicConfig(level=logging.ERROR, format='%(asctime)s - %(levelname)s - %(message)s', handlers=[
@@ -225,32 +232,12 @@ def safe_json_loads(json_string, default=None, log_errors=True):
 
 def fetch_languages():
     """
-    Fetch available languages from the API endpoint.
-    Returns a list of language objects with code, name, name_local, and bidi properties.
-    Falls back to default languages if API call fails.
+    Return the available languages (code, name, name_local, bidi).
+
+    Served from the reference data registry, which falls back to a default
+    list until the languages endpoint has been loaded.
     """
-    try:
-        api_url = f"{os.getenv('DJANGO_URL')}/auth/api/languages/"
-        response = requests.get(api_url, timeout=10)
-        if response.status_code == 200:
-            return response.json()
-        else:
-            # Fallback to default languages if API call fails
-            return [
-                {"code": "en", "name": "English", "name_local": "English", "bidi": False},
-                {"code": "jp", "name": "Japanese", "name_local": "日本語", "bidi": False},
-                {"code": "es", "name": "Spanish", "name_local": "Español", "bidi": False},
-                {"code": "fr", "name": "French", "name_local": "Français", "bidi": False}
-            ]
-    except Exception as e:
-        logging.error(f"Error fetching languages: {e}")
-        # Fallback to default languages if API call fails
-        return [
-            {"code": "en", "name": "English", "name_local": "English", "bidi": False},
-            {"code": "jp", "name": "Japanese", "name_local": "日本語", "bidi": False},
-            {"code": "es", "name": "Spanish", "name_local": "Español", "bidi": False},
-            {"code": "fr", "name": "French", "name_local": "Français", "bidi": False}
-        ]
+    return get_reference('languages')
 
 # ============================
 # HTTP Session Management
@@ -265,6 +252,45 @@ def get_api_session() -> requests.Session:
         st.session_state["api_session"] = sess
     return st.session_state["api_session"]
 
+class ThreadLocalSession:
+    """
+    requests.Session stand-in that gives every thread its own session.
+
+    requests.Session is not documented as thread-safe, so work running on
+    worker threads must not share the tab's session with the main thread.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    @property
+    def session(self) -> requests.Session:
+        sess = getattr(self._local, 'session', None)
+        if sess is None:
+            sess = requests.Session()
+            sess.headers.update({"User-Agent": "sautAI-frontend/1.0"})
+            self._local.session = sess
+        return sess
+
+    def request(self, method: str, url: str, **kw):
+        return self.session.request(method, url, **kw)
+
+    def get(self, url: str, **kw):
+        return self.request('GET', url, **kw)
+
+    def post(self, url: str, **kw):
+        return self.request('POST', url, **kw)
+
+@st.cache_resource
+def get_background_session() -> ThreadLocalSession:
+    """
+    Return the process-wide session for background and worker-thread requests.
+
+    Pass this, never get_api_session(), to anything that runs off the main
+    thread; it holds no cookies or credentials of its own.
+    """
+    return ThreadLocalSession()
+
 def dj_request(method: str, path: str, **kw):
     """Make a request to Django backend using the persistent session"""
     full_url = f"{django_url}{path}"
@@ -276,6 +302,208 @@ def dj_post(path, **kw): return dj_request("POST", path, **kw)
 def dj_put(path, **kw):  return dj_request("PUT", path, **kw)
 def dj_delete(path, **kw): return dj_request("DELETE", path, **kw)
 
+# ============================
+# Concurrent Requests
+# ============================
+MAX_CONCURRENT_REQUESTS = 8
+
+def dj_get_many(paths: List[str], headers: Optional[dict] = None, params: Optional[dict] = None,
+                max_workers: int = MAX_CONCURRENT_REQUESTS) -> Dict[str, Optional[requests.Response]]:
+    """
+    GET several backend paths concurrently on worker threads.
+
+    Worker threads only perform the HTTP calls; anything touching
+    st.session_state (token refresh, error display) happens on the calling
+    thread. Requests rejected with 401 are retried through
+    api_call_with_refresh, which refreshes the access token once and
+    updates ``headers`` in place for the remaining retries.
+
+    Returns:
+        dict mapping each path to its response, or None on a network error
+    """
+    paths = list(dict.fromkeys(paths))
+    if not paths:
+        return {}
+
+    session = get_background_session()
+
+    def _get(path):
+        try:
+            return session.get(f"{django_url}{path}", headers=headers, params=params, timeout=30)
+        except requests.exceptions.RequestException as e:
+            logging.warning(f"Request error for {path}: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(paths))) as pool:
+        responses = dict(zip(paths, pool.map(_get, paths)))
+
+    for path, response in responses.items():
+        if response is not None and response.status_code == 401 and 'user_info' in st.session_state:
+            responses[path] = api_call_with_refresh(f"{django_url}{path}", method='get', headers=headers, params=params)
+    return responses
+
+def dj_request_many(calls: Dict[Hashable, Tuple[str, str, Optional[dict], Optional[dict]]],
+                    headers: Optional[dict] = None,
+                    max_workers: int = MAX_CONCURRENT_REQUESTS) -> Dict[Hashable, Optional[requests.Response]]:
+    """
+    Send several backend requests concurrently on worker threads.
+
+    Like dj_get_many, but for mutations: ``calls`` maps a caller-chosen key
+    to (method, path, json_payload, extra_headers). At most max_workers
+    requests are in flight at once; 401 responses are retried through
+    api_call_with_refresh on the calling thread.
+
+    Returns:
+        dict mapping each key to its response, or None on a network error
+    """
+    if not calls:
+        return {}
+
+    session = get_background_session()
+
+    def _send(item):
+        key, (method, path, payload, extra_headers) = item
+        try:
+            return key, session.request(method, f"{django_url}{path}", json=payload,
+                                        headers={**(headers or {}), **(extra_headers or {})}, timeout=60)
+        except requests.exceptions.RequestException as e:
+            logging.warning(f"Request error for {method.upper()} {path}: {e}")
+            return key, None
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(calls))) as pool:
+        responses = dict(pool.map(_send, calls.items()))
+
+    for key, response in responses.items():
+        if response is not None and response.status_code == 401 and 'user_info' in st.session_state:
+            method, path, payload, extra_headers = calls[key]
+            retry_headers = {**(headers or {}), **(extra_headers or {})}
+            responses[key] = api_call_with_refresh(f"{django_url}{path}", method=method, headers=retry_headers, data=payload)
+            if headers is not None and 'Authorization' in retry_headers:
+                headers['Authorization'] = retry_headers['Authorization']
+    return responses
+
+# ============================
+# Background Tasks
+# ============================
+BACKGROUND_WORKERS = 4
+
+@st.cache_resource
+def get_background_executor() -> ThreadPoolExecutor:
+    """
+    Return the process-wide pool for work that should not block a rerun.
+
+    Tasks must not call st.* or touch st.session_state; pass them plain
+    values (session, headers, cache objects) and keep the returned future.
+    """
+    return ThreadPoolExecutor(max_workers=BACKGROUND_WORKERS, thread_name_prefix="sautai-bg")
+
+# ============================
+# Shared Cache
+# ============================
+@st.cache_resource
+def get_shared_cache() -> SharedCache:
+    """
+    Return the process-wide cache for global, non-personal data.
+
+    Only cache responses that are identical for every user; anything
+    user-specific must be stripped by the loader and recomputed per session.
+    """
+    return SharedCache()
+
+# ============================
+# Reference Data
+# ============================
+@st.cache_resource
+def get_reference_data() -> ReferenceDataRegistry:
+    """
+    Return the process-wide registry of languages, countries and dietary preferences.
+
+    Every source starts loading in the background when the registry is
+    created; reads return the last loaded value or the built-in fallback and
+    never wait on the backend. Use get_reference(name) to also refresh
+    expired sources.
+    """
+    registry = build_reference_registry(get_background_session(), django_url)
+    registry.warm(get_background_executor())
+    return registry
+
+def get_reference(name: str):
+    """Return a reference data source, refreshing it in the background once expired."""
+    return get_reference_data().get(name, get_background_executor())
+
+# ============================
+# Guest Response Cache
+# ============================
+GUEST_STREAM_PATH = '/customer_dashboard/api/assistant/guest-stream-message/'
+
+@st.cache_resource
+def get_guest_response_cache() -> GuestResponseCache:
+    """Return the process-wide cache of first-turn guest responses."""
+    return GuestResponseCache()
+
+# ============================
+# Conversation Snapshots
+# ============================
+@st.cache_resource
+def get_conversation_store() -> ConversationStore:
+    """Return the process-wide conversation snapshot store."""
+    return ConversationStore()
+
+def _conversation_store_key() -> Optional[str]:
+    """Key snapshots by user so they survive a lost Streamlit session."""
+    user_id = st.session_state.get('user_id')
+    if not user_id or not is_user_authenticated():
+        return None
+    return f"user:{user_id}"
+
+def snapshot_conversation():
+    """Persist the active conversation so a lost session can be restored."""
+    user_key = _conversation_store_key()
+    if not user_key:
+        return
+    try:
+        get_conversation_store().snapshot(
+            user_key,
+            st.session_state.get('chat_history', []),
+            thread_id=st.session_state.get('thread_id'),
+            response_id=st.session_state.get('response_id'),
+        )
+    except Exception as e:
+        logging.error(f"Error snapshotting conversation: {e}")
+
+def restore_conversation() -> bool:
+    """
+    Rehydrate chat_history, thread_id and response_id from the snapshot store.
+
+    Returns:
+        True if a stored conversation was restored into session state
+    """
+    user_key = _conversation_store_key()
+    if not user_key:
+        return False
+    try:
+        snapshot = get_conversation_store().load(user_key)
+    except Exception as e:
+        logging.error(f"Error restoring conversation: {e}")
+        return False
+    if not snapshot or not snapshot['chat_history']:
+        return False
+    st.session_state.chat_history = snapshot['chat_history']
+    st.session_state.thread_id = snapshot['thread_id']
+    if snapshot['response_id']:
+        st.session_state['response_id'] = snapshot['response_id']
+    return True
+
+def clear_conversation_snapshot():
+    """Forget the stored conversation, e.g. when the user starts a new chat."""
+    user_key = _conversation_store_key()
+    if not user_key:
+        return
+    try:
+        get_conversation_store().clear(user_key)
+    except Exception as e:
+        logging.error(f"Error clearing conversation snapshot: {e}")
+
 client = OpenAI(api_key=openai_env_key)
 
 openai_headers = {
@@ -372,6 +600,22 @@ def yield_words(text: str) -> Iterator[str]:
             yield word + ' '
             time.sleep(0.05)  # small pause between words
 
+def _iter_sse_events(response) -> Iterator[dict]:
+    """Yield the decoded JSON payload of each SSE ``data:`` line."""
+    for raw_line in response.iter_lines():
+        if not raw_line:
+            continue
+
+        decoded = raw_line.decode("utf-8")
+        if not decoded.startswith("data:"):
+            continue                                    # ignore keep‑alives
+
+        payload = decoded[len("data:"):].strip()
+        try:
+            yield json.loads(payload)
+        except json.JSONDecodeError:
+            continue
+
 def stream_response_generator(message: str, thread_id: str = None, is_guest: bool = False) -> Iterator[str]:
     """
     Generator function that streams a response from the backend using Server-Sent Events.
@@ -388,7 +632,7 @@ def stream_response_generator(message: str, thread_id: str = None, is_guest: boo
         path = '/customer_dashboard/api/assistant/stream-message/'
         headers = {'Authorization': f'Bearer {st.session_state.user_info.get("access")}'}
     else:
-        path = '/customer_dashboard/api/assistant/guest-stream-message/'
+        path = GUEST_STREAM_PATH
         headers = {}
 
     # Mapping from internal tool names to user-friendly spinner text
@@ -446,35 +690,42 @@ def stream_response_generator(message: str, thread_id: str = None, is_guest: boo
         "chef_service_areas": "Checking chef service areas"
     }
 
+    # First-turn guest prompts may be answered from the response cache. A
+    # replayed answer leaves no thread ID, so later turns are recognised by
+    # the session flag rather than by thread_id alone.
+    first_guest_turn = path == GUEST_STREAM_PATH and is_first_guest_turn(st.session_state, thread_id)
+    if path == GUEST_STREAM_PATH:
+        mark_guest_turn(st.session_state)
+    guest_cache = get_guest_response_cache() if first_guest_turn else None
+    cached_events = guest_cache.get(message) if guest_cache else None
+    recorded_events = [] if guest_cache and guest_cache.enabled and cached_events is None else None
+
+    spinner = None
     try:
-        # Use our session-aware request helper to maintain cookies across requests
-        with dj_post(path, json=data, headers=headers, stream=True) as response:
-            status = getattr(response, 'status_code', None)
-            if status != 200:
-                error_message = f"Error: {status}" if status else "Failed to connect to server"
-                yield error_message
-                return
+        with ExitStack() as stack:
+            if cached_events is not None:
+                # The cached response ID belongs to another guest's conversation,
+                # so a replayed answer starts without one
+                st.session_state.pop("response_id", None)
+                events = iter(cached_events)
+            else:
+                # Use our session-aware request helper to maintain cookies across requests
+                response = stack.enter_context(dj_post(path, json=data, headers=headers, stream=True))
+                status = getattr(response, 'status_code', None)
+                if status != 200:
+                    error_message = f"Error: {status}" if status else "Failed to connect to server"
+                    yield error_message
+                    return
+                events = _iter_sse_events(response)
 
             accumulated_text = ""
             response_id = None
-            spinner = None
             tool_call_in_progress = False # Flag to track tool call state
 
-            # === Revised SSE loop ===
             # === SSE loop (clean, unified) ==================================
-            for raw_line in response.iter_lines():
-                if not raw_line:
-                    continue
-
-                decoded = raw_line.decode("utf-8")
-                if not decoded.startswith("data:"):
-                    continue                                    # ignore keep‑alives
-
-                payload = decoded[len("data:"):].strip()
-                try:
-                    sse_json = json.loads(payload)
-                except json.JSONDecodeError:
-                    continue
+            for sse_json in events:
+                if recorded_events is not None:
+                    recorded_events.append(sse_json)
 
                 event_type = sse_json.get("type")
 
@@ -531,6 +782,8 @@ def stream_response_generator(message: str, thread_id: str = None, is_guest: boo
                 # ── 3) assistant turn finished ──────────────────────────────
                 if event_type == "response.completed":
                     response_id = sse_json.get("id") or sse_json.get("response",{}).get("id")
+                    if recorded_events is not None:
+                        guest_cache.put(message, recorded_events)
                     break                                   # exit SSE loop
 
             # === loop ended – tidy up =======================================
@@ -617,6 +870,8 @@ def process_user_input(prompt, chat_container):
                 # Render the checkout button inside the current chat bubble
                 st.markdown(parsed["html_button"], unsafe_allow_html=True)
 
+            snapshot_conversation()
+
             # Fetch follow-up recommendations if needed
             if not is_guest:
                 fetch_follow_up_recommendations(st.session_state.thread_id)
@@ -630,6 +885,7 @@ def process_user_input(prompt, chat_container):
                 "role": "assistant", 
                 "content": f"Error: {str(e)}"
             })
+            snapshot_conversation()
 
 
 # ============================
@@ -1235,6 +1491,7 @@ def reset_conversation(user_id=None):
             headers = {'Authorization': f'Bearer {st.session_state.user_info["access"]}'}
             path = '/customer_dashboard/api/assistant/reset-conversation/'
             payload = {"user_id": user_id}
+            clear_conversation_snapshot()
         else:
             # For guest users, reset Streamlit session variables
             # No need to generate guest_id as the persistent cookies will handle guest identification
@@ -2304,6 +2561,32 @@ def adjust_chef_order(order_id: int, qty: int):
         headers=hdr,
     )
 
+# ============================
+# Flash Messages
+# ============================
+FLASH_KEY = '_flash_messages'
+FLASH_KINDS = ('success', 'info', 'warning', 'error', 'toast')
+
+def flash(message: str, kind: str = 'success', icon: Optional[str] = None) -> None:
+    """
+    Queue a message to show on the next render.
+
+    Call it right before st.rerun() instead of sleeping so the user can read
+    the message. kind is 'success', 'info', 'warning' or 'error' for a banner,
+    or 'toast'.
+    """
+    if kind not in FLASH_KINDS:
+        raise ValueError(f"Unknown flash message kind: {kind}")
+    st.session_state.setdefault(FLASH_KEY, []).append({'kind': kind, 'message': message, 'icon': icon})
+
+def show_flash_messages() -> None:
+    """Render and clear the queued flash messages; call once near the top of a page."""
+    for item in st.session_state.pop(FLASH_KEY, []):
+        if item['kind'] == 'toast':
+            st.toast(item['message'], icon=item['icon'])
+        else:
+            getattr(st, item['kind'])(item['message'], icon=item['icon'])
+
 # ============================
 # Navigation Utility Functions
 # ============================
@@ -13,7 +13,8 @@ from utils import (api_call_with_refresh, is_user_authenticated, login_form,
                    openai_headers, client, get_user_summary, 
                    resend_activation_link, footer, process_user_input, 
                    fetch_follow_up_recommendations, display_streaming_summary, fetch_and_update_user_profile,
-                   check_django_cookies, navigate_to_page)
+                   check_django_cookies, navigate_to_page, restore_conversation,
+                   snapshot_conversation, clear_conversation_snapshot, reset_guest_turns)
 import numpy as np
 import time
 import logging
@@ -490,7 +491,9 @@ try:
 
     # Initialize session state variables if not already initialized
     if 'chat_history' not in st.session_state:
-        st.session_state.chat_history = []
+        # Rehydrate the active conversation if the previous session was lost
+        if not restore_conversation():
+            st.session_state.chat_history = []
     if 'thread_id' not in st.session_state:
         st.session_state.thread_id = None
     if 'recommend_follow_up' not in st.session_state:
@@ -565,6 +568,7 @@ try:
                 })
                 # Keep recommendations if backend sent them
                 st.session_state.recommend_follow_up = summary_data.get("recommend_prompt", {})
+                snapshot_conversation()
             else:
                 st.warning("Summary wasn't available yet – you can still chat normally.")
 
@@ -599,6 +603,7 @@ try:
 
                 for msg in chat_history:
                     st.session_state.chat_history.append({"role": msg['role'], "content": msg['content']})
+                snapshot_conversation()
             else:
                 logging.error("No chat history found for selected thread.")
         else:
@@ -722,6 +727,7 @@ try:
                         headers=headers
                     )
                     if response and response.status_code == 200:
+                        clear_conversation_snapshot()
                         st.session_state.thread_id = None
                         st.session_state.chat_history = []
                         st.session_state.selected_thread_id = None
@@ -750,6 +756,7 @@ try:
                              logging.error("Guest new conversation endpoint did not return a new guest_id.")
                              # Decide if this is a critical error or can proceed without new ID
 
+                        reset_guest_turns(st.session_state)
                         st.session_state.thread_id = None
                         st.session_state.chat_history = []
                         st.session_state.selected_thread_id = None
@@ -806,6 +813,7 @@ try:
                         headers=headers
                     )
                     if response and response.status_code == 200:
+                        clear_conversation_snapshot()
                         st.session_state.thread_id = None
                         st.session_state.chat_history = []
                         st.session_state.selected_thread_id = None
@@ -6,7 +6,16 @@ from utils import (
     client, openai_headers, guest_chat_with_gpt, 
     chat_with_gpt, is_user_authenticated, resend_activation_link, footer,
     get_chef_meals_by_postal_code, replace_meal_with_chef_meal,
-    place_chef_order, adjust_chef_order, navigate_to_page
+    place_chef_order, adjust_chef_order, navigate_to_page, dj_get_many,
+    get_background_session, get_background_executor, get_shared_cache,
+    flash, show_flash_messages, refresh_token
+)
+from gamification_queue import GamificationEventQueue
+from meal_plan_utils import (
+    DAY_OFFSET, InstacartLinkCache, ReviewCache, review_list, InstructionParseCache, instructions_complete, MealPreferenceIndex, MealPlanWeekCache,
+    CHEF_MEALS_STALE_SECONDS, CHEF_MEALS_TTL_SECONDS, chef_meals_area_key, chef_meals_cache_key, load_chef_meals_week, localize_chef_meals,
+    normalize_postal_code, page_chef_meals, ChefMealEventIndex, build_meal_plan_table, instruction_label, prefetch_meal_plan_week, request_instacart_link,
+    source_badges, source_help_texts
 )
 import os
 from dotenv import load_dotenv
@@ -16,6 +25,7 @@ import requests
 import traceback
 import time
 import re
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 
 logging.basicConfig(level=logging.ERROR, format='%(asctime)s - %(levelname)s - %(message)s', handlers=[
     logging.FileHandler("error.log"),
@@ -48,6 +58,133 @@ def _set_button_style():
 
 _set_button_style()
 
+PREFETCH_WAIT_SECONDS = 10
+INSTRUCTIONS_POLL_SECONDS = 3
+INSTRUCTIONS_POLL_TIMEOUT_SECONDS = 180
+INSTACART_POLL_SECONDS = 2
+INSTACART_WORKERS = 2
+REVIEWS_PAGE_SIZE = 50
+GAMIFICATION_REFRESH_SECONDS = 60
+GAMIFICATION_POLL_SECONDS = 2
+LEADERBOARD_TTL_SECONDS = 60
+CHEF_MEALS_PAGE_SIZE = 10
+
+@st.cache_resource
+def get_meal_preference_index() -> MealPreferenceIndex:
+    """Return the process-wide meal → dietary preference index."""
+    return MealPreferenceIndex()
+
+def load_meal_preferences(meal_ids, headers):
+    """
+    Make sure the dietary preferences of the given meals are indexed.
+
+    Only meals missing from the index are fetched, concurrently.
+
+    Returns:
+        list of meal IDs whose details could not be retrieved
+    """
+    index = get_meal_preference_index()
+    to_fetch = index.missing(meal_ids)
+    responses = dj_get_many([f"/meals/api/meals/{meal_id}/" for meal_id in to_fetch], headers=headers)
+
+    missing_meals = []
+    for meal_id in to_fetch:
+        meal_detail_resp = responses.get(f"/meals/api/meals/{meal_id}/")
+        if meal_detail_resp is not None and meal_detail_resp.status_code == 200:
+            try:
+                index.add(meal_id, meal_detail_resp.json())
+                continue
+            except ValueError as e:
+                logging.warning(f"Error parsing meal details for meal {meal_id}: {str(e)}")
+        elif meal_detail_resp is not None and meal_detail_resp.status_code != 404:
+            # Don't log errors for 404s, just track the missing meal
+            logging.warning(f"Error fetching meal details for meal {meal_id}: {meal_detail_resp.status_code}")
+        missing_meals.append(meal_id)
+    return missing_meals
+
+def get_meal_plan_week_cache() -> MealPlanWeekCache:
+    """Return this session's per-week meal plan cache."""
+    if 'meal_plan_weeks' not in st.session_state:
+        st.session_state['meal_plan_weeks'] = MealPlanWeekCache()
+    return st.session_state['meal_plan_weeks']
+
+def fetch_meal_plan_week(week_start, headers):
+    """
+    Return the meal plans for a week, from the session cache when possible.
+
+    Returns:
+        (status_code, meal_plan_data); (None, None) on a network error
+    """
+    week_cache = get_meal_plan_week_cache()
+
+    # Let a running prefetch of this week finish instead of fetching it twice;
+    # one still queued behind other background work is dropped and the week
+    # fetched inline
+    prefetch = st.session_state.get('meal_plan_prefetches', {}).get(week_start.isoformat())
+    if prefetch is not None and not prefetch.done():
+        if not prefetch.running():
+            prefetch.cancel()
+        else:
+            try:
+                prefetch.result(timeout=PREFETCH_WAIT_SECONDS)
+            except FutureTimeoutError:
+                pass
+
+    cached_week = week_cache.get(week_start)
+    if cached_week is not None:
+        return 200, cached_week['meal_plan_data']
+
+    response = api_call_with_refresh(
+        url=f'{os.getenv("DJANGO_URL")}/meals/api/meal_plans/?week_start_date={week_start}',
+        method='get',
+        headers=headers,
+    )
+    if not response:
+        return None, None
+    if response.status_code != 200:
+        logging.error(f"Failed to fetch meal plans. Status code: {response.status_code}, Response: {response.text}")
+        return response.status_code, None
+    meal_plan_data = response.json()
+    week_cache.put(week_start, meal_plan_data)
+    return 200, meal_plan_data
+
+def prefetch_adjacent_weeks(week_start, headers):
+    """Warm the week cache for the previous and next weeks in the background."""
+    week_cache = get_meal_plan_week_cache()
+    prefetches = st.session_state.setdefault('meal_plan_prefetches', {})
+    for neighbour in (week_start - timedelta(weeks=1), week_start + timedelta(weeks=1)):
+        key = neighbour.isoformat()
+        running = prefetches.get(key)
+        if week_cache.get(neighbour) is not None or (running is not None and not running.done()):
+            continue
+        prefetches[key] = get_background_executor().submit(
+            prefetch_meal_plan_week, get_background_session(), os.getenv('DJANGO_URL'),
+            dict(headers), neighbour, week_cache
+        )
+
+def fetch_meal_plan_details(week_start, meal_plan_id, headers):
+    """
+    Return the details of a week's meal plan, from the session cache when possible.
+
+    Returns:
+        The meal plan details dict, or None if they could not be fetched
+    """
+    week_cache = get_meal_plan_week_cache()
+    cached_week = week_cache.get(week_start)
+    if cached_week is not None and cached_week['details'] is not None:
+        return cached_week['details']
+
+    meal_plan_details_resp = api_call_with_refresh(
+        url=f"{os.getenv('DJANGO_URL')}/meals/api/meal_plans/{meal_plan_id}/",
+        method='get',
+        headers=headers
+    )
+    if not meal_plan_details_resp or meal_plan_details_resp.status_code != 200:
+        return None
+    meal_plan_details = meal_plan_details_resp.json()
+    week_cache.put_details(week_start, meal_plan_details)
+    return meal_plan_details
+
 @st.fragment
 def generate_meal_plan(selected_week_start, selected_week_end, headers):
     with st.spinner("Creating your personalized meal plan..."):
@@ -91,6 +228,7 @@ def generate_meal_plan(selected_week_start, selected_week_end, headers):
                             if response.status_code == 200:
                                 response_data = response.json()
                                 if response_data.get("status") == "success":
+                                    get_meal_plan_week_cache().invalidate(selected_week_start)
                                     st.success("Meal plan is ready!")
                                 else:
                                     st.error("Meal plan is not ready yet. Please wait a few more minutes.")
@@ -122,7 +260,8 @@ def generate_meal_plan(selected_week_start, selected_week_end, headers):
                        
                     else:
                         # Handle other 200 responses
-                        st.info(message or 'Operation completed successfully.')
+                        get_meal_plan_week_cache().invalidate(selected_week_start)
+                        flash(message or 'Operation completed successfully.', kind='info')
                         st.rerun()
                 elif gen_resp.status_code == 400:
                     response_data = gen_resp.json()
@@ -182,21 +321,54 @@ def generate_meal_plan(selected_week_start, selected_week_end, headers):
                                 st.info(f"💡 **Suggestion**: {details['suggestion']}")
                         elif isinstance(details, str) and details:
                             st.info(f"Details: {details}")
-                                    
-                        time.sleep(2)  # Give time for the message to be read
                         
                 else:
                     st.error("❌ Failed to generate meal plan. Please try again later.")
                     
         except Exception as e:
-            st.error(f"❌ An error occurred: {str(e)}")
+            flash(f"❌ An error occurred: {str(e)}", kind='error')
             logging.error(f"Error generating meal plan: {str(e)}")
             logging.error(traceback.format_exc())
-            time.sleep(2)  # Give time for the error message to be read
             st.rerun()
 
-def fetch_gamification_data():
-    """Fetch gamification data from Django backend."""
+def apply_gamification_data(data):
+    """Update the progress widgets' session state from gamification data."""
+    # Preserve previous level to detect tier changes
+    previous_level = st.session_state.get('user_level', "Dish Washer")
+
+    # Update session state
+    st.session_state.meal_plan_streak = data.get('meal_plan_streak', 0)
+    st.session_state.total_meals_planned = data.get('total_meals_planned', 0)
+    st.session_state.user_level = data.get('level_name', data.get('user_level', "Dish Washer"))
+    st.session_state.points = data.get('points', 0)
+
+    # Weekly goal data
+    weekly_goal = data.get('weekly_goal', {})
+    st.session_state.weekly_goal_progress = weekly_goal.get('progress', 0.0)
+    st.session_state.weekly_goal_text = weekly_goal.get('text', "0/7 days planned")
+    st.session_state['gamification_fetched_at'] = time.time()
+
+    # Check for new achievements
+    new_achievements = data.get('new_achievements', [])
+    if new_achievements:
+        for achievement in new_achievements:
+            st.balloons()
+            st.success(f"🏆 New Achievement: {achievement['name']} - {achievement['description']}")
+
+    # Celebrate a new level tier if it changed
+    if previous_level != st.session_state.user_level:
+        st.toast(f"🎉 You've reached the {st.session_state.user_level} tier!", icon="🎉")
+
+def fetch_gamification_data(max_age_seconds=None):
+    """
+    Fetch gamification data from Django backend.
+
+    With max_age_seconds, data fetched more recently than that is reused
+    (so week navigation doesn't refetch it).
+    """
+    fetched_at = st.session_state.get('gamification_fetched_at')
+    if max_age_seconds is not None and fetched_at and time.time() - fetched_at < max_age_seconds:
+        return True
     try:
         headers = {'Authorization': f'Bearer {st.session_state.user_info["access"]}'}
         response = api_call_with_refresh(
@@ -206,33 +378,7 @@ def fetch_gamification_data():
         )
 
         if response.status_code == 200:
-            data = response.json()
-
-            # Preserve previous level to detect tier changes
-            previous_level = st.session_state.get('user_level', "Dish Washer")
-
-            # Update session state
-            st.session_state.meal_plan_streak = data.get('meal_plan_streak', 0)
-            st.session_state.total_meals_planned = data.get('total_meals_planned', 0)
-            st.session_state.user_level = data.get('level_name', data.get('user_level', "Dish Washer"))
-            st.session_state.points = data.get('points', 0)
-
-            # Weekly goal data
-            weekly_goal = data.get('weekly_goal', {})
-            st.session_state.weekly_goal_progress = weekly_goal.get('progress', 0.0)
-            st.session_state.weekly_goal_text = weekly_goal.get('text', "0/7 days planned")
-
-            # Check for new achievements
-            new_achievements = data.get('new_achievements', [])
-            if new_achievements:
-                for achievement in new_achievements:
-                    st.balloons()
-                    st.success(f"🏆 New Achievement: {achievement['name']} - {achievement['description']}")
-
-            # Celebrate a new level tier if it changed
-            if previous_level != st.session_state.user_level:
-                st.toast(f"🎉 You've reached the {st.session_state.user_level} tier!", icon="🎉")
-
+            apply_gamification_data(response.json())
             return True
         else:
             logging.error(f"Failed to fetch gamification data: {response.status_code}")
@@ -243,52 +389,103 @@ def fetch_gamification_data():
         st.error("Unable to update points. Please try again.")
         return False
 
+def _load_leaderboard(session, base_url, headers):
+    """Fetch the global leaderboard without per-user fields (runs off the main thread)."""
+    response = session.get(f"{base_url}/gamification/api/leaderboard/", headers=headers, timeout=5)
+    if response.status_code != 200:
+        raise RuntimeError(f"Failed to fetch leaderboard: {response.status_code}")
+    return [
+        {key: value for key, value in entry.items() if key != 'is_current_user'}
+        for entry in response.json().get('leaderboard', [])
+    ]
+
 def fetch_leaderboard():
-    """Fetch leaderboard data from the backend."""
+    """
+    Return the leaderboard from the process-wide shared cache.
+
+    The leaderboard is the same for everyone, so one backend call serves
+    all sessions per TTL window; is_current_user is recomputed locally.
+    """
     try:
         headers = {'Authorization': f'Bearer {st.session_state.user_info["access"]}'}
-        response = requests.get(
-            f"{os.getenv('DJANGO_URL')}/gamification/api/leaderboard/", 
-            headers=headers,
-            timeout=5
+        leaderboard = get_shared_cache().get(
+            'leaderboard',
+            lambda: _load_leaderboard(get_background_session(), os.getenv('DJANGO_URL'), headers),
+            ttl_seconds=LEADERBOARD_TTL_SECONDS,
+            executor=get_background_executor(),
         )
-        
-        if response.status_code == 200:
-            return response.json().get('leaderboard', [])
-        else:
-            logging.error(f"Failed to fetch leaderboard: {response.status_code}")
-            return []
     except Exception as e:
         logging.error(f"Error fetching leaderboard: {str(e)}")
         return []
+    if not leaderboard:
+        return []
+
+    user_info = st.session_state.user_info
+    return [
+        {
+            **entry,
+            'is_current_user': (
+                (entry.get('user_id') is not None and entry.get('user_id') == user_info.get('user_id'))
+                or (bool(entry.get('username')) and entry.get('username') == user_info.get('username'))
+            ),
+        }
+        for entry in leaderboard
+    ]
+
+def get_gamification_queue() -> GamificationEventQueue:
+    """Return this session's gamification event queue."""
+    if 'gamification_queue' not in st.session_state:
+        st.session_state['gamification_queue'] = GamificationEventQueue()
+    return st.session_state['gamification_queue']
 
 def trigger_gamification_event(event_type, details=None):
-    """Trigger a gamification event in the Django backend."""
-    try:
+    """Queue a gamification event; it is posted to the backend in the background."""
+    get_gamification_queue().enqueue(event_type, details)
+    flush_gamification_events()
+    return True
+
+def flush_gamification_events():
+    """
+    Apply the result of a finished flush and start the next one if events are queued.
+
+    Returns:
+        True while events are still being sent
+    """
+    queue = get_gamification_queue()
+    outcome = queue.collect()
+    if outcome['state']:
+        apply_gamification_data(outcome['state'])
+    if outcome['auth_expired']:
+        new_tokens = refresh_token(st.session_state.user_info["refresh"])
+        if new_tokens:
+            st.session_state.user_info.update(new_tokens)
+    if 'user_info' in st.session_state and 'access' in st.session_state.user_info:
         headers = {'Authorization': f'Bearer {st.session_state.user_info["access"]}'}
-        payload = {
-            'event_type': event_type,
-            'details': details or {}
-        }
-        response = api_call_with_refresh(
-            url=f"{os.getenv('DJANGO_URL')}/gamification/api/event/", 
-            method='post',
-            headers=headers,
-            data=payload
-        )
-        
-        if response.status_code == 200:
-            # Refresh gamification data to show updated stats
-            fetch_gamification_data()
-            return True
-        else:
-            logging.error(f"Failed to trigger gamification event: {response.status_code}")
-            st.error("Unable to update points. Please try again.")
-            return False
-    except Exception as e:
-        logging.error(f"Error triggering gamification event: {str(e)}")
-        st.error("Unable to update points. Please try again.")
-        return False
+        queue.start_flush(get_background_executor(), get_background_session(), os.getenv('DJANGO_URL'), headers)
+    return queue.busy()
+
+def show_progress_metrics():
+    """Sidebar progress widgets; they refresh in place while events are being sent."""
+    polling = get_gamification_queue().busy()
+    st.session_state['gamification_polling'] = polling
+    st.fragment(run_every=GAMIFICATION_POLL_SECONDS if polling else None)(_progress_metrics)()
+
+def _progress_metrics():
+    if not flush_gamification_events() and st.session_state.get('gamification_polling'):
+        # Everything is sent; rerun the page once to stop polling
+        st.session_state['gamification_polling'] = False
+        st.rerun()
+    st.metric("Meal Planning Streak", f"{st.session_state.meal_plan_streak} days")
+    st.metric("Total Meals Planned", st.session_state.total_meals_planned)
+    st.metric("Current Level", st.session_state.user_level)
+    st.metric("Points", st.session_state.points)  # Add points display
+    
+    st.markdown("---")
+    st.subheader("🎯 Weekly Goals")
+    st.progress(
+        st.session_state.weekly_goal_progress, 
+        text=st.session_state.weekly_goal_text
+    )
 
 def fetch_user_dietary_preferences():
     """Fetch the user's dietary preferences from the backend and update session state."""
@@ -325,109 +522,231 @@ def fetch_user_dietary_preferences():
         logging.error(f"Error fetching user profile: {str(e)}")
         return False
 
-@st.fragment
+def get_user_dietary_profile():
+    """
+    Return the user's dietary preferences and allergies, fetched once per session.
+
+    Used to apply compatibility to the shared chef meal listings locally.
+    """
+    if 'user_dietary_profile' in st.session_state:
+        return st.session_state['user_dietary_profile']
+    try:
+        headers = {'Authorization': f'Bearer {st.session_state.user_info["access"]}'}
+        response = api_call_with_refresh(
+            url=f"{os.getenv('DJANGO_URL')}/meals/api/user-profile/",
+            method='get',
+            headers=headers
+        )
+        if response.status_code != 200:
+            logging.error(f"Failed to fetch user profile: {response.status_code}")
+            return None
+        user_data = response.json()
+    except Exception as e:
+        logging.error(f"Error fetching user profile: {str(e)}")
+        return None
+    profile = {
+        'preferences': (user_data.get('dietary_preferences') or []) + (user_data.get('custom_dietary_preferences') or []),
+        'allergies': (user_data.get('allergies') or []) + (user_data.get('custom_allergies') or []),
+    }
+    st.session_state['user_dietary_profile'] = profile
+    return profile
+
+def fetch_chef_meals(week_start_date, meal_type=None, date=None, chef_id=None, compatible_only=False, page=1):
+    """
+    Return a chef meal listing page with the user's compatibility applied,
+    and the event index of the listing.
+
+    The whole week for the user's postal code is loaded once into the
+    process-wide shared cache; day, meal type, chef and compatibility filters
+    and paging then run locally. Without a known postal code or dietary
+    profile the backend is asked directly.
+    """
+    address = st.session_state.get('address') or {}
+    postal_code = address.get('postalcode')
+    profile = get_user_dietary_profile()
+    if not postal_code or profile is None:
+        data = get_chef_meals_by_postal_code(
+            meal_type=meal_type, date=date, week_start_date=None if date else week_start_date,
+            chef_id=chef_id, include_compatible_only=compatible_only, page=page
+        )
+        return data, ChefMealEventIndex((data or {}).get('data', {}).get('meals', []))
+
+    headers = {'Authorization': f'Bearer {st.session_state.user_info["access"]}'}
+    week = get_shared_cache().get(
+        chef_meals_cache_key(address.get('country'), postal_code, week_start_date),
+        lambda: load_chef_meals_week(get_background_session(), os.getenv('DJANGO_URL'), headers, week_start_date),
+        ttl_seconds=CHEF_MEALS_TTL_SECONDS,
+        stale_seconds=CHEF_MEALS_STALE_SECONDS,
+        executor=get_background_executor(),
+    )
+    if week is None:
+        # Shared load failed (e.g. expired token); fall back to the direct request
+        data = get_chef_meals_by_postal_code(
+            meal_type=meal_type, date=date, week_start_date=None if date else week_start_date,
+            chef_id=chef_id, page=page, page_size=CHEF_MEALS_PAGE_SIZE
+        )
+        if not data:
+            return data, ChefMealEventIndex([])
+        listing = data.get('data', {})
+        meals = localize_chef_meals(listing.get('meals', []), profile['preferences'], profile['allergies'], compatible_only)
+        return {**data, 'data': {**listing, 'meals': meals}}, ChefMealEventIndex(meals)
+
+    meals = week.filter(event_date=date, meal_type=meal_type, chef_id=chef_id)
+    meals = localize_chef_meals(meals, profile['preferences'], profile['allergies'], compatible_only)
+    return page_chef_meals(meals, page, CHEF_MEALS_PAGE_SIZE), week.events
+
+def invalidate_chef_meals():
+    """Drop the shared chef meal listings of the user's postal code (e.g. after an order)."""
+    address = st.session_state.get('address') or {}
+    if normalize_postal_code(address.get('postalcode')):
+        area = chef_meals_area_key(address.get('country'), address.get('postalcode'))
+        get_shared_cache().invalidate_matching(
+            lambda key: isinstance(key, tuple) and key[:3] == area
+        )
+
+def get_instruction_parse_cache() -> InstructionParseCache:
+    """Return this session's cache of parsed cooking instructions."""
+    if 'instruction_parse_cache' not in st.session_state:
+        st.session_state['instruction_parse_cache'] = InstructionParseCache()
+    return st.session_state['instruction_parse_cache']
+
+def start_instruction_generation(meal_plan_meal_ids, meal_plan_id, headers):
+    """
+    Ask the backend to generate cooking instructions without waiting for them.
+
+    The instructions panel then polls for results and shows each one as
+    soon as the backend has produced it.
+
+    Returns:
+        True if generation was started
+    """
+    gen_resp = api_call_with_refresh(
+        url=f"{os.getenv('DJANGO_URL')}/meals/api/generate_cooking_instructions/",
+        method='post',
+        headers=headers,
+        data={'meal_plan_meal_ids': meal_plan_meal_ids}
+    )
+    if gen_resp is None or gen_resp.status_code != 200:
+        error_data = gen_resp.json() if gen_resp is not None else {}
+        st.error(f"Failed to generate instructions: {error_data.get('error', 'Unknown error')}")
+        return False
+
+    st.session_state['instructions'] = []
+    st.session_state['instructions_pending'] = {
+        'meal_plan_meal_ids': meal_plan_meal_ids,
+        'meal_plan_id': meal_plan_id,
+        'started_at': time.time(),
+    }
+    return True
+
+def poll_instructions(headers):
+    """
+    Fetch the instructions generated so far for the pending request.
+
+    Generation is considered finished once every requested meal has
+    instructions, or after INSTRUCTIONS_POLL_TIMEOUT_SECONDS.
+
+    Returns:
+        True while generation is still in progress
+    """
+    pending = st.session_state.get('instructions_pending')
+    if not pending:
+        return False
+
+    fetch_resp = api_call_with_refresh(
+        url=f"{os.getenv('DJANGO_URL')}/meals/api/fetch_instructions/?meal_plan_meal_ids=" + ','.join(map(str, pending['meal_plan_meal_ids'])),
+        method='get',
+        headers=headers,
+    )
+    if fetch_resp is not None and fetch_resp.status_code == 200:
+        instructions_data = fetch_resp.json()
+        instructions = instructions_data.get('instructions', [])
+        st.session_state['instructions'] = instructions
+        st.session_state['meal_prep_preference'] = instructions_data.get('meal_prep_preference', 'daily')
+
+        if instructions_complete(instructions, pending['meal_plan_meal_ids']):
+            return False
+
+    return time.time() - pending['started_at'] < INSTRUCTIONS_POLL_TIMEOUT_SECONDS
+
 def display_instructions_pagination():
+    """Show cooking instructions, polling for new ones while they are generated."""
+    pending = st.session_state.get('instructions_pending')
+    run_every = INSTRUCTIONS_POLL_SECONDS if pending else None
+    st.fragment(run_every=run_every)(_instructions_panel)()
+
+def _instructions_panel():
+    pending = st.session_state.get('instructions_pending')
+    if pending:
+        headers = {'Authorization': f'Bearer {st.session_state.user_info["access"]}'}
+        if not poll_instructions(headers):
+            st.session_state.pop('instructions_pending', None)
+            if st.session_state.get('instructions'):
+                # Trigger gamification event
+                trigger_gamification_event('cooking', {
+                    'meal_plan_id': pending['meal_plan_id'],
+                    'meal_count': len(pending['meal_plan_meal_ids'])
+                })
+            # Rerun the whole page to stop polling
+            st.rerun()
+
     instructions = st.session_state.get('instructions', [])
-    meal_prep_preference = st.session_state.get('meal_prep_preference', 'daily')
 
     if not instructions:
-        st.error("No instructions available.")
+        if pending:
+            st.info("⏳ Generating your cooking instructions… they will appear here as they are ready.")
+        else:
+            st.error("No instructions available.")
         return
 
-    instruction_options = []
-    for idx, instruction_item in enumerate(instructions):
-        instruction_type = instruction_item.get('instruction_type', 'Unknown')
-        date = instruction_item.get('date', 'No Date')
-        if instruction_type == 'bulk_prep':
-            option_label = "Bulk Prep Instructions"
-        elif instruction_type == 'follow_up':
-            option_label = f"Follow-Up Instructions for {date}"
-        elif instruction_type == 'daily':
-            meal_name = instruction_item.get('meal_name', 'Unknown Meal')
-            option_label = f"{meal_name} - {date}"
-        else:
-            option_label = f"Instructions {idx}"
-        instruction_options.append((idx, option_label))
+    if pending:
+        st.caption(f"⏳ {len(instructions)} ready so far — more on the way…")
 
     selected_idx = st.selectbox(
         "Select Instructions",
-        options=[i for i,_ in instruction_options],
-        format_func=lambda i: instruction_options[i][1],
+        options=list(range(len(instructions))),
+        format_func=lambda i: instruction_label(instructions[i], i),
         key="instruction_selector"
     )
+    if selected_idx is None or selected_idx >= len(instructions):
+        selected_idx = 0
 
-    selected_instruction = instructions[selected_idx]
-    instructions_json_str = selected_instruction.get('instructions')
-    instruction_type = selected_instruction.get('instruction_type', 'Unknown')
-
-    if instructions_json_str:
-        try:
-            instructions_data = json.loads(instructions_json_str)
-            if instruction_type == 'bulk_prep':
-                if isinstance(instructions_data, dict):
-                    bulk_prep_steps = instructions_data.get('bulk_prep_steps', [])
-                elif isinstance(instructions_data, list):
-                    bulk_prep_steps = instructions_data
-                else:
-                    st.error("Unexpected format of bulk prep instructions.")
-                    return
-                st.subheader("Bulk Meal Prep Instructions")
-                for step in bulk_prep_steps:
-                    step_number = step.get('step_number', 'N/A')
-                    description = step.get('description', 'No description provided.')
-                    duration = step.get('duration', 'N/A')
-                    ingredients_list = step.get('ingredients', [])
-                    ingredients = ', '.join(ingredients_list) if ingredients_list else 'N/A'
-                    st.markdown(f"**Step {step_number}:** {description}")
-                    st.markdown(f"**Duration:** {duration}")
-                    st.markdown(f"**Ingredients:** {ingredients}")
-                    st.markdown("---")
-
-            elif instruction_type == 'follow_up':
-                if isinstance(instructions_data, dict):
-                    tasks = instructions_data.get('tasks', [])
-                    day = instructions_data.get('day', selected_instruction.get('date', 'Unknown Day'))
-                    total_estimated_time = instructions_data.get('total_estimated_time', 'N/A')
-                elif isinstance(instructions_data, list):
-                    tasks = instructions_data
-                    day = selected_instruction.get('date', 'Unknown Day')
-                    total_estimated_time = 'N/A'
-                else:
-                    st.error("Unexpected format of follow-up instructions.")
-                    return
-                st.subheader(f"Follow-Up Instructions for {day}")
-                st.markdown(f"**Total Estimated Time:** {total_estimated_time}")
-                st.markdown("---")
-                for task in tasks:
-                    step_number = task.get('step_number', 'N/A')
-                    description = task.get('description', 'No description provided.')
-                    duration = task.get('duration', 'N/A')
-                    st.markdown(f"**Step {step_number}:** {description}")
-                    st.markdown(f"**Duration:** {duration}")
-                    st.markdown("---")
+    try:
+        parsed = get_instruction_parse_cache().get(instructions[selected_idx])
+    except ValueError as e:
+        st.error("Failed to parse instructions.")
+        logging.error(f"Parsing error: {e}")
+        return
 
-            elif instruction_type == 'daily':
-                steps = instructions_data.get('steps', [])
-                meal_name = selected_instruction.get('meal_name', 'Unknown Meal')
-                st.subheader(f"Instructions for {meal_name} on {selected_instruction.get('date', 'Unknown Date')}")
-                for step in steps:
-                    step_number = step.get('step_number', 'Unknown')
-                    description = step.get('description', 'No description available')
-                    duration = step.get('duration', 'No duration')
-                    st.markdown(f"**Step {step_number}:** {description}")
-                    st.markdown(f"**Duration:** {duration}")
-                    st.markdown("---")
-            else:
-                st.error("Unknown instruction type.")
-        except Exception as e:
-            st.error("Failed to parse instructions.")
-            logging.error(f"Parsing error: {e}")
-    else:
+    if parsed is None:
         st.warning("Instructions not yet available.")
+        return
+
+    st.subheader(parsed['title'])
+    if parsed['total_estimated_time'] is not None:
+        st.markdown(f"**Total Estimated Time:** {parsed['total_estimated_time']}")
+        st.markdown("---")
+    for step in parsed['steps']:
+        st.markdown(f"**Step {step['step_number']}:** {step['description']}")
+        st.markdown(f"**Duration:** {step['duration']}")
+        if parsed['instruction_type'] == 'bulk_prep':
+            ingredients = ', '.join(step['ingredients']) if step['ingredients'] else 'N/A'
+            st.markdown(f"**Ingredients:** {ingredients}")
+        st.markdown("---")
 
 # First, add the helper functions above the show_normal_ui function
+def get_instacart_links() -> InstacartLinkCache:
+    """Return this session's Instacart link cache."""
+    if 'instacart_links' not in st.session_state:
+        st.session_state['instacart_links'] = InstacartLinkCache()
+    return st.session_state['instacart_links']
+
 def check_instacart_url(meal_plan_id, headers):
-    """Check if an Instacart URL exists for the meal plan"""
+    """Check if an Instacart URL exists for the meal plan (cached per plan)"""
+    links = get_instacart_links()
+    cached = links.get(meal_plan_id)
+    if cached is not None:
+        return cached['instacart_url'], cached['has_url']
     try:
         response = api_call_with_refresh(
             url=f"{os.getenv('DJANGO_URL')}/meals/api/meal-plans/{meal_plan_id}/instacart-url/",
@@ -437,14 +756,21 @@ def check_instacart_url(meal_plan_id, headers):
         
         if response.status_code == 200:
             data = response.json()
+            links.put(meal_plan_id, data.get('instacart_url'), data.get('has_url', False))
             return data.get('instacart_url'), data.get('has_url', False)
         return None, False
     except Exception as e:
         logging.error(f"Error checking Instacart URL: {str(e)}")
         return None, False
 
-def generate_instacart_link(meal_plan_id, headers, force_refresh=False):
-    """Generate an Instacart link for the meal plan"""
+@st.cache_resource
+def get_instacart_executor() -> ThreadPoolExecutor:
+    """Return the process-wide pool for Instacart link jobs, kept apart from the shared background pool."""
+    return ThreadPoolExecutor(max_workers=INSTACART_WORKERS, thread_name_prefix="sautai-instacart")
+
+def start_instacart_link_generation(meal_plan_id, headers, force_refresh=False):
+    """Generate an Instacart link for the meal plan as a background job"""
+    links = get_instacart_links()
     # Get user's postal code from session if available
     postal_code = None
     if 'address' in st.session_state and st.session_state.get('address', {}).get('postalcode'):
@@ -452,32 +778,139 @@ def generate_instacart_link(meal_plan_id, headers, force_refresh=False):
     
     payload = {
         "meal_plan_id": meal_plan_id,
-        "force_refresh": force_refresh
+        "force_refresh": force_refresh or links.needs_refresh(meal_plan_id)
     }
     
     if postal_code:
         payload["postal_code"] = postal_code
-    
-    try:
+
+    links.start_job(meal_plan_id, get_instacart_executor().submit(
+        request_instacart_link, get_background_session(), os.getenv('DJANGO_URL'), dict(headers), payload
+    ))
+
+def show_instacart_link(instacart_url):
+    """Render the Instacart brand button linking to a shopping list."""
+    instacart_button_text = """<img src="https://live.staticflickr.com/65535/54538897116_fb233f397f_m.jpg" 
+                             style="height: 22px; vertical-align: middle; margin-right: 10px;"> Get Ingredients"""
+    st.markdown(f'''
+    <a href="{instacart_url}" target="_blank" style="text-decoration:none;">
+        <div style="background-color:#FFFFFF; color:#000000; height:46px; padding:16px 18px; 
+        border-radius:8px; display:flex; align-items:center; justify-content:center; 
+        font-weight:500; margin-bottom:10px; font-family:sans-serif;
+        border: 0.5px solid #E8E9EB;">
+            {instacart_button_text}
+        </div>
+    </a>''', unsafe_allow_html=True)
+
+def show_instacart_action(meal_plan_id, is_approved, is_past_week, headers):
+    """Shop Ingredients action; polls in place while a list is being generated."""
+    job = get_instacart_links().job(meal_plan_id)
+    run_every = INSTACART_POLL_SECONDS if job is not None else None
+    st.fragment(run_every=run_every)(_instacart_panel)(meal_plan_id, is_approved, is_past_week, headers)
+
+def _instacart_panel(meal_plan_id, is_approved, is_past_week, headers):
+    links = get_instacart_links()
+    job = links.job(meal_plan_id)
+    if job is not None:
+        if not job.done():
+            st.button("🛒 Shop Ingredients", use_container_width=True, disabled=True, key=f"instacart_busy_{meal_plan_id}")
+            st.caption("⏳ Generating shopping list. This may take a moment...")
+            return
+        # Keep the result for the next run and rerun the page to stop polling
+        st.session_state[f'instacart_result_{meal_plan_id}'] = links.finish_job(meal_plan_id)
+        st.rerun()
+
+    result = st.session_state.pop(f'instacart_result_{meal_plan_id}', None)
+    if result and result.get('status') == 'success':
+        st.success("Shopping list generated successfully!")
+        show_instacart_link(result['instacart_url'])
+        # # Trigger gamification event for generating shopping list
+        # trigger_gamification_event('shopping_list_generated', {
+        #     'meal_plan_id': meal_plan_id
+        # })
+    elif result:
+        st.warning(result.get('message') or 'Failed to generate Instacart link')
+
+    # Check if an Instacart URL exists for this meal plan
+    instacart_url, has_url = check_instacart_url(meal_plan_id, headers) if is_approved else (None, False)
+    if st.button("🛒 Shop Ingredients", use_container_width=True, disabled=is_past_week or not is_approved):
+        if not is_approved:
+            st.info("Approve your meal plan first to generate a shopping list.")
+        elif has_url and instacart_url and not links.needs_refresh(meal_plan_id):
+            # Show the Instacart button when a URL already exists
+            st.success("Your shopping list is ready! Click the button below to shop on Instacart.")
+            show_instacart_link(instacart_url)
+            
+            # Add refresh button
+            if st.button("🔄 Refresh List", key=f"refresh_instacart_{meal_plan_id}", use_container_width=True):
+                start_instacart_link_generation(meal_plan_id, headers, force_refresh=True)
+                st.rerun()
+        else:
+            # Generate a new shopping list in the background
+            start_instacart_link_generation(meal_plan_id, headers)
+            st.rerun()
+
+def get_review_cache() -> ReviewCache:
+    """Return this session's review cache."""
+    if 'review_cache' not in st.session_state:
+        st.session_state['review_cache'] = ReviewCache()
+    return st.session_state['review_cache']
+
+def load_reviews(kind, object_ids, headers):
+    """
+    Return the reviews of several meals or meal plans, fetching misses concurrently.
+
+    Args:
+        kind: 'meal' or 'meal_plan'
+        object_ids: IDs of the reviewed objects
+        headers: Request headers
+
+    Returns:
+        dict mapping each ID to its list of reviews (at most REVIEWS_PAGE_SIZE),
+        or None if they could not be fetched
+    """
+    cache = get_review_cache()
+    paths = {oid: f"/reviews/api/{kind}/{oid}/reviews/" for oid in cache.missing(kind, object_ids)}
+    responses = dj_get_many(list(paths.values()), headers=headers, params={'page_size': REVIEWS_PAGE_SIZE})
+    for oid, path in paths.items():
+        response = responses.get(path)
+        if response is not None and response.status_code == 200:
+            data = response.json()
+            reviews = review_list(data)
+            has_more = len(reviews) > REVIEWS_PAGE_SIZE or (isinstance(data, dict) and bool(data.get('next')))
+            cache.put(kind, oid, reviews[:REVIEWS_PAGE_SIZE], has_more=has_more)
+        else:
+            logging.warning(f"Failed to fetch {kind} reviews for {oid}")
+    return {oid: cache.get(kind, oid) for oid in object_ids}
+
+def find_user_review(kind, object_id, user_id, headers):
+    """
+    Return the user's own review of an object, or None if they have none.
+
+    The first page comes from load_reviews; later pages are only fetched
+    when the review is not on it, and the outcome is cached.
+    """
+    cache = get_review_cache()
+    known, review = cache.user_review(kind, object_id, user_id)
+    if known:
+        return review
+    page = 2
+    while True:
         response = api_call_with_refresh(
-            url=f"{os.getenv('DJANGO_URL')}/meals/api/generate-instacart-link/",
-            method='post',
+            url=f"{os.getenv('DJANGO_URL')}/reviews/api/{kind}/{object_id}/reviews/",
+            method='get',
             headers=headers,
-            data=payload
+            params={'page_size': REVIEWS_PAGE_SIZE, 'page': page},
         )
-        
-        if response.status_code == 200:
-            data = response.json()
-            if data.get('status') == 'success':
-                return data.get('instacart_url')
-            else:
-                st.warning(data.get('message', 'Failed to generate Instacart link'))
-        else:
-            st.error(f"API error: {response.status_code}")
-        return None
-    except Exception as e:
-        logging.error(f"Error generating Instacart link: {str(e)}")
-        return None
+        if response is None or response.status_code != 200:
+            logging.warning(f"Failed to fetch page {page} of {kind} reviews for {object_id}")
+            return None
+        data = response.json()
+        review = next((r for r in review_list(data) if r.get('user') == user_id), None)
+        if review is not None or not (isinstance(data, dict) and data.get('next')):
+            cache.set_user_review(kind, object_id, user_id, review)
+            return review
+        page += 1
 
 def show_normal_ui(meal_plan_df, meal_plan_id, is_approved, is_past_week, selected_data_full,
                    meal_plan_id_from_url=None, meal_id_from_url=None, action=None, selected_tab=None,
@@ -497,13 +930,8 @@ def show_normal_ui(meal_plan_df, meal_plan_id, is_approved, is_past_week, select
 
         # Fetch pending order ID from the meal plan details
         pending_order_id = None
-        meal_plan_details_resp = api_call_with_refresh(
-            url=f"{os.getenv('DJANGO_URL')}/meals/api/meal_plans/{meal_plan_id}/",
-            method='get',
-            headers=headers
-        )
-        if meal_plan_details_resp.status_code == 200:
-            meal_plan_details = meal_plan_details_resp.json()
+        meal_plan_details = fetch_meal_plan_details(selected_week_start, meal_plan_id, headers)
+        if meal_plan_details:
             pending_order_id = meal_plan_details.get('pending_order_id')
         
         if pending_order_id:
@@ -628,7 +1056,8 @@ def show_normal_ui(meal_plan_df, meal_plan_id, is_approved, is_past_week, select
                 if st.button("Update order", disabled=expired or new_qty==order_details['quantity']):
                     resp = adjust_chef_order(order_details['id'], int(new_qty))
                     if resp and resp.status_code == 200:
-                        st.success("Order updated!")
+                        invalidate_chef_meals()
+                        flash("Order updated!")
                         st.rerun()
                     elif resp and resp.status_code == 409:
                         st.warning("You already have an active order for that event.")
@@ -795,13 +1224,8 @@ def show_normal_ui(meal_plan_df, meal_plan_id, is_approved, is_past_week, select
         st.write("### ⭐ Meal Plan Reviews")
         if is_approved:
             # Display review statistics
-            rev_resp = api_call_with_refresh(
-                url=f"{os.getenv('DJANGO_URL')}/reviews/api/meal_plan/{meal_plan_id}/reviews/",
-                method='get',
-                headers=headers
-            )
-            if rev_resp.status_code == 200:
-                rev_data = rev_resp.json()
+            rev_data = load_reviews('meal_plan', [meal_plan_id], headers)[meal_plan_id]
+            if rev_data is not None:
                 if not rev_data:
                     st.info("🌟 Be the first to review this meal plan!")
                 else:
@@ -863,6 +1287,7 @@ def show_normal_ui(meal_plan_df, meal_plan_id, is_approved, is_past_week, select
                                 data=payload
                             )
                             if rev_post.status_code == 201:
+                                get_review_cache().invalidate('meal_plan', meal_plan_id)
                                 st.success("Thank you for your review! 🎉")
                                 
                                 # Trigger gamification event for submitting a meal review
@@ -872,8 +1297,6 @@ def show_normal_ui(meal_plan_df, meal_plan_id, is_approved, is_past_week, select
                                 })
                                 
                                 st.balloons()
-                                # Fetch updated gamification data
-                                fetch_gamification_data()
                                 st.rerun()
                             else:
                                 st.error("Failed to submit review.")
@@ -914,21 +1337,13 @@ def show_normal_ui(meal_plan_df, meal_plan_id, is_approved, is_past_week, select
             # -------------------------------------------------------------
             # 2) Fetch any existing review for this user + meal
             # -------------------------------------------------------------
+            # Reviews for every meal in the plan are loaded in one concurrent pass
+            # so switching meals is instant
+            meal_reviews = load_reviews('meal', unique_meals['meal_id'].tolist(), headers)
             existing_review = None
-            review_fetch_resp = api_call_with_refresh(
-                url=f"{os.getenv('DJANGO_URL')}/reviews/api/meal/{selected_meal_id}/reviews/",
-                method='get',
-                headers=headers,
-            )
-            if review_fetch_resp.status_code == 200:
-                all_meal_reviews = review_fetch_resp.json()  # list of reviews
-                # Find a review where review['user'] matches our current user ID
-                for r in all_meal_reviews:
-                    # Depending on how your serializer is set up, 
-                    # you might need to compare r['user'] == user_id or r['user']['id'] == user_id, etc.
-                    if r['user'] == user_id:
-                        existing_review = r
-                        break
+            if meal_reviews.get(selected_meal_id) is not None:
+                # The user's review may be past the first page on popular meals
+                existing_review = find_user_review('meal', selected_meal_id, user_id, headers)
             else:
                 st.warning("Could not load reviews for this meal.")
 
@@ -964,6 +1379,7 @@ def show_normal_ui(meal_plan_df, meal_plan_id, is_approved, is_past_week, select
 
                 # The endpoint returns 201 if created, 200 if updated
                 if meal_rev_post.status_code in (200, 201):
+                    get_review_cache().invalidate('meal', selected_meal_id)
                     is_new = meal_rev_post.status_code == 201
                     st.success(f"Meal review {'created' if is_new else 'updated'}!")
                     
@@ -974,9 +1390,6 @@ def show_normal_ui(meal_plan_df, meal_plan_id, is_approved, is_past_week, select
                         'rating': meal_rating,
                         'is_new': is_new
                     })
-                    
-                    # Refresh gamification data
-                    fetch_gamification_data()
                 else:
                     st.error(f"Failed to submit meal review. Status code: {meal_rev_post.status_code}")
 
@@ -1062,6 +1475,7 @@ def show_normal_ui(meal_plan_df, meal_plan_id, is_approved, is_past_week, select
         with filter_cols[3]:
             if st.button("🔄 Refresh Chef Meals", use_container_width=True):
                 st.session_state.chef_meals_page = 1  # Reset to first page when refreshing
+                invalidate_chef_meals()
                 st.rerun()
         
         # Extract date from the selected day if needed
@@ -1071,15 +1485,18 @@ def show_normal_ui(meal_plan_df, meal_plan_id, is_approved, is_past_week, select
             if day_name in day_offset:
                 selected_date = (selected_week_start + timedelta(days=day_offset[day_name])).strftime('%Y-%m-%d')
         
-        # Fetch chef meals by postal code using the get_chef_meals_by_postal_code function
-        chef_meals_data = get_chef_meals_by_postal_code(
+        # Fetch chef meals by postal code (shared across users in the same area)
+        chef_meals_data, chef_event_index = fetch_chef_meals(
+            selected_week_start.strftime('%Y-%m-%d'),
             meal_type=st.session_state.chef_meal_type_filter,
             date=selected_date,  # Only use date if a specific day is selected
-            week_start_date=selected_week_start.strftime('%Y-%m-%d') if not selected_date else None,
             chef_id=st.session_state.chef_id_filter if 'chef_id_filter' in st.session_state else None,
-            include_compatible_only=st.session_state.chef_compatible_only,
+            compatible_only=st.session_state.chef_compatible_only,
             page=st.session_state.chef_meals_page
         )
+        if chef_meals_data:
+            # Local paging clamps the page when a filter shrinks the listing
+            st.session_state.chef_meals_page = chef_meals_data.get('data', {}).get('current_page', st.session_state.chef_meals_page)
         
         if chef_meals_data:
             meals = chef_meals_data.get('data', {}).get('meals', [])
@@ -1087,14 +1504,7 @@ def show_normal_ui(meal_plan_df, meal_plan_id, is_approved, is_past_week, select
             if meals:
                 # Filter meals by day if specific day selected
                 if chef_selected_day != "All Days" and selected_date:
-                    filtered_meals = []
-                    for meal in meals:
-                        available_dates = meal.get('available_dates', {})
-                        if selected_date in available_dates:
-                            # Add day-specific information
-                            meal['event_info'] = available_dates[selected_date]
-                            filtered_meals.append(meal)
-                    meals = filtered_meals
+                    meals = [meal for meal in meals if chef_event_index.get(meal.get('id'), selected_date)]
                 
                 if meals:  # Check again after filtering
                     st.success(f"Found {len(meals)} chef meals available for the selected filters!")
@@ -1118,8 +1528,7 @@ def show_normal_ui(meal_plan_df, meal_plan_id, is_approved, is_past_week, select
                                 compatibility_color = "green" if is_compatible else "orange"
                                 
                                 # Get meal events for this meal
-                                event_info = meal.get('event_info', {})
-                                available_dates = meal.get('available_dates', {})
+                                event_info = chef_event_index.get(meal.get('id'), selected_date) if selected_date else None
                                 available_days_count = meal.get('available_days_count', 0)
                                 
                                 # Get rating information
@@ -1135,7 +1544,7 @@ def show_normal_ui(meal_plan_df, meal_plan_id, is_approved, is_past_week, select
                                     <h4>{meal.get('name', 'Unnamed Meal')}</h4>
                                     <p><strong>Chef:</strong> {meal.get('chef_name', 'Unknown Chef')}</p>
                                     <p><strong>Type:</strong> {meal.get('meal_type', 'Unknown Type')}</p>
-                                    <p><strong>Price:</strong> ${float(meal.get('chef_meal_events', [{}])[0].get('current_price', meal.get('price', 0))):.2f}</p>
+                                    <p><strong>Price:</strong> ${chef_event_index.base_price(meal.get('id')):.2f}</p>
                                     <p><strong>Rating:</strong> {rating_stars if rating > 0 else 'No ratings yet'}</p>
                                     <p><span style="color:{compatibility_color}; font-weight:bold;">{compatibility_badge}</span></p>
                                 """, unsafe_allow_html=True)
@@ -1145,35 +1554,21 @@ def show_normal_ui(meal_plan_df, meal_plan_id, is_approved, is_past_week, select
                                     st.markdown(f"<p><strong>Available on:</strong> {available_days_count} day{'s' if available_days_count != 1 else ''} this week</p>", unsafe_allow_html=True)
                                     
                                     # Show the available days
-                                    if available_dates:
-                                        days_str = ", ".join([f"{info['day_name']}" for date, info in available_dates.items()])
+                                    days_str = chef_event_index.day_names(meal.get('id'))
+                                    if days_str:
                                         st.markdown(f"<p><small>Available days: {days_str}</small></p>", unsafe_allow_html=True)
                                 elif event_info:
                                     # Show detailed information for the selected day
-                                    event_time = event_info.get('event_time', '')
-                                    orders_count = event_info.get('orders_count', 0)
-                                    max_orders = event_info.get('max_orders', 0)
-                                    day_name = event_info.get('day_name', '')
-                                    
-                                    st.markdown(f"<p><strong>Delivery:</strong> {day_name} at {event_time}</p>", unsafe_allow_html=True)
+                                    st.markdown(f"<p><strong>Delivery:</strong> {event_info['day_name']} at {event_info['event_time']}</p>", unsafe_allow_html=True)
                                     
-                                    if max_orders > 0:
-                                        capacity = int((orders_count / max_orders) * 100)
+                                    capacity = event_info['capacity_pct']
+                                    if capacity is not None:
                                         capacity_color = "green" if capacity < 50 else ("orange" if capacity < 80 else "red")
-                                        st.markdown(f"<p><span style='color:{capacity_color};'><strong>Capacity:</strong> {capacity}% full ({orders_count}/{max_orders} orders)</span></p>", unsafe_allow_html=True)
+                                        st.markdown(f"<p><span style='color:{capacity_color};'><strong>Capacity:</strong> {capacity}% full ({event_info['orders_count']}/{event_info['max_orders']} orders)</span></p>", unsafe_allow_html=True)
                                     
                                     # Display the event-specific price if available
-                                    if 'price' in event_info:
-                                        event_price = event_info.get('price')
-                                        st.markdown(f"<p><strong>Event Price:</strong> ${float(event_price):.2f}</p>", unsafe_allow_html=True)
-                                    # Or display the price from chef_meal_events if available
-                                    elif meal.get('chef_meal_events'):
-                                        for event in meal.get('chef_meal_events', []):
-                                            if event.get('id') == event_info.get('event_id'):
-                                                event_price = event.get('current_price')
-                                                if event_price is not None:
-                                                    st.markdown(f"<p><strong>Event Price:</strong> ${float(event_price):.2f}</p>", unsafe_allow_html=True)
-                                                break
+                                    if event_info['has_event_price']:
+                                        st.markdown(f"<p><strong>Event Price:</strong> ${event_info['price']:.2f}</p>", unsafe_allow_html=True)
                                 
                                 # Display description
                                 st.markdown(f"<p><small>{meal.get('description', '')[:100]}{'...' if len(meal.get('description', '')) > 100 else ''}</small></p>", unsafe_allow_html=True)
@@ -1217,26 +1612,21 @@ def show_normal_ui(meal_plan_df, meal_plan_id, is_approved, is_past_week, select
                                     st.subheader(f"Select a {meal_type} to replace:")
                                     
                                     # Get available dates for this chef meal
-                                    available_dates = chef_meal.get('available_dates', {})
-                                    
-                                    # Filter replacement options by meal type AND date
-                                    replacement_options = meal_plan_df[meal_plan_df['Meal Type'] == meal_type]
+                                    chef_meal_events = chef_event_index.dates(chef_meal.get('id'))
                                     
-                                    # Further filter by matching the date
-                                    valid_replacement_options = []
-                                    replacement_meals = []
-                                    
-                                    for _, row in replacement_options.iterrows():
-                                        meal_date = row['Meal Date']
-                                        meal_day = row['Day']
-                                        date_str = meal_date.strftime('%Y-%m-%d')
-                                        
-                                        # Check if this meal's date is in the chef meal's available dates
-                                        if date_str in available_dates:
-                                            valid_replacement_options.append(row)
-                                            replacement_meals.append(f"{row['Meal Name']} ({meal_day} - {meal_date.strftime('%b %d')})")
+                                    # Filter replacement options by meal type AND the chef meal's available dates
+                                    valid_replacement_options = meal_plan_df[
+                                        (meal_plan_df['Meal Type'] == meal_type)
+                                        & meal_plan_df['date_key'].isin(list(chef_meal_events))
+                                    ]
+                                    replacement_meals = (
+                                        valid_replacement_options['Meal Name'] + " ("
+                                        + valid_replacement_options['Day'].astype(str) + " - "
+                                        + valid_replacement_options['Meal Date'].map(lambda d: d.strftime('%b %d')) + ")"
+                                    )
                                     
-                                    if not replacement_meals:
+                                    selected_row = valid_replacement_options.iloc[0:0]
+                                    if replacement_meals.empty:
                                         st.warning(f"No {meal_type} meals found that match the chef meal's available dates.")
                                         st.info("Chef meals can only replace meals on the same date as the chef meal's scheduled event.")
                                         
@@ -1247,39 +1637,25 @@ def show_normal_ui(meal_plan_df, meal_plan_id, is_approved, is_past_week, select
                                     else:
                                         selected_replacement = st.selectbox(
                                             f"Choose meal to replace with {chef_meal.get('name')}",
-                                            options=replacement_meals,
+                                            options=replacement_meals.index.tolist(),
+                                            format_func=replacement_meals.get,
                                             key=f"replacement_select_{meal.get('id')}"
                                         )
-                                    
-                                    # Extract meal name without the day part
-                                    selected_meal_name = selected_replacement.split(" (")[0]
-                                    day_date_info = selected_replacement.split("(")[1].split(")")[0]
-                                    selected_day = day_date_info.split(" - ")[0]
-                                    
-                                    # Use the filtered valid options instead of all replacement options
-                                    selected_row = pd.DataFrame(valid_replacement_options)[
-                                        (pd.DataFrame(valid_replacement_options)['Meal Name'] == selected_meal_name) & 
-                                        (pd.DataFrame(valid_replacement_options)['Day'] == selected_day)
-                                    ]
+                                        selected_row = valid_replacement_options.loc[[selected_replacement]]
+                                        selected_day = str(selected_row['Day'].iloc[0])
                                     
                                     if not selected_row.empty:
                                         selected_meal_plan_meal_id = selected_row['Meal Plan Meal ID'].values[0]
                                         
-                                        # Get event ID for the selected day if available
-                                        event_id = None
-                                        available_dates = chef_meal.get('available_dates', {})
-
-                                        # Find the date for the selected day
-                                        if selected_day in day_offset:
-                                            selected_date = (selected_week_start + timedelta(days=day_offset[selected_day])).strftime('%Y-%m-%d')
-                                            if selected_date in available_dates:
-                                                event_id = available_dates[selected_date].get('event_id')
+                                        # Get the event for the selected row's date, if any
+                                        replacement_event = chef_meal_events.get(selected_row['date_key'].iloc[0])
+                                        event_id = replacement_event['event_id'] if replacement_event else None
                                         
                                         if not event_id:
                                             st.warning("Could not find a valid event for this date. Please try another meal.")
                                             
                                         # Add quantity selection and special requests before confirming
-                                        meal_price = float(chef_meal.get('chef_meal_events', [{}])[0].get('current_price', chef_meal.get('price', 0)))
+                                        meal_price = replacement_event['price'] if replacement_event else chef_event_index.base_price(chef_meal.get('id'))
                                         
                                         # Display quantity selector
                                         st.markdown("### How many meals would you like to order?")
@@ -1311,8 +1687,6 @@ def show_normal_ui(meal_plan_df, meal_plan_id, is_approved, is_past_week, select
                                                 # Call API to replace the meal
                                                 with st.spinner("Placing chef meal order..."):
                                                     try:
-                                                        # Use the new place_chef_order function
-                                                        # First get the event_id
                                                         if event_id:
                                                             replace_result = place_chef_order(
                                                                 meal_event_id=event_id,
@@ -1320,8 +1694,8 @@ def show_normal_ui(meal_plan_df, meal_plan_id, is_approved, is_past_week, select
                                                                 special=special_requests
                                                             )
                                                             
-                                                            if replace_result and replace_result.status_code == 201:
-                                                                st.success(f"Successfully ordered {quantity} {chef_meal.get('name')} meal{'s' if quantity > 1 else ''}!")
+                                                            if replace_result is not None and replace_result.status_code == 201:
+                                                                flash(f"Successfully ordered {quantity} {chef_meal.get('name')} meal{'s' if quantity > 1 else ''}!")
                                                                 
                                                                 # Trigger gamification event for replacing with chef meal
                                                                 trigger_gamification_event('chef_connect', {
@@ -1329,14 +1703,19 @@ def show_normal_ui(meal_plan_df, meal_plan_id, is_approved, is_past_week, select
                                                                     'chef_meal_id': meal.get('id')
                                                                 })
                                                                 
+                                                                # The plan changed on the backend; refetch this week
+                                                                get_meal_plan_week_cache().invalidate(selected_week_start)
+                                                                get_instacart_links().invalidate(meal_plan_id, meals_changed=True)
+                                                                # Event capacity changed for everyone in the area
+                                                                invalidate_chef_meals()
+
                                                                 # Clear replacement state and refresh page
                                                                 del st.session_state[f'replacing_with_chef_meal_{meal.get("id")}']
                                                                 del st.session_state[f'chef_meal_to_replace_{meal.get("id")}']
-                                                                time.sleep(1)  # Give time to read the success message
                                                                 st.rerun()
-                                                            elif replace_result and replace_result.status_code == 409:
+                                                            elif replace_result is not None and replace_result.status_code == 409:
                                                                 st.warning("You already have an active order for that event.")
-                                                            elif replace_result and replace_result.status_code == 400:
+                                                            elif replace_result is not None and replace_result.status_code == 400:
                                                                 st.error("Orders have closed for this event. Please contact support.")
                                                             else:
                                                                 st.error("Failed to place order. Please try again.")
@@ -1405,7 +1784,6 @@ def show_normal_ui(meal_plan_df, meal_plan_id, is_approved, is_past_week, select
                         with st.spinner("Setting up notifications..."):
                             # Here you would integrate with your notification system
                             # For now, just show a success message
-                            time.sleep(1)
                             st.success("You'll be notified when new chef meals are available in your area!")
                 with notification_cols[1]:
                     if st.button("See Featured Recipes Instead", use_container_width=True):
@@ -1587,23 +1965,13 @@ if st.button("Logout", key='meal_plan_logout'):
 # Check if user is authenticated and email confirmed
 if is_user_authenticated() and st.session_state.get('email_confirmed', False):
     # Fetch gamification data from backend
-    fetch_gamification_data()
+    fetch_gamification_data(max_age_seconds=GAMIFICATION_REFRESH_SECONDS)
     
     if 'current_role' in st.session_state and st.session_state['current_role'] != 'chef':
         # Create a sidebar for filters and user stats
         with st.sidebar:
             st.title("🏆 Your Progress")
-            st.metric("Meal Planning Streak", f"{st.session_state.meal_plan_streak} days")
-            st.metric("Total Meals Planned", st.session_state.total_meals_planned)
-            st.metric("Current Level", st.session_state.user_level)
-            st.metric("Points", st.session_state.points)  # Add points display
-            
-            st.markdown("---")
-            st.subheader("🎯 Weekly Goals")
-            goals_complete = st.progress(
-                st.session_state.weekly_goal_progress, 
-                text=st.session_state.weekly_goal_text
-            )
+            show_progress_metrics()
             st.markdown("Complete your week's plan to earn rewards!")
             
             # Add a refresh button
@@ -1662,6 +2030,7 @@ if is_user_authenticated() and st.session_state.get('email_confirmed', False):
 
         # Main content area with improved layout
         st.title("📅 Your Meal Plans")
+        show_flash_messages()
         # Center title and welcome text on mobile
         st.markdown(
             """
@@ -1802,16 +2171,14 @@ if is_user_authenticated() and st.session_state.get('email_confirmed', False):
 
         st.markdown("---")
 
-        response = api_call_with_refresh(
-            url=f'{os.getenv("DJANGO_URL")}/meals/api/meal_plans/?week_start_date={selected_week_start}',
-            method='get',
-            headers=headers,
-        )
-        if not response:
+        status_code, meal_plan_data = fetch_meal_plan_week(selected_week_start, headers)
+        if status_code is None:
             st.error("❌ Error fetching meal plans: Checkout URL not received from the server.")
             st.stop()
-        if response.status_code == 200:
-            meal_plan_data = response.json()
+        if status_code == 200:
+            # Warm the neighbouring weeks while this one renders
+            prefetch_adjacent_weeks(selected_week_start, headers)
+
             # Extract meal_plans list if we have a dictionary with meal_plans key
             if isinstance(meal_plan_data, dict) and 'meal_plans' in meal_plan_data:
                 meal_plans_list = meal_plan_data['meal_plans']
@@ -1851,16 +2218,11 @@ if is_user_authenticated() and st.session_state.get('email_confirmed', False):
                 st.error("Error processing meal plan data: invalid structure.")
                 st.stop()
 
-            meal_plan_details_resp = api_call_with_refresh(
-                url=f"{os.getenv('DJANGO_URL')}/meals/api/meal_plans/{meal_plan_id}/",
-                method='get',
-                headers=headers
-            )
+            meal_plan_details = fetch_meal_plan_details(selected_week_start, meal_plan_id, headers)
 
             is_approved = False
             pending_order_id_from_api = None # Initialize
-            if meal_plan_details_resp.status_code == 200:
-                meal_plan_details = meal_plan_details_resp.json()
+            if meal_plan_details:
                 is_approved = meal_plan_details.get('is_approved', False)
                 
                 # --- Check for pending payment based on API response --- #
@@ -1875,43 +2237,17 @@ if is_user_authenticated() and st.session_state.get('email_confirmed', False):
                     del st.session_state['pending_chef_order_id']
                 # --- End Check --- #
 
-            meal_plan_records = []
-            day_offset = { 'Monday':0,'Tuesday':1,'Wednesday':2,'Thursday':3,'Friday':4,'Saturday':5,'Sunday':6 }
+            day_offset = DAY_OFFSET
 
-            for m in meal_plan['meals']:
-                meal_day = m['day']
-                meal_plan_meal_id = m['meal_plan_meal_id']
-                meal_date = selected_week_start + timedelta(days=day_offset[meal_day])
-                
-                # Check if this is a chef meal - correctly use is_chef_meal instead of chef_meal
-                is_chef_meal = m.get('is_chef_meal', False)
-                
-                # As a fallback, also check in the meal object if the top-level flag isn't present
-                if not is_chef_meal and 'meal' in m and isinstance(m['meal'], dict):
-                    is_chef_meal = m['meal'].get('is_chef_meal', False)
-                
-                # For additional verification, we could also check if chef_name is not None
-                if not is_chef_meal and m.get('chef_name') is not None:
-                    is_chef_meal = True
-                
-                meal_plan_records.append({
-                    'Select': False,
-                    'Meal Plan ID': meal_plan_id,
-                    'Meal Plan Meal ID': meal_plan_meal_id,
-                    'meal_id': m['meal']['id'],
-                    'Meal Date': pd.to_datetime(meal_date).date(),  # Convert to pandas datetime
-                    'Meal Name': m['meal']['name'],
-                    'Day': meal_day,
-                    'Meal Type': m['meal_type'],
-                    'Description': m['meal']['description'],
-                    'is_chef_meal': is_chef_meal,  # Add flag for chef meals
-                })
+            # Built once per cached plan version; the fallback covers an evicted week
+            meal_plan_df = get_meal_plan_week_cache().table(selected_week_start)
+            if meal_plan_df is None:
+                meal_plan_df = build_meal_plan_table(meal_plan, selected_week_start)
 
-            if not meal_plan_records:
+            if meal_plan_df.empty:
                 st.info("No meals found for this week.")
                 st.stop()
 
-            meal_plan_df = pd.DataFrame(meal_plan_records)
             if selected_day != "All Days":
                 meal_plan_df = meal_plan_df[meal_plan_df['Day'] == selected_day]
 
@@ -1922,55 +2258,14 @@ if is_user_authenticated() and st.session_state.get('email_confirmed', False):
                     # If 'Everything' is selected along with other filters, show a note
                     pass
                 else:
-                    # Get detailed meal data to check dietary attributes
-                    filtered_meal_ids = []
-                    
                     # Get unique meal IDs to minimize API calls
                     unique_meal_ids = meal_plan_df['meal_id'].unique().tolist()
-                    missing_meals = []
-                    
-                    for meal_id in unique_meal_ids:
-                        try:
-                            meal_detail_resp = api_call_with_refresh(
-                                url=f"{os.getenv('DJANGO_URL')}/meals/api/meals/{meal_id}/",
-                                method='get',
-                                headers=headers
-                            )
-                            
-                            if meal_detail_resp and hasattr(meal_detail_resp, 'status_code'):
-                                if meal_detail_resp.status_code == 200:
-                                    meal_detail = meal_detail_resp.json()
-                                    # Get meal preferences by name
-                                    meal_preferences = []
-                                    
-                                    # Handle various response formats
-                                    dietary_preferences = meal_detail.get('dietary_preferences', [])
-                                    if dietary_preferences:
-                                        if isinstance(dietary_preferences[0], dict):
-                                            # If preferences are objects with 'name' field
-                                            meal_preferences = [pref['name'] for pref in dietary_preferences if 'name' in pref]
-                                        elif isinstance(dietary_preferences[0], str):
-                                            # If preferences are already strings
-                                            meal_preferences = dietary_preferences
-                                    
-                                    # Check if all selected preferences match this meal
-                                    matches_all_preferences = all(
-                                        preference in meal_preferences
-                                        for preference in st.session_state.dietary_preferences
-                                    )
-                                    
-                                    if matches_all_preferences:
-                                        filtered_meal_ids.append(meal_id)
-                                elif meal_detail_resp.status_code == 404:
-                                    # Track missing meals but don't log errors for 404s
-                                    missing_meals.append(meal_id)
-                            else:
-                                # Handle case where response is None or doesn't have status_code
-                                missing_meals.append(meal_id)
-                        except Exception as e:
-                            # More graceful error handling
-                            missing_meals.append(meal_id)
-                            logging.warning(f"Error fetching meal details for meal {meal_id}: {str(e)}")
+                    missing_meals = load_meal_preferences(unique_meal_ids, headers)
+
+                    # Check if all selected preferences match each meal
+                    filtered_meal_ids = get_meal_preference_index().matching(
+                        unique_meal_ids, st.session_state.dietary_preferences
+                    )
                     
                     # Provide feedback if there were missing meals
                     if missing_meals and not filtered_meal_ids:
@@ -1987,12 +2282,6 @@ if is_user_authenticated() and st.session_state.get('email_confirmed', False):
                     else:
                         st.info(f"No meals match all selected dietary preferences: {', '.join(st.session_state.dietary_preferences)}")
 
-            day_order = ['Monday','Tuesday','Wednesday','Thursday','Friday','Saturday','Sunday']
-            meal_type_order = ['Breakfast','Lunch','Dinner']
-            meal_plan_df['Day'] = pd.Categorical(meal_plan_df['Day'], categories=day_order, ordered=True)
-            meal_plan_df['Meal Type'] = pd.Categorical(meal_plan_df['Meal Type'], categories=meal_type_order, ordered=True)
-            meal_plan_df = meal_plan_df.sort_values(['Day', 'Meal Type'])
-
             # Configure column display
             column_config = {
                 "Select": st.column_config.CheckboxColumn(
@@ -2034,30 +2323,13 @@ if is_user_authenticated() and st.session_state.get('email_confirmed', False):
             }
 
             # Keep Meal Plan Meal ID in the display DataFrame but hide it from view
-            display_df = meal_plan_df.drop(columns=['Meal Plan ID', 'meal_id'])
-            
-            # Format the is_chef_meal column to show as a badge with different colors
-            if 'is_chef_meal' in display_df.columns:
-                def format_source_badge(is_chef):
-                    if is_chef:
-                        # More distinctive badge for chef meals
-                        return "👨‍🍳 CHEF"
-                    else:
-                        # More distinctive badge for AI meals
-                        return "🤖 ASSISTANT"
-                
-                display_df['is_chef_meal'] = display_df['is_chef_meal'].apply(format_source_badge)
-                
-                # Rename the column to "Source" for better clarity
-                display_df = display_df.rename(columns={'is_chef_meal': 'Source'})
-                
-                # Also modify the meal name to include visual indication
-                display_df['Meal Name'] = display_df.apply(
-                    lambda row: f"⭐ {row['Meal Name']} ⭐" if row['Source'].startswith('👨‍🍳') else row['Meal Name'],
-                    axis=1
-                )
-            
-            display_df = display_df[['Select', 'Day', 'Meal Type', 'Meal Name', 'Description', 'Meal Date', 'Source' if 'Source' in display_df.columns else 'is_chef_meal', 'Meal Plan Meal ID']]
+            display_df = meal_plan_df[['Select', 'Day', 'Meal Type', 'Meal Name', 'Description', 'Meal Date', 'Meal Plan Meal ID']].copy()
+
+            # Show the meal source as a badge and highlight chef meals in the name
+            display_df.insert(6, 'Source', source_badges(meal_plan_df))
+            display_df['Meal Name'] = display_df['Meal Name'].where(
+                ~meal_plan_df['is_chef_meal'], "⭐ " + display_df['Meal Name'] + " ⭐"
+            )
 
             # Add meal type icons
             meal_type_icons = {
@@ -2077,52 +2349,17 @@ if is_user_authenticated() and st.session_state.get('email_confirmed', False):
             )
             
             # Update column config for Source
-            if 'Source' in display_df.columns:
+            if meal_plan_df['chef_name'].notna().any():
                 # Add chef information to the DataFrame for use in tooltips
-                chef_info = {}
-                for m in meal_plan['meals']:
-                    if m.get('is_chef_meal') and m.get('chef_name'):
-                        meal_plan_meal_id = m['meal_plan_meal_id']
-                        # Check first for chef_meal_events pricing
-                        if 'chef_meal_events' in m['meal'] and m['meal']['chef_meal_events']:
-                            price = m['meal']['chef_meal_events'][0].get('current_price', 
-                                  m['meal'].get('current_price', 
-                                  m['meal'].get('price', 'Price not available')))
-                        else:
-                            price = m['meal'].get('current_price', 
-                                  m['meal'].get('price', 'Price not available'))
-                            
-                        chef_info[meal_plan_meal_id] = {
-                            'chef_name': m.get('chef_name', 'Unknown Chef'),
-                            'price': price
-                        }
-                
-                # Create help text with chef information when available
-                def get_source_help_text(row):
-                    if row['Source'].startswith('👨‍🍳'):
-                        meal_plan_meal_id = row['Meal Plan Meal ID']
-                        if meal_plan_meal_id in chef_info:
-                            chef_data = chef_info[meal_plan_meal_id]
-                            return f"Created by Chef {chef_data['chef_name']} - Price: ${chef_data['price']}"
-                    return "Meal source: Chef-created or AI-generated"
-                
-                # Add the help text column
-                if chef_info:
-                    display_df['Source_Help'] = display_df.apply(get_source_help_text, axis=1)
-                    # Use custom tooltips for each row
-                    column_config["Source"] = st.column_config.Column(
-                        "Source",
-                        help="Hover for details about the meal source",
-                        width="medium"
-                    )
-                else:
-                    column_config["Source"] = st.column_config.Column(
-                        "Source",
-                        help="Meal source: Chef-created or AI-generated",
-                        width="medium"
-                    )
-            elif 'is_chef_meal' in display_df.columns:
-                column_config["is_chef_meal"] = st.column_config.Column(
+                display_df['Source_Help'] = source_help_texts(meal_plan_df)
+                # Use custom tooltips for each row
+                column_config["Source"] = st.column_config.Column(
+                    "Source",
+                    help="Hover for details about the meal source",
+                    width="medium"
+                )
+            else:
+                column_config["Source"] = st.column_config.Column(
                     "Source",
                     help="Meal source: Chef-created or AI-generated",
                     width="medium"
@@ -2154,7 +2391,7 @@ if is_user_authenticated() and st.session_state.get('email_confirmed', False):
                 hide_index=True,
                 num_rows="fixed",
                 column_config=column_config,
-                column_order=["Select", "Day", "Meal Type", "Meal Name", 'Source' if 'Source' in display_df.columns else 'is_chef_meal', "Description", "Meal Date"],
+                column_order=["Select", "Day", "Meal Type", "Meal Name", "Source", "Description", "Meal Date"],
                 # REMOVED on_change=update_meal_selections,
                 key="meal_plan_editor"
             )
@@ -2172,10 +2409,11 @@ if is_user_authenticated() and st.session_state.get('email_confirmed', False):
                 st.session_state.active_section = None
             
             # Show appropriate section based on active_section
-            if st.session_state.active_section == 'cooking_instructions' and 'instructions' in st.session_state and st.session_state['instructions']:
+            if st.session_state.active_section == 'cooking_instructions' and (st.session_state.get('instructions') or st.session_state.get('instructions_pending')):
                 st.markdown("### 👨‍🍳 Cooking Instructions")
                 if st.button("⬅️ Back to Meals", key="back_from_instructions"):
                     st.session_state.active_section = None
+                    st.session_state.pop('instructions_pending', None)
                     st.rerun()
                 display_instructions_pagination()
                 
@@ -2225,6 +2463,13 @@ if is_user_authenticated() and st.session_state.get('email_confirmed', False):
                                     if 'pending_chef_order_id' in st.session_state:
                                         del st.session_state['pending_chef_order_id']
 
+                                    get_meal_plan_week_cache().apply_approval(
+                                        selected_week_start,
+                                        meal_prep_preference=prep_preference,
+                                        order_id=order_id,
+                                        requires_payment=requires_payment
+                                    )
+
                                     st.success(message)
 
                                     # Trigger gamification event
@@ -2239,12 +2484,10 @@ if is_user_authenticated() and st.session_state.get('email_confirmed', False):
                                     if order_id and requires_payment:
                                         # DEBUG: Entering payment required block
 
-                                        st.info(f"Payment is required for chef meals in this plan. Order ID: {order_id}")
+                                        flash(f"Payment is required for chef meals in this plan. Order ID: {order_id}", kind='info')
                                         st.session_state['pending_chef_order_id'] = order_id
                                         # Directly set the tab to payment and rerun
                                         st.session_state['selected_tab'] = "💳 Payment"
-                                        # DEBUG: Check active section value
-                                        time.sleep(1)
                                         st.rerun()
                                     else:
                                         # No action needed here regarding flags
@@ -2312,7 +2555,10 @@ if is_user_authenticated() and st.session_state.get('email_confirmed', False):
                                         updates = response_data.get('updates', [])
                                         
                                         if updates:
-                                            st.success("✨ Meals updated successfully!")
+                                            # The response doesn't carry the new plan rows; refetch this week
+                                            get_meal_plan_week_cache().invalidate(selected_week_start)
+                                            get_instacart_links().invalidate(meal_plan_id, meals_changed=True)
+                                            flash("✨ Meals updated successfully!")
                                             
                                             # Trigger gamification event
                                             trigger_gamification_event('meal_planned', {
@@ -2336,10 +2582,9 @@ if is_user_authenticated() and st.session_state.get('email_confirmed', False):
                                                     pantry_items_str = ", ".join(str(item) for item in used_pantry_items)
                                                     message.append(f"Used from your pantry: {pantry_items_str}")
                                                 
-                                                st.info("\n".join(message))
+                                                flash("\n".join(message), kind='info')
                                             
                                             st.session_state.active_section = None
-                                            time.sleep(2)  # Give time to read the messages
                                             st.rerun()
                                         else:
                                             st.info("No changes were needed based on your request.")
@@ -2384,9 +2629,10 @@ if is_user_authenticated() and st.session_state.get('email_confirmed', False):
                                     data={'meal_plan_meal_ids': meal_plan_meal_ids}  
                                 )
                                 if del_resp.status_code == 200:
-                                    st.success("Selected meals deleted successfully!")
+                                    get_meal_plan_week_cache().remove_meals(selected_week_start, meal_plan_meal_ids)
+                                    get_instacart_links().invalidate(meal_plan_id, meals_changed=True)
+                                    flash("Selected meals deleted successfully!")
                                     st.session_state.active_section = None
-                                    time.sleep(1)  # Give time for the success message
                                     st.rerun()
                                 else:
                                     st.error(f"Failed to delete meals. Status: {del_resp.status_code}")
@@ -2423,53 +2669,14 @@ if is_user_authenticated() and st.session_state.get('email_confirmed', False):
                             st.warning("Please select meals to generate cooking instructions")
                         else:
                             meal_plan_meal_ids = selected_data_full['Meal Plan Meal ID'].tolist()
-                            with st.spinner("Generating cooking instructions..."):
-                                try:
-                                    # Call the backend to initiate instruction generation
-                                    gen_resp = api_call_with_refresh(
-                                        url=f"{os.getenv('DJANGO_URL')}/meals/api/generate_cooking_instructions/",
-                                        method='post',
-                                        headers=headers,
-                                        data={'meal_plan_meal_ids': meal_plan_meal_ids}
-                                    )
-                                    
-                                    if gen_resp.status_code == 200:
-                                        st.success("Cooking instructions generation initiated!")
-                                        # Fetch the instructions after they're generated
-                                        fetch_resp = api_call_with_refresh(
-                                            url=f"{os.getenv('DJANGO_URL')}/meals/api/fetch_instructions/?meal_plan_meal_ids=" + ','.join(map(str, meal_plan_meal_ids)),
-                                            method='get',
-                                            headers=headers,
-                                        )
-                                        
-                                        if fetch_resp.status_code == 200:
-                                            instructions_data = fetch_resp.json()
-                                            st.session_state['instructions'] = instructions_data.get('instructions', [])
-                                            st.session_state['meal_prep_preference'] = instructions_data.get('meal_prep_preference', 'daily')
-                                            
-                                            if st.session_state['instructions']:
-                                                st.success("✅ Cooking instructions generated successfully!")
-                                                
-                                                # Trigger gamification event
-                                                trigger_gamification_event('cooking', {
-                                                    'meal_plan_id': meal_plan_id,
-                                                    'meal_count': len(meal_plan_meal_ids)
-                                                })
-                                                
-                                                st.session_state.active_section = 'cooking_instructions'
-                                                st.rerun()  # Refresh to show instructions
-                                            else:
-                                                st.info("Instructions are being generated. Please check back in a moment.")
-                                        else:
-                                            st.warning("Instructions are still being generated. Please try viewing them later.")
-                                    else:
-                                        error_data = gen_resp.json()
-                                        st.error(f"Failed to generate instructions: {error_data.get('error', 'Unknown error')}")
-                                        
-                                except Exception as e:
-                                    st.error(f"Error generating cooking instructions: {str(e)}")
-                                    logging.error(f"Error generating instructions: {str(e)}")
-                                    logging.error(traceback.format_exc())
+                            try:
+                                if start_instruction_generation(meal_plan_meal_ids, meal_plan_id, headers):
+                                    st.session_state.active_section = 'cooking_instructions'
+                                    st.rerun()  # Show instructions as they arrive
+                            except Exception as e:
+                                st.error(f"Error generating cooking instructions: {str(e)}")
+                                logging.error(f"Error generating instructions: {str(e)}")
+                                logging.error(traceback.format_exc())
 
                 with action_cols_1[1]:
                     if st.button("📝 Edit Selected Meals", use_container_width=True, disabled=is_past_week or selected_data_full.empty):
@@ -2489,63 +2696,12 @@ if is_user_authenticated() and st.session_state.get('email_confirmed', False):
                             st.rerun()
                 
                 with action_cols_2[1]:  # New column for Instacart button
-                    # Check if an Instacart URL exists for this meal plan
-                    instacart_url, has_url = check_instacart_url(meal_plan_id, headers)
-                    # Create Instacart button text with icon according to brand guidelines
-                    instacart_button_text = """<img src="https://live.staticflickr.com/65535/54538897116_fb233f397f_m.jpg" 
-                                             style="height: 22px; vertical-align: middle; margin-right: 10px;"> Get Ingredients"""
-                    
-                    button_text = "🛒 Shop Ingredients" if has_url else "🛒 Shop Ingredients"
-                    if st.button(button_text, use_container_width=True, disabled=is_past_week or not is_approved):
-                        if not is_approved:
-                            st.info("Approve your meal plan first to generate a shopping list.")
-                        elif has_url and instacart_url:
-                            # Show the Instacart button when a URL already exists
-                            st.success("Your shopping list is ready! Click the button below to shop on Instacart.")
-                            st.markdown(f'''
-                            <a href="{instacart_url}" target="_blank" style="text-decoration:none;">
-                                <div style="background-color:#FFFFFF; color:#000000; height:46px; padding:16px 18px; 
-                                border-radius:8px; display:flex; align-items:center; justify-content:center; 
-                                font-weight:500; margin-bottom:10px; font-family:sans-serif;
-                                border: 0.5px solid #E8E9EB;">
-                                    {instacart_button_text}
-                                </div>
-                            </a>''', unsafe_allow_html=True)
-                            
-                            # Add refresh button
-                            if st.button("🔄 Refresh List", key=f"refresh_instacart_{meal_plan_id}", use_container_width=True):
-                                with st.spinner("Refreshing shopping list..."):
-                                    refreshed_url = generate_instacart_link(meal_plan_id, headers, force_refresh=True)
-                                    if refreshed_url:
-                                        st.success("Shopping list refreshed successfully!")
-                                        # Replace the URL in the session state to avoid a page refresh
-                                        instacart_url = refreshed_url
-                                        st.rerun()
-                        else:
-                            # Generate a new shopping list
-                            with st.spinner("Generating shopping list. This may take a moment..."):
-                                generated_url = generate_instacart_link(meal_plan_id, headers)
-                                if generated_url:
-                                    st.success("Shopping list generated successfully!")
-                                    st.markdown(f'''
-                                    <a href="{generated_url}" target="_blank" style="text-decoration:none;">
-                                        <div style="background-color:#FFFFFF; color:#000000; height:46px; padding:16px 18px; 
-                                        border-radius:8px; display:flex; align-items:center; justify-content:center; 
-                                        font-weight:500; margin-bottom:10px; font-family:sans-serif;
-                                        border: 0.5px solid #E8E9EB;">
-                                            {instacart_button_text}
-                                        </div>
-                                    </a>''', unsafe_allow_html=True)
-                                    
-                                    # # Trigger gamification event for generating shopping list
-                                    # trigger_gamification_event('shopping_list_generated', {
-                                    #     'meal_plan_id': meal_plan_id
-                                    # })
+                    show_instacart_action(meal_plan_id, is_approved, is_past_week, headers)
 
             
                 # Restore the tabbed UI handling code
                 # Add payment tab if payment is required
-                payment_required = meal_plan_details.get('payment_required', False) 
+                payment_required = (meal_plan_details or {}).get('payment_required', False) 
                 payment_tab_name = "💳 Payment" # Define for consistency
                 
                 if payment_required:
@@ -2599,7 +2755,6 @@ if is_user_authenticated() and st.session_state.get('email_confirmed', False):
                 )
 
         else:
-            logging.error(f"Failed to fetch meal plans. Status code: {response.status_code}, Response: {response.text}")
             st.error("Error fetching meal plans.")
 
     elif is_user_authenticated() and not st.session_state.get('email_confirmed', False):
@@ -2618,9 +2773,6 @@ if st.session_state.get('return_from_payment'):
     # Clear payment transition flag if it exists
     if 'payment_transition_in_progress' in st.session_state:
         del st.session_state['payment_transition_in_progress']
-    # Rerun to clear the success message after showing it
-    time.sleep(1)
-    st.rerun()
     
 st.markdown("---")  # Add a separator
 
@@ -6,16 +6,26 @@ from utils import (
     toggle_chef_mode,
     is_user_authenticated,
     resend_activation_link,
-    footer
+    footer,
+    dj_get_many,
+    dj_request_many,
+    flash,
+    get_background_session,
+    refresh_token,
+    show_flash_messages
 )
+from pantry_utils import (
+    EXPIRING_SOON_DAYS, IMPORT_MAX_WORKERS, PANTRY_ITEMS_PATH, PANTRY_PAGE_SIZE, PantryCache, expiration_badge, page_pantry,
+    pantry_change_errors, pantry_change_requests, pantry_changes_from_delta, pantry_page_items, pantry_page_paths,
+    pantry_import_errors, pantry_import_rows, pantry_payload, pantry_rows, query_pantry, read_pantry_import
+)
+from voice_capture_queue import VoiceCaptureQueue
+from concurrent.futures import ThreadPoolExecutor
 import os
 from dotenv import load_dotenv
-from datetime import datetime as dt, date
+from datetime import date, timedelta
 import logging
-import math
-import json
 import sys
-import tempfile
 
 # Load environment variables
 load_dotenv()
@@ -30,161 +40,186 @@ logging.basicConfig(
     ]
 )
 
-def parse_expiration_date(date_str):
-    try:
-        return dt.strptime(date_str, '%Y-%m-%d').date()
-    except (ValueError, TypeError):
-        logging.warning(f"Invalid date format: {date_str}")
-        return None
+PANTRY_SORT_OPTIONS = ['Item Name', 'Expiration Date', 'Quantity', 'Item Type']
+VOICE_UPLOAD_WORKERS = 4
+VOICE_POLL_SECONDS = 2
 
-def process_changes(original_df, edited_df):
-    """
-    Merge 'ID' from original_df onto edited_df by matching row index,
-    then handle updates & deletions.
+@st.cache_resource
+def get_voice_upload_executor() -> ThreadPoolExecutor:
+    """Return the process-wide pool for voice uploads, kept apart from the shared background pool."""
+    return ThreadPoolExecutor(max_workers=VOICE_UPLOAD_WORKERS, thread_name_prefix="sautai-voice")
 
-    original_df:  columns ['ID', 'Item Name', ..., 'Delete']
-    edited_df:    columns ['Item Name', ..., 'Delete'] (missing ID)
+def get_pantry_cache() -> PantryCache:
+    """Return this session's cache of the user's whole pantry."""
+    if 'pantry_cache' not in st.session_state:
+        st.session_state['pantry_cache'] = PantryCache()
+    return st.session_state['pantry_cache']
+
+def load_pantry(headers):
     """
-    # 1) Reattach ID
-    merged_df = edited_df.copy()
-    merged_df['ID'] = original_df['ID'].astype(int).values  # ensure int, not float
-    
-    # 2) Find items with Delete == True
-    rows_for_deletion = merged_df[merged_df['Delete'] == True]
-    delete_ids = set(rows_for_deletion['ID'])
-    
-    # 3) For updates
-    for idx in merged_df.index:
-        if merged_df.at[idx, 'Delete'] is True:
-            # skip deleting here, handle after
-            continue
-        
-        row_id = merged_df.at[idx, 'ID']
-        # Check if row_id is in original_df
-        original_rows = original_df[original_df['ID'] == row_id]
-        if original_rows.empty:
-            # No match in original, skip or log an error
-            logging.warning(f"Row with ID={row_id} not found in original for update. Skipping.")
-            continue
-        
-        original_row = original_rows.iloc[0]
-        edited_row = merged_df.loc[idx]
+    Return the whole pantry as an Arrow table, from the session cache when possible.
 
-        # Drop the ID/Delete columns for comparison
-        original_comp = original_row.drop(['ID','Delete'], errors='ignore')
-        edited_comp = edited_row.drop(['ID','Delete'], errors='ignore')
-        
-        if not original_comp.equals(edited_comp):
-            # Something changed
-            update_pantry_item(edited_row)
-    
-    # 4) Now do the deletions
-    for row_id in delete_ids:
-        # Retrieve from original df
-        orig_rows = original_df[original_df['ID'] == row_id]
-        if orig_rows.empty:
-            logging.warning(f"Row with ID={row_id} not found in original for deletion. Possibly already deleted.")
-            continue
-        
-        original_row = orig_rows.iloc[0]
-        delete_pantry_item(original_row)
+    On a miss the first page is fetched to learn the page count and the
+    remaining pages are fetched concurrently.
 
-def validate_new_row(row):
-    required_fields = ['Item Name', 'Quantity']
-    for field in required_fields:
-        if pd.isnull(row[field]) or row[field] == '':
-            return False
-    return True
+    Returns:
+        (table or None, the failed response or None)
+    """
+    cache = get_pantry_cache()
+    table = cache.get()
+    if table is not None:
+        return table, None
+
+    response = api_call_with_refresh(
+        url=f'{os.getenv("DJANGO_URL")}{PANTRY_ITEMS_PATH}?page=1',
+        method='get',
+        headers=headers,
+    )
+    if not response or response.status_code != 200:
+        return None, response
+    first_page = response.json()
+    items = list(pantry_page_items(first_page))
+    paths = pantry_page_paths(first_page)
+    responses = dj_get_many(paths, headers=headers)
+    for path in paths:
+        page_response = responses.get(path)
+        if not page_response or page_response.status_code != 200:
+            # Never cache a partial pantry
+            return None, page_response
+        items.extend(pantry_page_items(page_response.json()))
+    logging.info(f"Loaded {len(items)} pantry items from {len(paths) + 1} pages")
+    return cache.put(items), None
+
+def show_expiring_items(pantry_table, today):
+    """Show the items that are expired or expire within EXPIRING_SOON_DAYS."""
+    expirations = get_pantry_cache().expirations()
+    if not expirations:
+        return
+    item_ids = expirations.expiring_by(today + timedelta(days=EXPIRING_SOON_DAYS))
+    if not item_ids:
+        return
+    expired = expirations.count_by(today - timedelta(days=1))
+    label = f"⏰ {len(item_ids) - expired} expiring within {EXPIRING_SOON_DAYS} days"
+    if expired:
+        label += f", {expired} expired"
+    with st.expander(label, expanded=True):
+        for row in pantry_rows(pantry_table, item_ids):
+            st.markdown(
+                f"{expiration_badge(row['Expiration Date'], today)} · **{row['Item Name']}** "
+                f"× {row['Quantity']} (expires {row['Expiration Date'].isoformat()})"
+            )
+
+def cache_pantry_item(item):
+    """Add a newly created pantry item to the cache, or drop the cache if that is not possible."""
+    if not get_pantry_cache().upsert([item] if isinstance(item, dict) else []):
+        get_pantry_cache().invalidate()
+
+def process_changes(records, editor_state):
+    """
+    Send the edits made in the data editor to the backend.
 
-def update_pantry_item(row):
-    updated_data = row.to_dict()
-    tags_str = updated_data['Tags'] if 'Tags' in updated_data else ''
-    tags_list = [tag.strip() for tag in tags_str.split(',') if tag.strip()]
-
-    # Build the payload
-    payload = {
-        'item_name': updated_data['Item Name'],
-        'quantity': int(updated_data['Quantity']),
-        'expiration_date': updated_data['Expiration Date'].isoformat() if pd.notnull(updated_data['Expiration Date']) else None,
-        'item_type': updated_data['Item Type'],
-        'notes': updated_data['Notes'] if pd.notnull(updated_data['Notes']) else '',
-        'tags': tags_list
-    }
-    if 'Weight Per Unit' in updated_data and not pd.isnull(updated_data['Weight Per Unit']):
-        payload['weight_per_unit'] = float(updated_data['Weight Per Unit'])
-    if 'Weight Unit' in updated_data and updated_data['Weight Unit']:
-        payload['weight_unit'] = updated_data['Weight Unit']
-
-    item_id = updated_data['ID']
-    data_json = json.dumps(payload)
-    headers = {'Authorization': f'Bearer {st.session_state.user_info["access"]}'}
+    The change set comes from the editor's own edited/added/deleted row
+    state, so only touched rows are processed. The pantry API has no bulk
+    endpoint; the changes are sent concurrently.
 
-    try:
-        resp = api_call_with_refresh(
-            url=f'{os.getenv("DJANGO_URL")}/meals/api/pantry-items/{item_id}/',
-            method='put',
-            headers=headers,
-            data=data_json
-        )
-        if resp is None:
-            st.error("Failed to update pantry item. Please log in again.")
-            return
-        if resp.status_code == 200:
-            logging.info(f"Updated pantry item '{payload['item_name']}' successfully.")
-        else:
-            st.error(f"Failed to update item: {resp.json()}")
-            logging.error(f"Failed to update item: {resp.json()}")
-    except Exception as e:
-        logging.error(f"Error updating pantry item: {e}")
-        st.error("An error occurred while updating the pantry item. Please try again.")
+    Returns:
+        (number of changes sent, list of error messages)
+    """
+    changes = pantry_changes_from_delta(records, editor_state)
+    errors = list(changes['invalid'])
+    calls = pantry_change_requests(changes)
+    if not calls:
+        return 0, errors
 
-def delete_pantry_item(row):
-    item_id = row['ID']
     headers = {'Authorization': f'Bearer {st.session_state.user_info["access"]}'}
+    responses = dj_request_many(calls, headers=headers)
+    errors += pantry_change_errors(changes, responses)
+    if not get_pantry_cache().apply_changes(changes, responses):
+        get_pantry_cache().invalidate()
+    for error in errors:
+        logging.error(error)
+    logging.info(
+        f"Pantry changes submitted: {len(changes['adds'])} added, {len(changes['updates'])} updated, "
+        f"{len(changes['deletes'])} deleted, {len(errors)} failed"
+    )
+    return len(calls), errors
+
+def import_pantry_file(upload, headers):
+    """
+    Import pantry items from an uploaded CSV or Excel file.
 
+    Rows are parsed and validated a chunk at a time, and each chunk's valid
+    rows are posted concurrently before the next chunk is read.
+
+    Returns:
+        (number of items added, list of per-row error messages)
+    """
+    progress = st.progress(0.0, text="Reading file...")
+    added, errors, rows_seen = 0, [], 0
     try:
-        resp = api_call_with_refresh(
-            url=f'{os.getenv("DJANGO_URL")}/meals/api/pantry-items/{item_id}/',
-            method='delete',
-            headers=headers
+        for chunk, fraction in read_pantry_import(upload, upload.name):
+            # Row 1 holds the headers
+            adds, row_errors = pantry_import_rows(chunk, first_row=rows_seen + 2)
+            rows_seen += len(chunk)
+            errors += row_errors
+            changes = {'adds': adds, 'updates': [], 'deletes': []}
+            responses = dj_request_many(pantry_change_requests(changes), headers=headers, max_workers=IMPORT_MAX_WORKERS)
+            errors += pantry_import_errors(adds, responses)
+            created = []
+            for response in responses.values():
+                if response is not None and response.status_code in (201, 200):
+                    try:
+                        created.append(response.json())
+                    except ValueError:
+                        created.append(None)
+            added += len(created)
+            if None in created or not get_pantry_cache().upsert(created):
+                get_pantry_cache().invalidate()
+            progress.progress(fraction, text=f"Processed {rows_seen} rows, added {added} items")
+    except (ValueError, UnicodeDecodeError) as e:
+        errors.append(f"Could not read the file: {e}")
+    progress.empty()
+    logging.info(f"Pantry import of {upload.name}: {rows_seen} rows, {added} added, {len(errors)} errors")
+    return added, errors
+
+def show_pantry_import(headers):
+    """Bulk import form; the results of the last import are kept until the next one."""
+    if 'pantry_import_version' not in st.session_state:
+        st.session_state.pantry_import_version = 0
+    with st.expander("📥 Import from CSV or Excel"):
+        st.markdown(
+            "The first row must name the columns. **Item Name** and **Quantity** are required; "
+            "Expiration Date, Item Type (Canned or Dry), Weight Per Unit, Weight Unit, Notes and Tags are optional."
         )
-        if resp is None:
-            st.error("Failed to delete pantry item. Please log in again.")
-            return
-        if resp.status_code == 204:
-            logging.info(f"Deleted pantry item '{row['Item Name']}' successfully.")
-            st.success(f"Deleted '{row['Item Name']}'")
-        else:
-            st.error(f"Failed to delete item: {resp.json()}")
-            logging.error(f"Failed to delete item: {resp.json()}")
-    except Exception as e:
-        logging.error(f"Error deleting pantry item: {e}")
-        st.error("An error occurred while deleting the pantry item. Please try again.")
+        upload = st.file_uploader(
+            "Pantry file",
+            type=["csv", "xlsx"],
+            key=f"pantry_import_file_{st.session_state.pantry_import_version}",
+        )
+        if upload is not None and st.button("Import Items", key="pantry_import_button", type="primary"):
+            added, errors = import_pantry_file(upload, headers)
+            st.session_state['pantry_import_result'] = {'added': added, 'errors': errors}
+            # Reset the uploader so the same file is not imported twice
+            st.session_state.pantry_import_version += 1
+
+        result = st.session_state.get('pantry_import_result')
+        if result:
+            st.success(f"Added {result['added']} items to your pantry.")
+            if result['errors']:
+                st.warning(f"{len(result['errors'])} rows were not imported:")
+                st.markdown("\n".join(f"- {error}" for error in result['errors'][:50]))
+                if len(result['errors']) > 50:
+                    st.caption(f"...and {len(result['errors']) - 50} more")
 
-    # If successful
-    st.success(f"Deleted '{row['Item Name']}'")
-    logging.info(f"Deleted item ID={item_id} successfully.")
+def validate_new_row(row):
+    required_fields = ['Item Name', 'Quantity']
+    for field in required_fields:
+        if pd.isnull(row[field]) or row[field] == '':
+            return False
+    return True
 
 def add_pantry_item(row):
-    tags_str = row.get('Tags', '')
-    tags_list = [tag.strip() for tag in tags_str.split(',') if tag.strip()]
-
-    payload = {
-        'item_name': row['Item Name'],
-        'quantity': int(row['Quantity']),
-        'expiration_date': row['Expiration Date'].isoformat() if pd.notnull(row['Expiration Date']) else None,
-        'item_type': row['Item Type'] if pd.notnull(row['Item Type']) else '',
-        'notes': row['Notes'] if pd.notnull(row['Notes']) else '',
-        'tags': tags_list
-    }
-    if 'Weight Per Unit' in row and not pd.isnull(row['Weight Per Unit']):
-        payload['weight_per_unit'] = float(row['Weight Per Unit'])
-    WEIGHT_UNIT_FIELD = 'Weight Unit'  # how your DataFrame references it
-    if WEIGHT_UNIT_FIELD in row and row[WEIGHT_UNIT_FIELD]:
-        payload['weight_unit'] = row[WEIGHT_UNIT_FIELD]
-
-    
-    data_json = json.dumps(payload)
+    payload = pantry_payload(row.to_dict())
     headers = {'Authorization': f'Bearer {st.session_state.user_info["access"]}'}
 
     try:
@@ -192,12 +227,13 @@ def add_pantry_item(row):
             url=f'{os.getenv("DJANGO_URL")}/meals/api/pantry-items/',
             method='post',
             headers=headers,
-            data=data_json
+            data=payload
         )
         if resp is None:
             st.error("Failed to add pantry item. Please log in again.")
             return
         if resp.status_code == 201:
+            cache_pantry_item(resp.json())
             logging.info(f"Pantry item '{row['Item Name']}' added successfully.")
         else:
             st.error(f"Failed to add item: {resp.json()}")
@@ -206,8 +242,88 @@ def add_pantry_item(row):
         logging.error(f"Error adding pantry item: {e}")
         st.error("An error occurred while adding the pantry item. Please try again.")
 
+def get_voice_capture_queue() -> VoiceCaptureQueue:
+    """Return this session's queue of voice recordings."""
+    if 'voice_capture_queue' not in st.session_state:
+        st.session_state['voice_capture_queue'] = VoiceCaptureQueue()
+    return st.session_state['voice_capture_queue']
+
+def process_voice_uploads():
+    """
+    Collect finished voice uploads and start queued ones.
+
+    Returns:
+        True while recordings are still queued or uploading
+    """
+    queue = get_voice_capture_queue()
+    outcome = queue.collect()
+    for job in outcome['finished']:
+        if job['status'] == 'done':
+            cache_pantry_item(job['result'].get('pantry_item'))
+    if outcome['auth_expired']:
+        new_tokens = refresh_token(st.session_state.user_info["refresh"])
+        if new_tokens:
+            st.session_state.user_info.update(new_tokens)
+        else:
+            queue.fail_queued("Session expired. Please log in again.")
+    headers = {'Authorization': f'Bearer {st.session_state.user_info["access"]}'}
+    queue.start_uploads(get_voice_upload_executor(), get_background_session(), os.getenv("DJANGO_URL"), headers)
+    return queue.busy()
+
+def show_voice_job(job):
+    """Show the state or result of one queued recording."""
+    if job['status'] == 'queued':
+        st.info(f"Recording {job['id']}: waiting to upload", icon="⏳")
+    elif job['status'] == 'uploading':
+        st.info(f"Recording {job['id']}: transcribing...", icon="🎙️")
+    elif job['status'] == 'failed':
+        st.error(f"Recording {job['id']}: {job['error']}")
+    else:
+        result = job['result']
+        pantry_item = result['pantry_item']
+        st.success(f"Recording {job['id']}: added '{pantry_item['item_name']}' to your pantry!")
+        with st.expander("Details"):
+            st.markdown(f"**Transcription:** {result.get('transcription', '')}")
+
+            # Format expiration date for display
+            expiration = pantry_item.get('expiration_date') or 'Not specified'
+
+            # Display item details in a table format
+            st.markdown(f"""
+            | Property | Value |
+            | --- | --- |
+            | Item | **{pantry_item['item_name']}** |
+            | Quantity | {pantry_item['quantity']} |
+            | Type | {pantry_item['item_type']} |
+            | Expiration | {expiration} |
+            """)
+
+            if pantry_item.get('notes'):
+                st.markdown(f"**Notes:** {pantry_item['notes']}")
+
+def show_voice_results():
+    """Voice upload results; they refresh in place while recordings are uploading."""
+    polling = get_voice_capture_queue().busy()
+    st.session_state['voice_polling'] = polling
+    st.fragment(run_every=VOICE_POLL_SECONDS if polling else None)(_voice_results)()
+
+def _voice_results():
+    if not process_voice_uploads() and st.session_state.get('voice_polling'):
+        # Every recording is processed; rerun the page once to stop polling and show the new items
+        st.session_state['voice_polling'] = False
+        st.rerun()
+    jobs = get_voice_capture_queue().jobs()
+    if not jobs:
+        return
+    for job in reversed(jobs):
+        show_voice_job(job)
+    if any(job['status'] in ('done', 'failed') for job in jobs):
+        if st.button("Clear finished", key="clear_voice_results"):
+            get_voice_capture_queue().clear_finished()
+            st.rerun()
+
 def voice_input_tab():
-    """Direct implementation of voice input functionality for adding pantry items."""
+    """Voice input for adding pantry items; recordings are queued and uploaded in the background."""
     st.subheader("Add Pantry Item with Voice", anchor=False)
     
     # Expandable section with instructions
@@ -222,101 +338,25 @@ def voice_input_tab():
           - Type ("canned" or "dry goods")
         - Optional: Add any special notes
         - Keep recordings brief (under 15-20 seconds) for best results
+        - Record one item per recording; you can record the next item right away
         
         **Example:** "Two cans of organic black beans, expires January 15th, 2025. Canned goods."
         """)
     
-    # Audio input widget
-    audio_data = st.audio_input("Record your pantry item description", key="pantry_voice_input")
-    
+    # Each recording is queued as soon as it is captured, then the widget is reset for the next one
+    if 'pantry_voice_version' not in st.session_state:
+        st.session_state.pantry_voice_version = 0
+    audio_data = st.audio_input(
+        "Record your pantry item description",
+        key=f"pantry_voice_input_{st.session_state.pantry_voice_version}",
+    )
     if audio_data:
-        # Display the recorded audio
-        st.audio(audio_data, format="audio/wav")
-        
-        # Display file size information
-        audio_size = len(audio_data.getvalue())
-        audio_size_mb = audio_size / (1024 * 1024)  # Convert to MB for display
-        st.info(f"Audio recording size: {audio_size_mb:.2f} MB")
-        
-        # Button to process the audio
-        if st.button("Add to Pantry", key="process_voice_btn", type="primary"):
-            with st.spinner("Processing your audio..."):
-                try:
-                    # Save the audio data to a temporary file
-                    with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as temp_audio:
-                        temp_audio.write(audio_data.getvalue())
-                        temp_audio_path = temp_audio.name
-                    
-                    # Send the audio file to the backend API
-                    with open(temp_audio_path, 'rb') as audio_file:
-                        headers = {'Authorization': f'Bearer {st.session_state.user_info["access"]}'}
-                        files = {'audio_file': audio_file}
-                        
-                        response = api_call_with_refresh(
-                            url=f'{os.getenv("DJANGO_URL")}/meals/api/pantry-items/from-audio/',
-                            method='post',
-                            headers=headers,
-                            files=files
-                        )
-                    
-                    # Clean up the temporary file
-                    os.unlink(temp_audio_path)
-                    
-                    # Process the response
-                    if response and response.status_code == 201:
-                        result = response.json()
-                        
-                        # Display the results in a success message
-                        st.success(f"Added '{result['pantry_item']['item_name']}' to your pantry!")
-                        
-                        # Create tabs to show details
-                        transcription_tab, details_tab = st.tabs(["What I Heard", "Item Details"])
-                        
-                        with transcription_tab:
-                            st.markdown(f"**Transcription:** {result['transcription']}")
-                        
-                        with details_tab:
-                            pantry_item = result['pantry_item']
-                            
-                            # Format expiration date for display
-                            expiration = pantry_item.get('expiration_date', 'Not specified')
-                            if expiration is None:
-                                expiration = 'Not specified'
-                            
-                            # Display item details in a table format
-                            st.markdown(f"""
-                            | Property | Value |
-                            | --- | --- |
-                            | Item | **{pantry_item['item_name']}** |
-                            | Quantity | {pantry_item['quantity']} |
-                            | Type | {pantry_item['item_type']} |
-                            | Expiration | {expiration} |
-                            """)
-                            
-                            if pantry_item.get('notes'):
-                                st.markdown(f"**Notes:** {pantry_item['notes']}")
-                            
-                        # Add a refresh button to clear and prepare for another entry
-                        if st.button("Add Another Item", key="add_another_voice"):
-                            st.rerun()
-                    
-                    else:
-                        # Handle errors from the API
-                        error_message = "An error occurred while processing your audio."
-                        if response:
-                            try:
-                                error_data = response.json()
-                                error_details = error_data.get('details', '')
-                                error_message = f"{error_data.get('error', 'Error')}: {error_details}"
-                            except:
-                                error_message = f"Error: HTTP {response.status_code}"
-                        
-                        st.error(error_message)
-                        logging.error(f"Voice pantry item error: {error_message}")
-                
-                except Exception as e:
-                    st.error(f"Error processing audio: {str(e)}")
-                    logging.error(f"Exception in voice pantry processing: {str(e)}")
+        get_voice_capture_queue().enqueue(audio_data.getvalue())
+        st.session_state.pantry_voice_version += 1
+        process_voice_uploads()
+        st.rerun()
+
+    show_voice_results()
 
 # Main content - moved from pantry_page() to top level
 # Initialize session state for form visibility
@@ -348,6 +388,7 @@ try:
     if is_user_authenticated() and st.session_state.get('email_confirmed', False):
         if 'current_role' in st.session_state and st.session_state['current_role'] != 'chef':
             st.title("Your Pantry")
+            show_flash_messages()
             st.markdown("""
             ### Welcome to Your Pantry
             Keep track of your pantry items to minimize waste and maximize value. The **sautAI Pantry** helps you:
@@ -371,45 +412,56 @@ try:
                     st.session_state.pantry_page_number = 1
 
                 headers = {'Authorization': f'Bearer {st.session_state.user_info["access"]}'}
-                response = api_call_with_refresh(
-                    url=f'{os.getenv("DJANGO_URL")}/meals/api/pantry-items/?page={st.session_state.pantry_page_number}',
-                    method='get',
-                    headers=headers,
-                )
-
-                if response and response.status_code == 200:
-                    pantry_data = response.json()
-                    pantry_items = pantry_data.get('results', [])
-                    pantry_records = []
-
-                    for item in pantry_items:
-                        # Build each row with the fields you want to display/edit
-                        pantry_records.append({
-                            'ID': int(item['id']),
-                            'Item Name': item['item_name'],
-                            'Quantity': item['quantity'],
-                            'Weight Per Unit': item.get('weight_per_unit', None),
-                            'Weight Unit': item.get('weight_unit', ''),
-                            'Expiration Date': parse_expiration_date(item['expiration_date']),
-                            'Item Type': item['item_type'],
-                            'Notes': item['notes'],
-                            'Tags': ', '.join(item.get('tags', [])),
-                        })
-
-                    if not pantry_records:
+                show_pantry_import(headers)
+                pantry_table, response = load_pantry(headers)
+                pantry_items = pantry_table is not None and pantry_table.num_rows > 0
+
+                if pantry_table is not None:
+                    if not pantry_items:
                         st.info("No pantry items found.")
                     else:
-                        pantry_df = pd.DataFrame(pantry_records)
-                        pantry_df['Delete'] = False
+                        today = date.today()
+                        show_expiring_items(pantry_table, today)
+
+                        # Search, filter, sort and paging run on the cached table
+                        col_search, col_type, col_sort, col_order, col_refresh = st.columns([3, 2, 2, 1, 1])
+                        with col_search:
+                            search = st.text_input("Search", key='pantry_search', placeholder="Name, notes or tags")
+                        with col_type:
+                            item_type = st.selectbox("Item Type", options=['All', 'Canned', 'Dry'], key='pantry_type_filter')
+                        with col_sort:
+                            sort_by = st.selectbox("Sort by", options=PANTRY_SORT_OPTIONS, key='pantry_sort_by')
+                        with col_order:
+                            descending = st.toggle("Desc", key='pantry_sort_desc')
+                        with col_refresh:
+                            if st.button("Refresh", key='pantry_refresh'):
+                                get_pantry_cache().invalidate()
+                                st.session_state.pantry_editor_version = st.session_state.get('pantry_editor_version', 0) + 1
+                                st.rerun()
 
-                        # Store original for comparison later
-                        st.session_state['original_pantry_df'] = pantry_df.copy()
+                        view = query_pantry(
+                            pantry_table,
+                            search=search,
+                            item_type=None if item_type == 'All' else item_type,
+                            sort_by=sort_by,
+                            descending=descending,
+                        )
+                        page = page_pantry(view, st.session_state.pantry_page_number, PANTRY_PAGE_SIZE)
+                        st.session_state.pantry_page_number = page['page']
+                        pantry_records = page['records']
 
                         # Hide the ID column from display
-                        display_df = pantry_df.drop(columns=['ID'])
-
-                        # Show data_editor with custom columns
-                        edited_df = st.data_editor(
+                        display_df = pd.DataFrame(pantry_records, columns=list(pantry_table.column_names)).drop(columns=['ID'])
+                        display_df['Expires'] = [expiration_badge(record['Expiration Date'], today) for record in pantry_records]
+                        display_df['Delete'] = False
+
+                        # Edits are read back from the widget's delta state, not by diffing frames.
+                        # Its row positions refer to the page shown, so each view gets its own editor.
+                        if 'pantry_editor_version' not in st.session_state:
+                            st.session_state.pantry_editor_version = 0
+                        view_id = abs(hash((search, item_type, sort_by, descending, page['page'])))
+                        editor_key = f'pantry_data_editor_{st.session_state.pantry_editor_version}_{view_id}'
+                        st.data_editor(
                             display_df,
                             use_container_width=True,
                             hide_index=True,
@@ -435,44 +487,47 @@ try:
                                 ),
                                 'Notes': st.column_config.TextColumn('Notes'),
                                 'Tags': st.column_config.TextColumn('Tags'),
+                                'Expires': st.column_config.TextColumn('Expires', disabled=True),
                                 'Delete': st.column_config.CheckboxColumn('Delete', default=False),
                             },
                             num_rows="dynamic",
-                            key='pantry_data_editor',
+                            key=editor_key,
                         )
 
-                        st.session_state['edited_pantry_df'] = edited_df
-
                         # Buttons for submission & cancellation
                         col1, col2 = st.columns(2)
                         with col1:
                             if st.button('Submit Changes', key='submit_changes_button'):
-                                process_changes(
-                                    original_df=st.session_state['original_pantry_df'],
-                                    edited_df=st.session_state['edited_pantry_df']
-                                )
-                                st.success("Changes submitted successfully!")
-                                st.rerun()
+                                submitted, errors = process_changes(pantry_records, st.session_state.get(editor_key, {}))
+                                if submitted:
+                                    for error in errors:
+                                        flash(error, kind='error')
+                                    if not errors:
+                                        flash("Changes submitted successfully!")
+                                    # Sent changes are applied; start over from the updated pantry
+                                    st.session_state.pantry_editor_version += 1
+                                    st.rerun()
+                                for error in errors:
+                                    st.error(error)
                         with col2:
                             if st.button('Cancel Changes', key='cancel_changes_button'):
-                                st.session_state['edited_pantry_df'] = st.session_state['original_pantry_df']
-                                st.warning("Changes have been discarded.")
+                                st.session_state.pantry_editor_version += 1
+                                flash("Changes have been discarded.", kind='warning')
+                                st.rerun()
+
+                        # Pagination Controls
+                        st.markdown("---")
+                        col_prev, col_info, col_next = st.columns([1, 2, 1])
+                        with col_prev:
+                            if st.button('Previous Page', key='previous_page_button') and page['page'] > 1:
+                                st.session_state.pantry_page_number -= 1
+                                st.rerun()
+                        with col_next:
+                            if st.button('Next Page', key='next_page_button') and page['page'] < page['total_pages']:
+                                st.session_state.pantry_page_number += 1
                                 st.rerun()
 
-                    # Pagination Controls
-                    st.markdown("---")
-                    col_prev, col_info, col_next = st.columns([1, 2, 1])
-                    with col_prev:
-                        if st.button('Previous Page', key='previous_page_button') and pantry_data.get('previous'):
-                            st.session_state.pantry_page_number -= 1
-                            st.rerun()
-                    with col_next:
-                        if st.button('Next Page', key='next_page_button') and pantry_data.get('next'):
-                            st.session_state.pantry_page_number += 1
-                            st.rerun()
-
-                    total_pages = math.ceil(pantry_data.get('count', 0) / 10)
-                    st.write(f"Page {st.session_state.pantry_page_number} of {total_pages}")
+                        st.write(f"Page {page['page']} of {page['total_pages']} ({page['count']} items)")
 
                 elif response and response.status_code == 401:
                     st.error("Unauthorized access. Please log in again.")
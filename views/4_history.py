@@ -5,8 +5,10 @@ from dotenv import load_dotenv
 load_dotenv()
 import os
 from utils import api_call_with_refresh, login_form, toggle_chef_mode, resend_activation_link
+from history_search import HistorySearchIndex, resume_id_for
 from datetime import datetime
 import logging
+import time
 
 # Configure logging
 logging.basicConfig(level=logging.WARNING,
@@ -15,19 +17,39 @@ logging.basicConfig(level=logging.WARNING,
                     filemode='w') # 'w' to overwrite the log file on each run, 'a' to append
 
 
-def thread_detail(thread_id):
+# Minimum seconds between automatic syncs of the search index
+HISTORY_INDEX_SYNC_INTERVAL = 60
+# Maximum seconds between automatic full syncs; incremental syncs stop at the
+# first unchanged page and miss new replies in older threads beyond it
+HISTORY_INDEX_FULL_SYNC_INTERVAL = 10 * 60
+
+
+@st.cache_resource
+def get_history_index():
+    """Return the process-wide chat history search index."""
+    return HistorySearchIndex()
+
+
+def fetch_thread_messages(thread_id):
+    """Fetch a thread's messages sorted by creation time, or None on failure."""
     headers = {'Authorization': f'Bearer {st.session_state.user_info["access"]}'}
     response = api_call_with_refresh(
         url=f'{os.getenv("DJANGO_URL")}/customer_dashboard/api/thread_detail/{thread_id}/',
         method='get',
         headers=headers
     )
-    if response.status_code == 200:
+    if response and response.status_code == 200:
         chat_history = response.json().get('chat_history', [])
-        
+
         # Sort chat_history by 'created_at' key
         chat_history.sort(key=lambda x: x['created_at'])
+        return chat_history
+    return None
+
 
+def thread_detail(thread_id):
+    chat_history = fetch_thread_messages(thread_id)
+    if chat_history is not None:
         for msg in chat_history:
             with st.chat_message(msg['role']):
                 st.markdown(msg['content'])
@@ -35,6 +57,116 @@ def thread_detail(thread_id):
         st.error("Error fetching thread details.")
 
 
+def sync_history_index(full=False):
+    """
+    Bring the search index up to date with the backend's thread history.
+
+    Pages through thread_history newest first and only fetches thread_detail for
+    threads that are new or have new responses. Unless a full sync is requested,
+    paging stops at the first page without any changes, so a full sync is
+    forced every HISTORY_INDEX_FULL_SYNC_INTERVAL seconds.
+    """
+    now = time.time()
+    full = full or now - st.session_state.get('history_index_full_synced_at', 0) > HISTORY_INDEX_FULL_SYNC_INTERVAL
+    user_key = f"user:{st.session_state['user_id']}"
+    index = get_history_index()
+    known = index.known_threads(user_key)
+    headers = {'Authorization': f'Bearer {st.session_state.user_info["access"]}'}
+
+    page = 1
+    reached_end = False
+    while True:
+        response = api_call_with_refresh(
+            url=f'{os.getenv("DJANGO_URL")}/customer_dashboard/api/thread_history/?page={page}',
+            method='get',
+            headers=headers
+        )
+        if not response or response.status_code != 200:
+            logging.error(f"History index sync stopped at page {page}")
+            break
+
+        history_page = response.json()
+        page_changed = False
+        for thread in history_page.get('results', []):
+            stored = known.get(str(thread['id']))
+            if stored and stored['resume_id'] == resume_id_for(thread):
+                continue
+            page_changed = True
+            messages = fetch_thread_messages(thread['id'])
+            if messages is None:
+                # Leave the stored resume_id alone so the thread is retried on the next sync
+                logging.warning(f"Could not fetch thread {thread['id']} for the search index")
+                continue
+            index.index_thread(user_key, thread, messages)
+
+        if not history_page.get('next'):
+            reached_end = True
+            break
+        if not page_changed and not full:
+            break
+        page += 1
+
+    st.session_state['history_index_synced_at'] = now
+    if full and reached_end:
+        st.session_state['history_index_full_synced_at'] = now
+
+
+def open_thread(resp_id):
+    """Continue a thread on the assistant page."""
+    if resp_id:
+        st.session_state.selected_thread_id = resp_id
+        st.switch_page("views/1_assistant.py")
+    else:
+        st.warning("This thread has no response IDs yet; please send a new message to start it.")
+
+
+def format_thread_date(created_at):
+    """Format a thread timestamp for display."""
+    try:
+        return datetime.strptime(created_at, "%Y-%m-%dT%H:%M:%S.%fZ").strftime("%B %d, %Y - %H:%M:%S")
+    except (TypeError, ValueError):
+        return created_at or ""
+
+
+def show_history_search():
+    """Search box with ranked results over the user's indexed chat history."""
+    search_cols = st.columns([4, 1])
+    with search_cols[0]:
+        search_query = st.text_input(
+            "Search your conversations",
+            key='history_search_query',
+            placeholder="e.g. lentil curry, grocery budget, meal prep"
+        )
+    with search_cols[1]:
+        rebuild = st.button("Refresh search index", key='refresh_history_index', use_container_width=True)
+
+    if rebuild:
+        with st.spinner("Indexing your chat history..."):
+            sync_history_index(full=True)
+
+    if not search_query.strip():
+        return
+
+    last_sync = st.session_state.get('history_index_synced_at', 0)
+    if time.time() - last_sync > HISTORY_INDEX_SYNC_INTERVAL:
+        with st.spinner("Indexing new conversations..."):
+            sync_history_index()
+
+    user_key = f"user:{st.session_state['user_id']}"
+    results = get_history_index().search(user_key, search_query)
+    if not results:
+        st.info("No conversations match your search.")
+    else:
+        st.write(f"{len(results)} matching conversation{'s' if len(results) != 1 else ''}:")
+        for result in results:
+            st.write(format_thread_date(result['created_at']))
+            if st.button(result['title'] or "Untitled conversation", key=f"search_result_{result['thread_id']}"):
+                open_thread(result['resume_id'])
+            if result['snippet']:
+                st.caption(result['snippet'])
+    st.divider()
+
+
 # Content moved from main() to top level
 # Login Form
 if 'is_logged_in' not in st.session_state or not st.session_state['is_logged_in']:
@@ -65,6 +197,8 @@ if 'current_role' in st.session_state and st.session_state['current_role'] != 'c
                 if st.button("Resend Activation Link"):
                     resend_activation_link(st.session_state['user_id'])
                 st.stop()
+            show_history_search()
+
             # Initialize or update current page in session state
             current_page = st.session_state.get('current_page', 1)
         
@@ -104,33 +238,11 @@ if 'current_role' in st.session_state and st.session_state['current_role'] != 'c
 
                 # Displaying each chat thread
                 for thread in chat_threads:
-                    # Parse the date string into a datetime object
-                    created_at = datetime.strptime(thread['created_at'], "%Y-%m-%dT%H:%M:%S.%fZ")
-
-                    # Format the datetime object into a string
-                    formatted_date = created_at.strftime("%B %d, %Y - %H:%M:%S")
-
-                    st.write(formatted_date)
-
+                    st.write(format_thread_date(thread['created_at']))
 
                     # Button to continue the conversation on the assistant page
                     if st.button(thread['title'], key=thread['id']):
-                        # Extract the response ID properly depending on the format
-                        resp_id = None
-                        # Check if openai_thread_id is a string or list
-                        thread_ids = thread.get('openai_thread_id', [])
-                        
-                        if isinstance(thread_ids, list) and thread_ids:
-                            # Use the most recent (last) ID in the list
-                            resp_id = thread_ids[-1]
-                        elif thread_ids:  # If it's a string
-                            resp_id = thread_ids
-                            
-                        if resp_id:
-                            st.session_state.selected_thread_id = resp_id
-                            st.switch_page("views/1_assistant.py")
-                        else:
-                            st.warning("This thread has no response IDs yet; please send a new message to start it.")
+                        open_thread(resume_id_for(thread))
 
                     st.divider()
             else:
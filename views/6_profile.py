@@ -6,7 +6,7 @@ import datetime
 import logging
 from utils import (api_call_with_refresh, is_user_authenticated, login_form, toggle_chef_mode, 
                   fetch_and_update_user_profile, validate_input, resend_activation_link, footer,
-                  fetch_languages, refresh_chef_status)
+                  fetch_languages, get_reference, refresh_chef_status)
 
 logging.basicConfig(level=logging.ERROR, format='%(asctime)s - %(levelname)s - %(message)s', handlers=[
     logging.FileHandler("error.log"),
@@ -106,7 +106,6 @@ try:
             headers = {'Authorization': f'Bearer {st.session_state.user_info["access"]}'}
             user_details = api_call_with_refresh(f'{os.getenv("DJANGO_URL")}/auth/api/user_details/', method='get', headers=headers)
             address_details = api_call_with_refresh(f'{os.getenv("DJANGO_URL")}/auth/api/address_details/', method='get', headers=headers)
-            countries_details = api_call_with_refresh(f'{os.getenv("DJANGO_URL")}/auth/api/countries/', method='get', headers=headers)
             
             if user_details.status_code == 200:
                 user_data = user_details.json()
@@ -126,7 +125,7 @@ try:
             
             address_data = address_details.json() if address_details and address_details.status_code == 200 else {}
             
-            countries_list = countries_details.json() if countries_details and countries_details.status_code == 200 else []
+            countries_list = get_reference('countries')
             country_dict = {country['name']: country['code'] for country in countries_list}
             country_names = list(country_dict.keys())
 
@@ -9,7 +9,7 @@ import datetime
 import logging
 from datetime import datetime, timedelta
 from dateutil.parser import parse
-from utils import api_call_with_refresh, login_form, toggle_chef_mode, is_user_authenticated, validate_input, footer, safe_get_nested, safe_get, handle_api_errors
+from utils import api_call_with_refresh, login_form, toggle_chef_mode, is_user_authenticated, validate_input, footer, safe_get_nested, safe_get, handle_api_errors, get_reference, get_reference_data
 
 # Configure logging
 logging.basicConfig(level=logging.ERROR, format='%(asctime)s - %(levelname)s - %(message)s', handlers=[
@@ -808,78 +808,18 @@ def fetch_chef_dishes():
 
 def fetch_dietary_preferences():
     """
-    Fetch dietary preferences from the backend or use a predefined list like in the profile page.
+    Return the dietary preferences as [{'id', 'name'}].
+
+    Served from the shared reference data registry, which falls back to the
+    profile page's list until the backend list has been loaded.
     """
-    try:
-        url = f"{os.getenv('DJANGO_URL')}/meals/api/dietary-preferences/"
-        logging.info(f"Fetching dietary preferences from: {url}")
-        
-        response = api_call_with_refresh(
-            url=url,
-            method='get'
-        )
-        
-        if response and response.status_code == 200:
-            data = response.json()
-            logging.info(f"Dietary preferences API response: {data}")
-            
-            # Extract preferences from the response structure
-            prefs_list = []
-            if isinstance(data, list):
-                # Direct list of preferences
-                prefs_list = data
-            elif isinstance(data, dict):
-                # Handle different response structures
-                if 'details' in data and isinstance(data['details'], list):
-                    prefs_list = data['details']
-                elif 'status' in data and data['status'] == 'success' and 'details' in data:
-                    prefs_list = data['details']
-                elif 'results' in data:
-                    prefs_list = data['results']
-            
-            # Convert preferences to the expected format if needed
-            formatted_prefs = []
-            for pref in prefs_list:
-                if isinstance(pref, dict):
-                    # Already in dict format, make sure it has id and name
-                    if 'id' in pref and 'name' in pref:
-                        formatted_prefs.append(pref)
-                    elif 'name' in pref:
-                        # Create an id from the name if missing
-                        formatted_prefs.append({
-                            'id': pref.get('id', pref['name']),
-                            'name': pref['name']
-                        })
-                elif isinstance(pref, str):
-                    # Convert string preferences to dict format
-                    formatted_prefs.append({
-                        'id': pref,
-                        'name': pref
-                    })
-            
-            return formatted_prefs
-        else:
-            if response:
-                logging.error(f"Error fetching dietary preferences: {response.status_code}, {response.text}")
-            return use_default_preferences()
-    except Exception as e:
-        logging.error(f"Error fetching dietary preferences: {str(e)}")
-        return use_default_preferences()
+    return get_reference('dietary_preferences')
     
 def use_default_preferences():
     """
-    Return the default list of dietary preferences as used in the profile page.
+    Return the built-in list of dietary preferences, as used in the profile page.
     """
-    # Use the same list as in the profile page
-    default_prefs = [
-        'Everything', 'Vegetarian', 'Pescatarian', 'Gluten-Free', 'Keto', 
-        'Paleo', 'Halal', 'Kosher', 'Low-Calorie', 'Low-Sodium', 'High-Protein', 
-        'Dairy-Free', 'Nut-Free', 'Raw Food', 'Whole 30', 'Low-FODMAP', 
-        'Diabetic-Friendly', 'Vegan'
-    ]
-    
-    # Convert to the format expected by our function
-    return [{'id': pref, 'name': pref} for pref in default_prefs]
+    return get_reference_data().fallback('dietary_preferences')
 
 def update_chef_dish(dish_id, data):
     """
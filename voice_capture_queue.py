@@ -0,0 +1,153 @@
+"""
+Capture queue for voice pantry entries.
+
+Recordings are queued as soon as they are captured and uploaded to
+``/meals/api/pantry-items/from-audio/`` on a background pool, a few at a time
+per session, so the user can keep recording while earlier entries are
+transcribed. Results are collected on the main thread as each upload finishes.
+"""
+
+import itertools
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+from audio_utils import prepare_speech_audio
+
+voice_logger = logging.getLogger('voice_capture_queue')
+
+FROM_AUDIO_PATH = '/meals/api/pantry-items/from-audio/'
+MAX_IN_FLIGHT = 3  # concurrent uploads per session
+MAX_AUTH_RETRIES = 1  # re-uploads after the access token was refreshed
+REQUEST_TIMEOUT_SECONDS = 120
+
+
+def voice_error_message(response: Any) -> str:
+    """Describe a failed from-audio response."""
+    if response is None:
+        return "An error occurred while processing your audio."
+    try:
+        error_data = response.json()
+        return f"{error_data.get('error', 'Error')}: {error_data.get('details', '')}"
+    except Exception:
+        return f"Error: HTTP {response.status_code}"
+
+
+class VoiceCaptureQueue:
+    """
+    Session-scoped queue of voice recordings and their upload results.
+
+    Each job moves through 'queued' -> 'uploading' -> 'done' | 'failed'.
+    Uploads rejected with 401 go back to 'queued' so the caller can refresh
+    the access token on the main thread and start them again.
+    """
+
+    def __init__(self, max_in_flight: int = MAX_IN_FLIGHT):
+        self.max_in_flight = max_in_flight
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._jobs: Dict[int, Dict[str, Any]] = {}
+        self._futures: Dict[int, Any] = {}
+
+    def enqueue(self, audio: bytes) -> int:
+        """Queue a recording and return its job ID."""
+        with self._lock:
+            job_id = next(self._ids)
+            self._jobs[job_id] = {
+                'id': job_id, 'status': 'queued', 'audio': audio,
+                'result': None, 'error': None, 'auth_retries': 0,
+            }
+            return job_id
+
+    def jobs(self) -> List[Dict[str, Any]]:
+        """Return a snapshot of every job, oldest first, without the audio."""
+        with self._lock:
+            return [{k: v for k, v in job.items() if k != 'audio'} for job in self._jobs.values()]
+
+    def busy(self) -> bool:
+        """Return True while recordings are queued or uploading."""
+        with self._lock:
+            return any(job['status'] in ('queued', 'uploading') for job in self._jobs.values())
+
+    def start_uploads(self, executor, session, base_url: str, headers: Dict[str, str]) -> int:
+        """
+        Start queued uploads until max_in_flight are running.
+
+        Returns:
+            The number of uploads started
+        """
+        started = 0
+        with self._lock:
+            for job in self._jobs.values():
+                if len(self._futures) >= self.max_in_flight:
+                    break
+                if job['status'] != 'queued':
+                    continue
+                job['status'] = 'uploading'
+                self._futures[job['id']] = executor.submit(
+                    self._upload, job['audio'], session, f"{base_url}{FROM_AUDIO_PATH}", dict(headers)
+                )
+                started += 1
+        return started
+
+    def collect(self) -> Dict[str, Any]:
+        """
+        Record the outcome of finished uploads.
+
+        Returns:
+            {'finished': [jobs that completed or failed just now],
+             'auth_expired': True if an upload needs a fresh access token}
+        """
+        finished, auth_expired = [], False
+        with self._lock:
+            done = [job_id for job_id, future in self._futures.items() if future.done()]
+            for job_id in done:
+                future = self._futures.pop(job_id)
+                job = self._jobs[job_id]
+                try:
+                    response = future.result()
+                except Exception as e:
+                    voice_logger.error(f"Voice upload failed: {e}")
+                    response = None
+                if response is not None and response.status_code == 401 and job['auth_retries'] < MAX_AUTH_RETRIES:
+                    job['auth_retries'] += 1
+                    job['status'] = 'queued'
+                    auth_expired = True
+                    continue
+                if response is not None and response.status_code == 201:
+                    try:
+                        job['result'] = response.json()
+                        job['status'] = 'done'
+                    except ValueError:
+                        job['status'] = 'failed'
+                        job['error'] = "The server returned an unreadable response."
+                else:
+                    job['status'] = 'failed'
+                    job['error'] = voice_error_message(response)
+                    voice_logger.error(f"Voice pantry item error: {job['error']}")
+                job['audio'] = None
+                finished.append({k: v for k, v in job.items() if k != 'audio'})
+        return {'finished': finished, 'auth_expired': auth_expired}
+
+    def fail_queued(self, error: str) -> None:
+        """Fail every recording that has not started uploading (e.g. when the session expired)."""
+        with self._lock:
+            for job in self._jobs.values():
+                if job['status'] == 'queued':
+                    job.update(status='failed', error=error, audio=None)
+
+    def clear_finished(self) -> None:
+        """Forget completed and failed jobs."""
+        with self._lock:
+            self._jobs = {job_id: job for job_id, job in self._jobs.items() if job['status'] in ('queued', 'uploading')}
+
+    @staticmethod
+    def _upload(audio: bytes, session, url: str, headers: Dict[str, str]) -> Optional[Any]:
+        """Prepare and upload one recording (background thread)."""
+        audio_bytes, mime_type = prepare_speech_audio(audio)
+        return session.post(
+            url,
+            files={'audio_file': ('recording.wav', audio_bytes, mime_type)},
+            headers=headers,
+            timeout=REQUEST_TIMEOUT_SECONDS,
+        )